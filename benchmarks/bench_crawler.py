@@ -0,0 +1,99 @@
+# Crawler throughput against recorded listing pages served from a local HTTP server.
+#   python benchmarks/bench_crawler.py [--pages-dir Data/.cache/html/page] [--latency 0.05] [--workers 1 4 8]
+# Without recorded pages (page_N.html as saved by the crawler) synthetic ones are generated.
+import os, sys, re, json, time, argparse, tempfile, threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from modmanager.crawler import CdnCrawler
+
+THUMB_BYTES = b"\xff\xd8" + os.urandom(20 * 1024)
+
+
+def synthetic_page(p, total_pages, items=20):
+    entries = "".join(
+        f'<div class="list-pages-item"><div class="lister-item-title"><p><a href="/map-{p}-{i}">Map {p}-{i}</a></p></div>'
+        f'<div class="lister-item-tags"><p><a>tag{i % 7}</a> <a>author{p}</a></p></div>'
+        f'<div class="lister-item-image"><a><img src="/thumbs/{p}-{i}.jpg"></a></div></div>'
+        for i in range(items))
+    return (f'<html><body><div id="page-content"><div class="list-pages-box"><p>page {p} of {total_pages}</p>'
+            f'{entries}</div></div></body></html>')
+
+
+def load_pages(pages_dir, synthetic_pages):
+    pages = {}
+    if pages_dir and os.path.isdir(pages_dir):
+        for name in os.listdir(pages_dir):
+            match = re.match(r"page_(\d+)\.html$", name)
+            if match:
+                with open(os.path.join(pages_dir, name), "r", encoding="utf-8") as f:
+                    # Point every image at the local server
+                    pages[int(match.group(1))] = re.sub(r'src="https?://[^/"]+', 'src="', f.read())
+    if not pages:
+        pages = {p: synthetic_page(p, synthetic_pages) for p in range(1, synthetic_pages + 1)}
+    return pages
+
+
+def serve(pages, latency):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            match = re.match(r"/tag:all/p/(\d+)$", self.path)
+            if match and int(match.group(1)) in pages:
+                body = pages[int(match.group(1))].encode("utf-8")
+            elif match:
+                self.send_error(404)
+                return
+            else:
+                body = THUMB_BYTES
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def run(pages, latency, workers):
+    server = serve(pages, latency)
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            crawler = CdnCrawler(os.path.join(tmp, "CDN_List.json"), os.path.join(tmp, "html"),
+                                 os.path.join(tmp, "thumbs"), base_url=base_url, max_per_host=workers)
+            entries = crawler.run()
+            stats = dict(crawler.stats)
+    finally:
+        server.shutdown()
+    stats.update(workers=workers, entries=len(entries),
+                 pages_per_second=stats["pages"] / stats["seconds"] if stats["seconds"] else 0.0)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the CDN list crawler")
+    parser.add_argument("--pages-dir", default=os.path.join("Data", ".cache", "html", "page"))
+    parser.add_argument("--synthetic-pages", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--json", action="store_true", help="print one JSON object per run")
+    args = parser.parse_args()
+    pages = load_pages(args.pages_dir, args.synthetic_pages)
+    for workers in args.workers:
+        stats = run(pages, args.latency, workers)
+        if args.json:
+            print(json.dumps(stats))
+        else:
+            print(f"workers={workers:<3} pages={stats['pages']:<5} thumbs={stats['thumbnails']:<6} "
+                  f"{stats['seconds']:.2f}s  {stats['pages_per_second']:.1f} pages/s  "
+                  f"{stats['bytes'] / 1024 / 1024:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
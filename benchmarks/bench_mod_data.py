@@ -0,0 +1,218 @@
+# Timing of the mod_data deploy path on a synthetic mod library and a throwaway game folder.
+#   python benchmarks/bench_mod_data.py [--archives 200] [--files 20] [--file-size 16384] [--overlap 0.1]
+#       [--sevenzip 0.25] [--runs 3] [--deploy-mode link|extract] [--transcode] [--output results.json]
+#       [--compare base.json]
+# The library is generated from --seed, so runs on different commits time the same input. Each run is a
+# fresh process on an empty Data/ and svencoop_addon (mod_data resolves its paths at import).
+# --compare exits 1 when an operation got slower than the baseline by more than --tolerance.
+import os, sys, json, time, shutil, random, zipfile, argparse, platform, tempfile, statistics, contextlib, subprocess
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Differences below this are noise on any machine
+NOISE_FLOOR_S = 0.005
+
+
+def make_library(home, archives, files, file_size, overlap, sevenzip, seed, deploy_mode, transcode=False):
+    rng = random.Random(seed)
+    mods_dir = os.path.join(home, "Mods")
+    os.makedirs(mods_dir)
+    os.makedirs(os.path.join(home, "game", "svencoop_addon"))
+    blob = rng.randbytes(file_size * 2)
+    shared = round(files * overlap)
+    names = []
+    for i in range(archives):
+        name = f"mod_{i:05d}"
+        # Shared paths come from a pool as large as one archive, so they overlap across mods
+        members = [f"shared/common_{k:04d}.bin" for k in rng.sample(range(files), shared)]
+        members += [f"maps/{name}/file_{j:04d}.bin" for j in range(files - shared)]
+        # Unique content per member, so the store can't dedupe it away
+        contents = {m: f"{name}/{m}".encode() + blob[(i * 7 + j) % file_size:][:file_size]
+                    for j, m in enumerate(members)}
+        if rng.random() < sevenzip:
+            import py7zr
+            with py7zr.SevenZipFile(os.path.join(mods_dir, name + ".7z"), "w") as z:
+                for member, data in contents.items():
+                    z.writestr(data, member)
+        else:
+            with zipfile.ZipFile(os.path.join(mods_dir, name + ".zip"), "w", zipfile.ZIP_DEFLATED) as z:
+                for member, data in contents.items():
+                    z.writestr(member, data)
+        names.append(name)
+    with open(os.path.join(home, "config.json"), "w") as f:
+        json.dump({"Game_Folder": os.path.join(home, "game"), "Deploy_Mode": deploy_mode, "Transcode_7z": transcode},
+                  f, indent=4)
+    return names
+
+
+def reset_install(home):
+    shutil.rmtree(os.path.join(home, "Data"), ignore_errors=True)
+    addon = os.path.join(home, "game", "svencoop_addon")
+    shutil.rmtree(addon, ignore_errors=True)
+    os.makedirs(addon)
+    with open(os.path.join(home, "Mods", "Enabled.json"), "w") as f:
+        json.dump([], f)
+
+
+def scan(folder):
+    count = total = 0
+    for dirpath, dirnames, filenames in os.walk(folder):
+        for filename in filenames:
+            count += 1
+            total += os.lstat(os.path.join(dirpath, filename)).st_size
+    return count, total
+
+
+# --- One run, inside a subprocess with SVEN_MODMANAGER_HOME set ---
+def run_worker():
+    sys.path.insert(0, ROOT)
+    from modmanager import mod_data as md
+    from modmanager.operations import OperationContext
+    addon = os.path.join(md.get_game_folder(), "svencoop_addon")
+    results = {}
+
+    def timed(op, func, *args):
+        context = OperationContext()
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(sys.stderr):
+            result = func(*args, context)
+        seconds = time.perf_counter() - start
+        files, nbytes = scan(addon)
+        # files_changed counts files deployed (or found already deployed) and removed; addon_* is what is left
+        results[op] = {"seconds": seconds, "files_changed": context.files_done, "bytes_written": context.bytes_done,
+                       "addon_files": files, "addon_bytes": nbytes, "errors": len(context.errors)}
+        return result
+
+    start = time.perf_counter()
+    mods = md.get_mod_list()
+    results["get_mod_list_cold"] = {"seconds": time.perf_counter() - start, "mods": len(mods)}
+    start = time.perf_counter()
+    md.get_mod_list()
+    results["get_mod_list_warm"] = {"seconds": time.perf_counter() - start, "mods": len(mods)}
+    first, middle = mods[0]["orig_mod_name"], mods[len(mods) // 2]["orig_mod_name"]
+    timed("enable_mod", md.enable_mod, first)
+    timed("disable_mod", md.disable_mod, first)
+    everything = [{"orig_mod_name": m["orig_mod_name"], "archive_path": m["archive_path"]} for m in mods]
+    timed("enable_all_mods", md.enable_all_mods, everything)
+    # Re-applying the same set finds every file already deployed and writes nothing
+    timed("enable_all_mods_again", md.enable_all_mods, everything)
+    # With overlap, disabling a mod in the middle hands shared files back to other owners
+    timed("disable_mod_overlapping", md.disable_mod, middle)
+    timed("enable_mod_again", md.enable_mod, middle)
+    timed("disable_all_mods", md.disable_all_mods)
+    print(json.dumps(results))
+
+
+def run_once(home):
+    env = dict(os.environ, SVEN_MODMANAGER_HOME=home)
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--worker"], env=env, capture_output=True,
+                         text=True, timeout=3600, cwd=ROOT)
+    for line in out.stdout.splitlines():
+        if line.startswith("{"):
+            return json.loads(line)
+    raise RuntimeError(f"benchmark run failed:\n{out.stdout}\n{out.stderr}")
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip()
+        dirty = bool(subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=ROOT,
+                                    capture_output=True, text=True).stdout.strip())
+        return commit + ("-dirty" if dirty and commit else "")
+    except OSError:
+        return ""
+
+
+def summarize(runs):
+    summary = {}
+    for op in runs[0]:
+        times = [run[op]["seconds"] for run in runs]
+        entry = {key: value for key, value in runs[-1][op].items() if key != "seconds"}
+        entry.update(median_s=round(statistics.median(times), 4), min_s=round(min(times), 4),
+                     runs_s=[round(run[op]["seconds"], 4) for run in runs])
+        summary[op] = entry
+    return summary
+
+
+def compare(results, baseline, tolerance):
+    # Slower by more than tolerance (and the noise floor), or a different amount written, is a regression
+    if baseline.get("params") != results["params"]:
+        return [f"baseline was run with different parameters: {baseline.get('params')}"]
+    regressions = []
+    for op, entry in results["results"].items():
+        base = baseline.get("results", {}).get(op)
+        if not base:
+            continue
+        if entry["median_s"] > base["median_s"] * (1 + tolerance) and \
+                entry["median_s"] - base["median_s"] > NOISE_FLOOR_S:
+            regressions.append(f"{op}: {base['median_s'] * 1000:.1f} ms -> {entry['median_s'] * 1000:.1f} ms")
+        for key in ("files_changed", "addon_files", "addon_bytes"):
+            if key in entry and key in base and entry[key] != base[key]:
+                regressions.append(f"{op}: {key} {base[key]} -> {entry[key]}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time mod_data operations on a synthetic mod library")
+    parser.add_argument("--archives", type=int, default=200)
+    parser.add_argument("--files", type=int, default=20, help="files per archive")
+    parser.add_argument("--file-size", type=int, default=16384, help="bytes per file")
+    parser.add_argument("--overlap", type=float, default=0.1, help="fraction of each archive's paths shared with others")
+    parser.add_argument("--sevenzip", type=float, default=0.25, help="fraction of archives written as .7z")
+    parser.add_argument("--deploy-mode", choices=["link", "extract"], default="link")
+    parser.add_argument("--transcode", action="store_true", help="re-pack .7z archives for random access (extract mode)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--output", help="write the JSON results to this file")
+    parser.add_argument("--json", action="store_true", help="print the JSON results")
+    parser.add_argument("--compare", metavar="BASELINE", help="results file from an earlier run")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown against the baseline")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        run_worker()
+        return
+    params = {key: getattr(args, key) for key in
+              ("archives", "files", "file_size", "overlap", "sevenzip", "deploy_mode", "seed")}
+    if args.transcode:
+        # Only recorded when set, so results from before the option still compare
+        params["transcode"] = True
+    with tempfile.TemporaryDirectory(prefix="bench-mod-data-") as home:
+        start = time.perf_counter()
+        make_library(home, args.archives, args.files, args.file_size, args.overlap, args.sevenzip, args.seed,
+                     args.deploy_mode, args.transcode)
+        generate_s = time.perf_counter() - start
+        runs = []
+        for _ in range(args.runs):
+            reset_install(home)
+            runs.append(run_once(home))
+    results = {
+        "meta": {"commit": git_revision(), "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                 "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+                 "generate_s": round(generate_s, 2)},
+        "params": params,
+        "results": summarize(runs),
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print(f"{args.archives} archives x {args.files} files ({args.file_size} B, overlap {args.overlap}, "
+              f"{args.deploy_mode}), median of {args.runs} run(s) at {results['meta']['commit'] or 'unknown commit'}")
+        for op, entry in results["results"].items():
+            written = f"{entry['files_changed']:>7} files {entry['bytes_written'] / 1e6:>8.1f} MB" \
+                if "files_changed" in entry else ""
+            print(f"  {op:<26} {entry['median_s'] * 1000:>9.1f} ms  {written}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+# Time-to-first-window on a synthetic large install; exits 1 when over budget.
+#   python benchmarks/check_startup.py [--mods 2000] [--budget-ms 1000] [--runs 3] [--json]
+# The first run builds the mod index (cold); the budget applies to the best warm run.
+import os, sys, json, time, argparse, tempfile, zipfile, subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def make_install(home, mods, catalog_entries):
+    mods_dir = os.path.join(home, "Mods")
+    data_dir = os.path.join(home, "Data")
+    os.makedirs(mods_dir)
+    os.makedirs(data_dir)
+    for i in range(mods):
+        with zipfile.ZipFile(os.path.join(mods_dir, f"map_{i:05d}.zip"), "w") as z:
+            z.writestr(f"maps/map_{i:05d}.bsp", b"x" * (i % 512))
+            z.writestr(f"sound/map_{i:05d}/ambience.wav", b"y" * 64)
+    with open(os.path.join(mods_dir, "Enabled.json"), "w") as f:
+        json.dump([f"map_{i:05d}" for i in range(0, mods, 10)], f)
+    with open(os.path.join(home, "config.json"), "w") as f:
+        json.dump({"Game_Folder": ""}, f)
+    with open(os.path.join(data_dir, "CDN_List.json"), "w", encoding="utf-8") as f:
+        json.dump({f"Map {i}": {"Title": f"Map {i}", "Page URL": f"http://example/{i}", "Tags": "survival",
+                                "Thumbnail": ""} for i in range(catalog_entries)}, f)
+
+
+def measure(home):
+    env = dict(os.environ, SVEN_MODMANAGER_HOME=home, QT_QPA_PLATFORM="offscreen")
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, os.path.join(ROOT, "main.py"), "--measure-startup"], env=env,
+                         capture_output=True, text=True, timeout=300, cwd=ROOT)
+    wall_ms = (time.perf_counter() - start) * 1000
+    for line in out.stdout.splitlines():
+        if line.startswith("{"):
+            result = json.loads(line)
+            result["process_ms"] = round(wall_ms, 1)
+            return result
+    raise RuntimeError(f"main.py did not report startup time:\n{out.stdout}\n{out.stderr}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check time to first window against a budget")
+    parser.add_argument("--mods", type=int, default=2000)
+    parser.add_argument("--catalog", type=int, default=20000, help="entries in the synthetic CDN_List.json")
+    parser.add_argument("--budget-ms", type=float, default=1000)
+    parser.add_argument("--runs", type=int, default=3, help="warm runs after the cold one")
+    parser.add_argument("--json", action="store_true")
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as home:
+        make_install(home, args.mods, args.catalog)
+        cold = measure(home)
+        warm = [measure(home) for _ in range(args.runs)]
+    best = min(run["first_window_ms"] for run in warm)
+    result = {"mods": args.mods, "cold_ms": cold["first_window_ms"], "warm_ms": best,
+              "warm_process_ms": min(run["process_ms"] for run in warm), "budget_ms": args.budget_ms,
+              "ok": best <= args.budget_ms}
+    if args.json:
+        print(json.dumps(result))
+    else:
+        print(f"{args.mods} mods: cold {result['cold_ms']:.0f} ms, warm {best:.0f} ms "
+              f"(process {result['warm_process_ms']:.0f} ms), budget {args.budget_ms:.0f} ms: "
+              f"{'OK' if result['ok'] else 'OVER BUDGET'}")
+    sys.exit(0 if result["ok"] else 1)
+
+
+if __name__ == "__main__":
+    main()
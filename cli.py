@@ -0,0 +1,6 @@
+#!/usr/bin/env python3
+# Headless entry point (no Qt): python cli.py --help
+from modmanager.cli import main
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,31 @@
 #!/usr/bin/env python3
+import time
+STARTED = time.perf_counter()
 import os
 import sys
+import json
 from PyQt5.QtWidgets import QApplication
+from PyQt5.QtCore import QTimer
 from modmanager.main_window import ModManagerWindow
 from modmanager.ui_components import setDarkMode
 
 if __name__ == "__main__":
-    # Force Qt to use the xcb (X11) platform plugin to avoid Wayland issues
-    os.environ["QT_QPA_PLATFORM"] = "xcb"
+    # --measure-startup prints the time to the first shown window as JSON and exits
+    # (benchmarks/check_startup.py); it keeps the platform plugin from the environment
+    measure_startup = "--measure-startup" in sys.argv
+    if not measure_startup:
+        # Force Qt to use the xcb (X11) platform plugin to avoid Wayland issues
+        os.environ["QT_QPA_PLATFORM"] = "xcb"
 
     app = QApplication(sys.argv)
     setDarkMode(app)  # Apply dark mode style
     window = ModManagerWindow()
     window.show()
+    if measure_startup:
+        def report_startup():
+            print(json.dumps({"first_window_ms": round((time.perf_counter() - STARTED) * 1000, 1),
+                              "mods": window.mod_model.rowCount()}))
+            window.close()
+            app.quit()
+        QTimer.singleShot(0, report_startup)
     sys.exit(app.exec_())
@@ -0,0 +1,116 @@
+import os, sqlite3, threading
+from modmanager.extractor import list_archive_details
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS archives (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS members (
+    path TEXT NOT NULL,
+    relpath TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    crc INTEGER,
+    PRIMARY KEY (path, relpath)
+) WITHOUT ROWID;
+"""
+
+# Top-level folders worth calling out in a conflict report
+CONFLICT_FOLDERS = ("maps", "models", "sound", "sprites", "gfx", "scripts")
+
+
+# --- Member listings of every archive in Mods/, read once per (size, mtime) ---
+class ArchiveCache:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None
+        self._memo = {}
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+            self._memo = {}
+
+    def details(self, archive_file):
+        # relpath -> (size, crc32)
+        archive_file = os.path.abspath(archive_file)
+        st = os.stat(archive_file)
+        stamp = (st.st_size, st.st_mtime_ns)
+        with self._lock:
+            memo = self._memo.get(archive_file)
+            if memo and memo[0] == stamp:
+                return memo[1]
+            conn = self._connect()
+            row = conn.execute("SELECT size, mtime FROM archives WHERE path = ?", (archive_file,)).fetchone()
+            if row and tuple(row) == stamp:
+                files = {relpath: (size, crc) for relpath, size, crc in conn.execute(
+                    "SELECT relpath, size, crc FROM members WHERE path = ?", (archive_file,))}
+                self._memo[archive_file] = (stamp, files)
+                return files
+        files = list_archive_details(archive_file)
+        with self._lock:
+            conn = self._connect()
+            conn.execute("DELETE FROM members WHERE path = ?", (archive_file,))
+            conn.executemany("INSERT INTO members (path, relpath, size, crc) VALUES (?, ?, ?, ?)",
+                             [(archive_file, relpath, size, crc) for relpath, (size, crc) in files.items()])
+            conn.execute("INSERT OR REPLACE INTO archives (path, size, mtime) VALUES (?, ?, ?)",
+                         (archive_file,) + stamp)
+            conn.commit()
+            self._memo[archive_file] = (stamp, files)
+        return files
+
+    def listing(self, archive_file):
+        # relpath -> size, same shape as extractor.list_archive
+        return {relpath: size for relpath, (size, crc) in self.details(archive_file).items()}
+
+    def forget(self, archive_file):
+        archive_file = os.path.abspath(archive_file)
+        with self._lock:
+            self._memo.pop(archive_file, None)
+            conn = self._connect()
+            conn.execute("DELETE FROM members WHERE path = ?", (archive_file,))
+            conn.execute("DELETE FROM archives WHERE path = ?", (archive_file,))
+            conn.commit()
+
+
+def find_conflicts(listings):
+    # listings: [(mod name, {relpath: ...}), ...] lowest priority first.
+    # Returns one entry per path shipped by more than one mod, the winner being the last.
+    owners = {}
+    for mod_name, files in listings:
+        for relpath in files:
+            owners.setdefault(relpath, []).append(mod_name)
+    conflicts = []
+    for relpath, mods in owners.items():
+        if len(mods) > 1:
+            top = relpath.split("/", 1)[0].lower()
+            conflicts.append({"path": relpath, "folder": top if top in CONFLICT_FOLDERS else "other",
+                              "mods": mods, "winner": mods[-1]})
+    conflicts.sort(key=lambda c: (c["folder"], c["path"].lower()))
+    return conflicts
+
+
+def format_conflicts(conflicts):
+    if not conflicts:
+        return "No conflicting files."
+    lines = []
+    folder = None
+    for conflict in conflicts:
+        if conflict["folder"] != folder:
+            folder = conflict["folder"]
+            lines.append(f"[{folder}]")
+        losers = ", ".join(conflict["mods"][:-1])
+        lines.append(f"  {conflict['path']}: {conflict['winner']} overrides {losers}")
+    return "\n".join(lines)
@@ -1,32 +1,54 @@
-import os, glob, json, math, re, requests, shutil
+import os, json, re, requests, shutil
 from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLineEdit, QPushButton, QLabel, QScrollArea,
-                             QGridLayout, QStackedWidget, QComboBox, QTextEdit, QDialog, QFrame)
-from PyQt5.QtCore import Qt, QUrl
+                             QGridLayout, QStackedWidget, QComboBox, QTextEdit, QDialog, QFrame, QProgressBar)
+from PyQt5.QtCore import Qt, QUrl, QTimer
 from PyQt5.QtGui import QPixmap, QFont
 from bs4 import BeautifulSoup
-from modmanager.mod_data import DATA_DIR, CACHE_HTML_DIR, CACHE_THUMB_DIR, remove_from_download_cache_by_title, load_download_cache, save_download_cache, MODS_FOLDER
-from modmanager.ui_components import MarqueeLabel, ClickableLabel
+from modmanager.mod_data import DATA_DIR, CACHE_HTML_DIR, CACHE_THUMB_DIR, remove_from_download_cache_by_title, get_state, MODS_FOLDER, \
+    human_file_size, get_download_segments, get_detail_store
+from modmanager.downloader import download_file
+from modmanager.crawler import crawl_cdn_list, partial_path
+from modmanager.search_index import SearchIndex, load_catalog
+from modmanager.jobs import JobRunner
+from modmanager import tracing
+from modmanager.ui_components import ClickableLabel
+from modmanager.map_grid import MapListModel, MapGridView
+from modmanager.thumbnails import get_thumbnail_loader, get_screenshot_loader
 from PyQt5.QtWidgets import QApplication, QMessageBox
 
-RESULTS_PER_PAGE = 60
-
 class BrowserTab(QWidget):
     def __init__(self, parent=None):
         super().__init__(parent)
+        self.download_jobs = JobRunner(self)
+        self.crawl_jobs = JobRunner(self)
+        # Detail pages get their own runner so they don't queue behind a crawl
+        self.detail_jobs = JobRunner(self)
+        self.thumbnails = get_thumbnail_loader()
+        self.thumbnails.ready.connect(self.on_thumbnail_ready)
+        self.screenshots = get_screenshot_loader()
+        self.screenshots.fetched.connect(self.on_screenshot_fetched)
+        self.screenshot_labels = {}
+        self.screenshot_keys = {}
+        # (img_url, thumbnail key or None, max width, max height) of the screenshot waiting to be enlarged
+        self.enlarge_request = None
         self.browser_stack = QStackedWidget()
         self.init_results_view()
         self.init_detail_view()
         main_layout = QVBoxLayout(self)
         main_layout.addWidget(self.browser_stack)
         self.setLayout(main_layout)
+        self.download_jobs.progress.connect(self.on_download_progress)
+        self.download_cancel_button.clicked.connect(self.download_jobs.cancel_all)
+        self.crawl_jobs.progress.connect(self.on_crawl_progress)
         self.browser_map_index = []
+        self.search_index = SearchIndex([])
+        self.last_search_query = None
         self.browser_search_results = []
-        self.browser_current_page = 1
         self.cdn_list_path = os.path.join(DATA_DIR, "CDN_List.json")
-        if not os.path.exists(self.cdn_list_path):
+        if not os.path.exists(self.cdn_list_path) or os.path.exists(partial_path(self.cdn_list_path)):
             self.populate_cdn_list()
-        self.load_cdn_list()
-        self.perform_browser_search()
+        else:
+            self.load_cdn_list()
 
     def init_results_view(self):
         self.browser_results_widget = QWidget()
@@ -40,18 +62,24 @@ class BrowserTab(QWidget):
         results_layout.addLayout(search_layout)
         self.browser_search_button.clicked.connect(self.perform_browser_search)
         self.browser_search_input.returnPressed.connect(self.perform_browser_search)
+        # Live search, debounced so a burst of keystrokes runs one query
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(200)
+        self.search_timer.timeout.connect(self.perform_browser_search)
+        self.browser_search_input.textChanged.connect(self.search_timer.start)
         self.browser_loading_label = QLabel("Loading Content List...")
         self.browser_loading_label.setAlignment(Qt.AlignCenter)
         self.browser_loading_label.hide()
         results_layout.addWidget(self.browser_loading_label)
-        self.browser_scroll_area = QScrollArea()
-        self.browser_scroll_area.setWidgetResizable(True)
-        self.browser_grid_container = QWidget()
-        self.browser_grid_layout = QVBoxLayout(self.browser_grid_container)
-        self.browser_scroll_area.setWidget(self.browser_grid_container)
-        results_layout.addWidget(self.browser_scroll_area)
-        self.browser_pagination_layout = QHBoxLayout()
-        results_layout.addLayout(self.browser_pagination_layout)
+        self.browser_model = MapListModel(self)
+        self.browser_grid = MapGridView()
+        self.browser_grid.setModel(self.browser_model)
+        self.browser_grid.entry_clicked.connect(self.open_browser_detail)
+        results_layout.addWidget(self.browser_grid)
+        self.browser_results_label = QLabel()
+        self.browser_results_label.setAlignment(Qt.AlignCenter)
+        results_layout.addWidget(self.browser_results_label)
         self.browser_stack.addWidget(self.browser_results_widget)
 
     def init_detail_view(self):
@@ -100,6 +128,15 @@ class BrowserTab(QWidget):
         download_layout.addWidget(QLabel("Download:"))
         download_layout.addWidget(self.download_combo)
         download_layout.addWidget(self.detail_download_button)
+        self.download_progress = QProgressBar()
+        self.download_progress.setTextVisible(False)
+        self.download_progress.hide()
+        download_layout.addWidget(self.download_progress)
+        self.download_status_label = QLabel("")
+        download_layout.addWidget(self.download_status_label)
+        self.download_cancel_button = QPushButton("Cancel")
+        self.download_cancel_button.hide()
+        download_layout.addWidget(self.download_cancel_button)
         meta_layout.addLayout(download_layout)
         detail_layout.addLayout(meta_layout)
         self.detail_desc_browser = QTextEdit()
@@ -113,260 +150,88 @@ class BrowserTab(QWidget):
         self.browser_stack.addWidget(self.browser_detail_widget)
 
     def populate_cdn_list(self):
+        # Crawled in the background; CDN_List.json fills in as pages arrive
         self.browser_loading_label.show()
-        QApplication.processEvents()
-        base_url = "http://scmapdb.wikidot.com"
-        cached_pages = glob.glob(os.path.join(CACHE_HTML_DIR, "page*.html"))
-        if cached_pages:
-            total_pages = len(cached_pages)
-        else:
-            try:
-                r = requests.get(base_url + "/tag:all/p/1", timeout=10)
-                r.raise_for_status()
-            except Exception as e:
-                QMessageBox.warning(self, "Error", f"Failed to load initial page: {e}")
-                self.browser_loading_label.hide()
-                return
-            soup = BeautifulSoup(r.text, "html.parser")
-            page_info = soup.select_one("#page-content div.list-pages-box > p")
-            total_pages = 1
-            if page_info:
-                text = page_info.get_text(strip=True)
-                try:
-                    total_pages = int(text.split()[-1])
-                except:
-                    total_pages = 1
-        all_entries = {}
-        for p in range(1, total_pages + 1):
-            page_url = f"{base_url}/tag:all/p/{p}"
-            cache_file = os.path.join(CACHE_HTML_DIR, f"page_{p}.html")
-            if os.path.exists(cache_file):
-                with open(cache_file, "r", encoding="utf-8") as f:
-                    page_html = f.read()
-            else:
-                try:
-                    r = requests.get(page_url, timeout=10)
-                    r.raise_for_status()
-                    page_html = r.text
-                    with open(cache_file, "w", encoding="utf-8") as f:
-                        f.write(page_html)
-                except Exception as e:
-                    print(f"Failed to retrieve page {p}: {e}")
-                    continue
-            page_soup = BeautifulSoup(page_html, "html.parser")
-            items = page_soup.find_all('div', class_='list-pages-item')
-            for item in items:
-                try:
-                    title_tag = item.select_one("div.lister-item-title p a")
-                    if not title_tag:
-                        continue
-                    title = title_tag.get_text(strip=True)
-                    page_href = title_tag.get("href", "")
-                    if not page_href.startswith("http"):
-                        page_href = base_url + page_href
-                    tags_tag = item.select_one("div.lister-item-tags p")
-                    tags_text = tags_tag.get_text(" ", strip=True) if tags_tag else ""
-                    thumb_tag = item.select_one("div.lister-item-image a img")
-                    thumb_local_path = ""
-                    if thumb_tag:
-                        src = thumb_tag.get("src", "")
-                        if not src.startswith("http"):
-                            src = base_url + src
-                        safe_title = re.sub(r'[^A-Za-z0-9_-]', '_', title)
-                        thumb_filename = f"{safe_title}_{p}.jpg"
-                        thumb_local_path = os.path.join(CACHE_THUMB_DIR, thumb_filename)
-                        if not os.path.exists(thumb_local_path):
-                            try:
-                                t = requests.get(src, timeout=10)
-                                t.raise_for_status()
-                                with open(thumb_local_path, "wb") as img_file:
-                                    img_file.write(t.content)
-                            except Exception as e:
-                                print(f"Failed to download thumbnail for {title}: {e}")
-                                thumb_local_path = ""
-                    key = title
-                    count = 1
-                    while key in all_entries:
-                        key = f"{title}_{count}"
-                        count += 1
-                    all_entries[key] = {
-                        "Title": title,
-                        "Page URL": page_href,
-                        "Tags": tags_text,
-                        "Thumbnail": thumb_local_path
-                    }
-                except Exception as e:
-                    print(f"Error processing an item: {e}")
-                    continue
-        try:
-            with open(self.cdn_list_path, "w", encoding="utf-8") as f:
-                json.dump(all_entries, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to write CDN_List.json: {e}")
-        self.browser_loading_label.hide()
+        self.crawl_jobs.submit("Building content list", crawl_cdn_list, self.cdn_list_path, CACHE_HTML_DIR,
+                               CACHE_THUMB_DIR, on_finished=self.on_crawl_finished)
 
-    def load_cdn_list(self):
-        try:
-            with open(self.cdn_list_path, "r", encoding="utf-8") as f:
-                data = json.load(f)
-            self.browser_map_index = list(data.values())[::-1]
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to load CDN_List.json: {e}")
-            self.browser_map_index = []
+    def on_crawl_progress(self, label, pages_done, pages_total, bytes_done, bytes_total, throughput):
+        if pages_total:
+            self.browser_loading_label.setText(f"Loading Content List... {pages_done}/{pages_total} pages")
 
-    def perform_browser_search(self):
-        query = self.browser_search_input.text().strip().lower()
-        if query == "":
-            results = self.browser_map_index[:]
-        else:
-            results = []
-            terms = query.split()
-            for entry in self.browser_map_index:
-                title = entry.get("Title", "").lower()
-                tags = entry.get("Tags", "").lower()
-                if any(term in title or term in tags for term in terms):
-                    results.append(entry)
-        self.browser_search_results = results
-        self.browser_current_page = 1
-        self.update_browser_grid()
-        self.update_pagination()
+    def on_crawl_finished(self, result, errors, cancelled):
+        self.browser_loading_label.hide()
+        self.browser_loading_label.setText("Loading Content List...")
+        if errors and not cancelled:
+            QMessageBox.warning(self, "Error", "\n".join(errors))
+        self.load_cdn_list()
 
-    def update_browser_grid(self):
-        for i in reversed(range(self.browser_grid_layout.count())):
-            widget = self.browser_grid_layout.itemAt(i).widget()
-            if widget:
-                widget.setParent(None)
-        start_index = (self.browser_current_page - 1) * RESULTS_PER_PAGE
-        end_index = start_index + RESULTS_PER_PAGE
-        page_entries = self.browser_search_results[start_index:end_index]
-        grid_widget = QWidget()
-        grid_layout = QGridLayout(grid_widget)
-        grid_layout.setSpacing(10)
-        grid_layout.setContentsMargins(10, 10, 10, 10)
-        download_cache = load_download_cache()
-        cols = 5
-        for idx, entry in enumerate(page_entries):
-            row = idx // cols
-            col = idx % cols
-            entry_widget = QWidget()
-            entry_widget.setObjectName("entryWidget")
-            entry_widget.setFixedSize(170, 230)
-            entry_widget.setStyleSheet("""
-                QWidget#entryWidget {
-                    border: 2px solid transparent;
-                    border-radius: 5px;
-                    background-color: #313438;
-                }
-                QWidget#entryWidget:hover {
-                    border: 2px solid lightblue;
-                }
-            """)
-            entry_layout = QVBoxLayout(entry_widget)
-            entry_layout.setContentsMargins(5, 5, 5, 5)
-            entry_layout.setSpacing(5)
-            entry_layout.setAlignment(Qt.AlignCenter)
-            thumb_container = QWidget(entry_widget)
-            thumb_container.setFixedSize(150, 150)
-            thumb_container.setStyleSheet("background-color: #161616;")
-            thumb_layout = QVBoxLayout(thumb_container)
-            thumb_layout.setContentsMargins(0, 0, 0, 0)
-            thumb_layout.setAlignment(Qt.AlignCenter)
-            thumb_label = ClickableLabel(thumb_container)
-            thumb_path = entry.get("Thumbnail", "")
-            pixmap = QPixmap(thumb_path) if thumb_path and os.path.exists(thumb_path) else QPixmap()
-            if not pixmap.isNull():
-                pixmap = pixmap.scaled(150, 150, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-            thumb_label.setPixmap(pixmap)
-            thumb_label.setAlignment(Qt.AlignCenter)
-            thumb_label.clicked.connect(lambda entry=entry: self.open_browser_detail(entry))
-            thumb_layout.addWidget(thumb_label)
-            if entry.get("Page URL") in download_cache:
-                overlay = QLabel("Downloaded", thumb_container)
-                overlay.setStyleSheet("""
-                    background-color: green;
-                    color: white;
-                    border-radius: 7px;
-                    font-size: 11pt;
-                    font-weight: bold;
-                    padding: 2px;
-                """)
-                overlay.setFixedHeight(22)
-                overlay.setFixedWidth(thumb_container.width())
-                overlay.move(0, thumb_container.height() - overlay.height())
-                overlay.setAlignment(Qt.AlignCenter)
-                overlay.setAttribute(Qt.WA_TransparentForMouseEvents, True)
-                overlay.show()
-            entry_layout.addWidget(thumb_container, alignment=Qt.AlignCenter)
-            title_container = QWidget(entry_widget)
-            title_container.setFixedHeight(40)
-            title_layout = QVBoxLayout(title_container)
-            title_layout.setContentsMargins(0, 0, 0, 0)
-            title_layout.setAlignment(Qt.AlignCenter)
-            title_label = MarqueeLabel(entry.get("Title", ""), title_container)
-            title_label.setAlignment(Qt.AlignCenter)
-            title_label.setStyleSheet("font-size: 12pt; color: white;")
-            title_layout.addWidget(title_label)
-            entry_layout.addWidget(title_container)
-            grid_layout.addWidget(entry_widget, row, col, alignment=Qt.AlignCenter)
-        self.browser_grid_layout.addWidget(grid_widget)
+    def load_cdn_list(self):
+        # Parsed and indexed on the crawl runner, so it also waits for a crawl in progress
+        self.browser_loading_label.show()
+        self.crawl_jobs.submit("Loading content list", load_catalog, self.cdn_list_path,
+                               on_finished=self.on_catalog_loaded)
 
-    def update_pagination(self):
-        for i in reversed(range(self.browser_pagination_layout.count())):
-            item = self.browser_pagination_layout.itemAt(i)
-            if item.widget():
-                item.widget().setParent(None)
-        total_results = len(self.browser_search_results)
-        total_pages = math.ceil(total_results / RESULTS_PER_PAGE) if total_results > 0 else 1
-        prev_btn = QPushButton("Previous")
-        prev_btn.clicked.connect(self.prev_browser_page)
-        prev_btn.setEnabled(self.browser_current_page > 1)
-        self.browser_pagination_layout.addWidget(prev_btn)
-        page_label = QLabel(f"Page {self.browser_current_page} of {total_pages}")
-        page_label.setAlignment(Qt.AlignCenter)
-        self.browser_pagination_layout.addWidget(page_label)
-        next_btn = QPushButton("Next")
-        next_btn.clicked.connect(self.next_browser_page)
-        next_btn.setEnabled(self.browser_current_page < total_pages)
-        self.browser_pagination_layout.addWidget(next_btn)
+    def on_catalog_loaded(self, result, errors, cancelled):
+        self.browser_loading_label.hide()
+        if errors and not cancelled:
+            QMessageBox.warning(self, "Error", "\n".join(errors))
+        self.browser_map_index, self.search_index = result if result else ([], SearchIndex([]))
+        self.last_search_query = None
+        self.perform_browser_search()
 
-    def prev_browser_page(self):
-        if self.browser_current_page > 1:
-            self.browser_current_page -= 1
+    def perform_browser_search(self):
+        self.search_timer.stop()
+        query = self.browser_search_input.text()
+        if query.strip() == self.last_search_query:
+            return
+        self.last_search_query = query.strip()
+        with tracing.span("browser.search", query=query.strip()) as search_span:
+            self.browser_search_results = self.search_index.search(query)
+            search_span.set(results=len(self.browser_search_results))
             self.update_browser_grid()
-            self.update_pagination()
 
-    def next_browser_page(self):
-        total_pages = math.ceil(len(self.browser_search_results) / RESULTS_PER_PAGE)
-        if self.browser_current_page < total_pages:
-            self.browser_current_page += 1
-            self.update_browser_grid()
-            self.update_pagination()
+    @tracing.traced("grid.update")
+    def update_browser_grid(self):
+        self.browser_model.set_downloaded(get_state().downloaded_page_urls())
+        self.browser_model.set_entries(self.browser_search_results)
+        self.browser_grid.scrollToTop()
+        self.browser_results_label.setText(f"{len(self.browser_search_results)} maps")
 
     def back_browser_detail(self):
-        self.update_browser_grid()
+        self.browser_model.set_downloaded(get_state().downloaded_page_urls())
         self.browser_stack.setCurrentIndex(0)
 
     def open_browser_detail(self, entry):
         self.current_entry = entry
-        content_path = os.path.join(DATA_DIR, "CDN_Content.json")
-        content_data = {}
-        if os.path.exists(content_path):
-            try:
-                with open(content_path, "r", encoding="utf-8") as f:
-                    content_data = json.load(f)
-            except:
-                content_data = {}
         title = entry.get("Title", "")
-        if title in content_data:
-            detail = content_data[title]
+        detail = get_detail_store().get(title)
+        if detail is None:
+            # Page shows right away; the scrape runs on detail_jobs and fills it in when done
+            self.show_browser_detail(entry, {"Title": title, "Author": "Loading...", "Original Release": "Loading...",
+                                             "Posted Date": "Loading...", "BSP Filename": "Loading..."})
+            self.detail_jobs.submit(f"Loading {title}", self.fetch_map_detail, entry,
+                                    on_finished=lambda result, errors, cancelled: self.on_detail_fetched(entry, result))
         else:
-            detail = self.scrape_map_detail(entry.get("Page URL", ""))
-            content_data[title] = detail
-            try:
-                with open(content_path, "w", encoding="utf-8") as f:
-                    json.dump(content_data, f, indent=4, ensure_ascii=False)
-            except Exception as e:
-                print(f"Error writing CDN_Content.json: {e}")
+            self.show_browser_detail(entry, detail)
+        self.browser_stack.setCurrentIndex(1)
+
+    def fetch_map_detail(self, entry, context=None):
+        # Runs on detail_jobs: network and parse stay off the GUI thread
+        detail = self.scrape_map_detail(entry.get("Page URL", ""))
+        try:
+            get_detail_store().put(entry.get("Title", ""), detail, entry.get("Page URL"))
+        except Exception as e:
+            print(f"Error saving map details: {e}")
+        return detail
+
+    def on_detail_fetched(self, entry, detail):
+        # Skip it if the user has moved on to another map meanwhile
+        if self.current_entry is entry:
+            self.show_browser_detail(entry, detail or {})
+
+    def show_browser_detail(self, entry, detail):
+        title = entry.get("Title", "")
         self.detail_title_label.setText(detail.get("Title", title))
         self.detail_author_label.setText("Author: " + detail.get("Author", "Unknown"))
         self.detail_release_label.setText("Original Release: " + detail.get("Original Release", "Unknown"))
@@ -383,21 +248,20 @@ class BrowserTab(QWidget):
             w = self.detail_screenshots_layout.itemAt(i).widget()
             if w:
                 w.setParent(None)
-        screenshots = detail.get("Screenshots", [])
-        for img_url in screenshots:
-            screenshot_label = ClickableLabel()
-            try:
-                r = requests.get(img_url, timeout=10)
-                r.raise_for_status()
-                img_data = r.content
-                pixmap = QPixmap()
-                pixmap.loadFromData(img_data)
-                pixmap = pixmap.scaled(200, 200, Qt.KeepAspectRatio, Qt.SmoothTransformation)
-                screenshot_label.setPixmap(pixmap)
-            except Exception as e:
-                print(f"Error loading screenshot: {e}")
+        # Placeholders first; cached screenshots fill in right away, the rest as they download
+        self.screenshot_labels = {}
+        self.screenshot_keys = {}
+        self.enlarge_request = None
+        for img_url in detail.get("Screenshots", []):
+            screenshot_label = ClickableLabel("Loading...")
+            screenshot_label.setFixedSize(200, 200)
+            screenshot_label.setAlignment(Qt.AlignCenter)
             screenshot_label.clicked.connect(lambda url=img_url: self.enlarge_screenshot(url))
             self.detail_screenshots_layout.addWidget(screenshot_label)
+            self.screenshot_labels.setdefault(img_url, []).append(screenshot_label)
+            path = self.screenshots.request(img_url)
+            if path:
+                self.show_screenshot(img_url, path)
         current_zip = self.download_combo.itemText(0) if self.download_combo.count() > 0 else ""
         zip_path = os.path.join(MODS_FOLDER, current_zip)
         if os.path.exists(zip_path):
@@ -408,58 +272,101 @@ class BrowserTab(QWidget):
             self.detail_download_button.setText("Download")
             self.detail_download_button.setStyleSheet("")
             self.downloaded_indicator.hide()
-        self.browser_stack.setCurrentIndex(1)
 
+    def show_screenshot(self, img_url, path):
+        key, pixmap = self.thumbnails.request(path, 200, 200)
+        if pixmap is not None:
+            self.set_screenshot_pixmap(img_url, pixmap)
+        elif key is not None:
+            self.screenshot_keys[key] = img_url
+
+    def set_screenshot_pixmap(self, img_url, pixmap):
+        for label in self.screenshot_labels.get(img_url, []):
+            if pixmap.isNull():
+                label.setText("Unavailable")
+            else:
+                label.setPixmap(pixmap)
+
+    def on_screenshot_fetched(self, img_url, path, error):
+        if self.enlarge_request and self.enlarge_request[0] == img_url and self.enlarge_request[1] is None:
+            if error:
+                self.enlarge_request = None
+                QMessageBox.warning(self, "Error", f"Failed to load image: {error}")
+            else:
+                self.decode_enlarged(path)
+        if img_url not in self.screenshot_labels:
+            return
+        if error:
+            print(f"Error loading screenshot: {error}")
+            for label in self.screenshot_labels[img_url]:
+                label.setText("Unavailable")
+        else:
+            self.show_screenshot(img_url, path)
+
+    def on_thumbnail_ready(self, key):
+        if self.enlarge_request and self.enlarge_request[1] == key:
+            self.enlarge_request = None
+            self.show_enlarged(self.thumbnails.cache.get(key) or QPixmap())
+        img_url = self.screenshot_keys.pop(key, None)
+        if img_url is not None:
+            self.set_screenshot_pixmap(img_url, self.thumbnails.cache.get(key) or QPixmap())
+
+    @tracing.traced("browser.detail")
     def scrape_map_detail(self, url):
         detail = {}
         try:
-            r = requests.get(url, timeout=10)
-            r.raise_for_status()
-            soup = BeautifulSoup(r.text, "html.parser")
-            title_elem = soup.select_one("#toc2 > span")
-            detail["Title"] = title_elem.get_text(strip=True) if title_elem else ""
-            author_elem = soup.select_one("#page-content div.actualcontent_wrap div.new_leftside table tr:nth-child(1) td:nth-child(2)")
-            detail["Author"] = author_elem.get_text(strip=True) if author_elem else "Unknown"
-            rel_elem = soup.select_one("#page-content div.actualcontent_wrap div.new_leftside table tr:nth-child(2) td:nth-child(1)")
-            detail["Original Release"] = rel_elem.get_text(strip=True) if rel_elem else "Unknown"
-            posted_elem = soup.select_one("#page-content div.actualcontent_wrap div.new_leftside table tr:nth-child(3) td:nth-child(2)")
-            detail["Posted Date"] = posted_elem.get_text(strip=True) if posted_elem else "Unknown"
-            bsp_elem = soup.select_one("#page-content div.actualcontent_wrap div.new_leftside table tr:nth-child(4) td:nth-child(2)")
-            detail["BSP Filename"] = bsp_elem.get_text(strip=True) if bsp_elem else "Unknown"
-            downloads = []
-            dl_section = soup.select_one("#page-content div.dl div.collapsible-block-content")
-            if dl_section:
-                for a in dl_section.find_all("a", href=True):
-                    href = a["href"]
-                    if re.search(r"\.(zip|7z|rar)$", href, re.IGNORECASE):
-                        downloads.append(href)
-            detail["Download List"] = downloads
-            desc_elem = soup.select_one("#toc3")
-            description = ""
-            if desc_elem:
-                for sib in desc_elem.find_next_siblings():
-                    if sib.name == 'h2' and 'toc4' in sib.get("id", ""):
-                        break
-                    description += str(sib)
-            detail["Description"] = description.strip()
-            screenshots = []
-            gallery = soup.select_one(".gallery-box")
-            if gallery:
-                for a in gallery.find_all("a", href=True):
-                    screenshots.append(a["href"])
-            detail["Screenshots"] = screenshots
-            added_info = ""
-            info_elem = soup.select_one("#toc3")
-            if info_elem:
-                for sib in info_elem.find_next_siblings():
-                    if sib.name in ("h2", "h3") and "toc6" in sib.get("id", ""):
-                        break
-                    added_info += str(sib)
-            detail["Added Info"] = added_info.strip()
+            with tracing.span("browser.http", url=url):
+                r = requests.get(url, timeout=10)
+                r.raise_for_status()
+            self.parse_map_detail(r.text, detail)
         except Exception as e:
             print(f"Error scraping detail from {url}: {e}")
         return detail
 
+    @tracing.traced("browser.parse")
+    def parse_map_detail(self, page_html, detail):
+        soup = BeautifulSoup(page_html, "html.parser")
+        title_elem = soup.select_one("#toc2 > span")
+        detail["Title"] = title_elem.get_text(strip=True) if title_elem else ""
+        author_elem = soup.select_one("#page-content div.actualcontent_wrap div.new_leftside table tr:nth-child(1) td:nth-child(2)")
+        detail["Author"] = author_elem.get_text(strip=True) if author_elem else "Unknown"
+        rel_elem = soup.select_one("#page-content div.actualcontent_wrap div.new_leftside table tr:nth-child(2) td:nth-child(1)")
+        detail["Original Release"] = rel_elem.get_text(strip=True) if rel_elem else "Unknown"
+        posted_elem = soup.select_one("#page-content div.actualcontent_wrap div.new_leftside table tr:nth-child(3) td:nth-child(2)")
+        detail["Posted Date"] = posted_elem.get_text(strip=True) if posted_elem else "Unknown"
+        bsp_elem = soup.select_one("#page-content div.actualcontent_wrap div.new_leftside table tr:nth-child(4) td:nth-child(2)")
+        detail["BSP Filename"] = bsp_elem.get_text(strip=True) if bsp_elem else "Unknown"
+        downloads = []
+        dl_section = soup.select_one("#page-content div.dl div.collapsible-block-content")
+        if dl_section:
+            for a in dl_section.find_all("a", href=True):
+                href = a["href"]
+                if re.search(r"\.(zip|7z|rar)$", href, re.IGNORECASE):
+                    downloads.append(href)
+        detail["Download List"] = downloads
+        desc_elem = soup.select_one("#toc3")
+        description = ""
+        if desc_elem:
+            for sib in desc_elem.find_next_siblings():
+                if sib.name == 'h2' and 'toc4' in sib.get("id", ""):
+                    break
+                description += str(sib)
+        detail["Description"] = description.strip()
+        screenshots = []
+        gallery = soup.select_one(".gallery-box")
+        if gallery:
+            for a in gallery.find_all("a", href=True):
+                screenshots.append(a["href"])
+        detail["Screenshots"] = screenshots
+        added_info = ""
+        info_elem = soup.select_one("#toc3")
+        if info_elem:
+            for sib in info_elem.find_next_siblings():
+                if sib.name in ("h2", "h3") and "toc6" in sib.get("id", ""):
+                    break
+                added_info += str(sib)
+        detail["Added Info"] = added_info.strip()
+
     def download_selected_file(self):
         if self.detail_download_button.text() == "Delete":
             reply = QMessageBox.question(self, "Confirm Deletion",
@@ -488,98 +395,112 @@ class BrowserTab(QWidget):
         os.makedirs(target_folder, exist_ok=True)
         local_filename = url.split("/")[-1]
         target_path = os.path.join(target_folder, local_filename)
+        # Captured now, the detail page may show another map by the time the download finishes
+        download = {
+            "url": url,
+            "local_filename": local_filename,
+            "target_path": target_path,
+            "page_url": self.current_entry.get("Page URL", url),
+            "title": self.detail_title_label.text(),
+            "author": self.detail_author_label.text().replace("Author:", "").strip(),
+            "description": self.detail_desc_browser.toPlainText(),
+        }
+        self.detail_download_button.setEnabled(False)
+        self.download_progress.setRange(0, 0)
+        self.download_progress.show()
+        self.download_cancel_button.show()
+        self.download_jobs.submit(f"Downloading {local_filename}", download_file, url, target_path,
+                                  get_download_segments(),
+                                  on_finished=lambda result, errors, cancelled, download=download:
+                                  self.on_download_finished(download, result, errors, cancelled))
+
+    def on_download_progress(self, label, files_done, files_total, bytes_done, bytes_total, throughput):
+        if bytes_total:
+            # QProgressBar is int based, so track kilobytes
+            self.download_progress.setRange(0, max(1, bytes_total // 1024))
+            self.download_progress.setValue(min(bytes_done, bytes_total) // 1024)
+            self.download_status_label.setText(f"{human_file_size(bytes_done)} / {human_file_size(bytes_total)} "
+                                               f"({human_file_size(throughput)}/s)")
+        else:
+            self.download_status_label.setText(f"{human_file_size(bytes_done)} ({human_file_size(throughput)}/s)")
+
+    def on_download_finished(self, download, result, errors, cancelled):
+        self.detail_download_button.setEnabled(True)
+        self.download_progress.hide()
+        self.download_cancel_button.hide()
+        self.download_status_label.setText("")
+        if cancelled:
+            self.download_status_label.setText("Download paused, press Download again to resume.")
+            return
+        showing_same_map = self.current_entry.get("Page URL", download["url"]) == download["page_url"]
+        if result:
+            QMessageBox.information(self, "Download Complete", f"File downloaded to {download['target_path']}")
+            get_state().add_download(download["page_url"], {
+                "zipName": download["local_filename"],
+                "Title": download["title"],
+                "URL": download["url"]
+            })
+            self.write_download_metadata(download)
+            if showing_same_map:
+                self.detail_download_button.setText("Delete")
+                self.detail_download_button.setStyleSheet("background-color: red; color: white;")
+                self.downloaded_indicator.show()
+        else:
+            message = "\n".join(errors) if errors else "Unknown error"
+            QMessageBox.warning(self, "Download Error", f"Failed to download file: {message}")
+            self.write_download_metadata(download)
+
+    def write_download_metadata(self, download):
+        mod_folder_name = os.path.splitext(download["local_filename"])[0]
+        data_pack_folder = os.path.join(os.path.dirname(MODS_FOLDER), "data-pack", mod_folder_name)
+        os.makedirs(data_pack_folder, exist_ok=True)
+        mod_title = download["title"]
+        new_description = f"Author: {download['author']}\n\n{download['description']}"
+        info_data = {
+            "name": mod_title,
+            "description": new_description
+        }
+        info_json_path = os.path.join(data_pack_folder, "info.json")
+        with open(info_json_path, "w", encoding="utf-8") as f:
+            json.dump(info_data, f, indent=4, ensure_ascii=False)
+        cdn_list_path = os.path.join(os.path.dirname(MODS_FOLDER), "Data", "CDN_List.json")
+        thumbnail_path = ""
         try:
-            r = requests.get(url, stream=True, timeout=10)
-            r.raise_for_status()
-            with open(target_path, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
-            QMessageBox.information(self, "Download Complete", f"File downloaded to {target_path}")
-            cache = load_download_cache()
-            mod_url = self.current_entry.get("Page URL", url)
-            cache[mod_url] = {
-                "zipName": local_filename,
-                "Title": self.detail_title_label.text(),
-                "URL": url
-            }
-            save_download_cache(cache)
-            mod_folder_name = os.path.splitext(local_filename)[0]
-            data_pack_folder = os.path.join(os.path.dirname(MODS_FOLDER), "data-pack", mod_folder_name)
-            os.makedirs(data_pack_folder, exist_ok=True)
-            mod_title = self.detail_title_label.text()
-            author_text = self.detail_author_label.text().replace("Author:", "").strip()
-            description_text = self.detail_desc_browser.toPlainText()
-            new_description = f"Author: {author_text}\n\n{description_text}"
-            info_data = {
-                "name": mod_title,
-                "description": new_description
-            }
-            info_json_path = os.path.join(data_pack_folder, "info.json")
-            with open(info_json_path, "w", encoding="utf-8") as f:
-                json.dump(info_data, f, indent=4, ensure_ascii=False)
-            cdn_list_path = os.path.join(os.path.dirname(MODS_FOLDER), "Data", "CDN_List.json")
-            thumbnail_path = ""
-            try:
-                with open(cdn_list_path, "r", encoding="utf-8") as f:
-                    cdn_data = json.load(f)
-                for key, entry in cdn_data.items():
-                    if entry.get("Title", "") == mod_title:
-                        thumbnail_path = entry.get("Thumbnail", "")
-                        break
-            except Exception as e:
-                print(f"Error loading CDN_List.json: {e}")
-            if thumbnail_path and os.path.exists(thumbnail_path):
-                dest_thumb_path = os.path.join(data_pack_folder, "thumbnail.jpg")
-                try:
-                    shutil.copyfile(thumbnail_path, dest_thumb_path)
-                except Exception as e:
-                    print(f"Error copying thumbnail: {e}")
-            self.detail_download_button.setText("Delete")
-            self.detail_download_button.setStyleSheet("background-color: red; color: white;")
-            self.downloaded_indicator.show()
+            with open(cdn_list_path, "r", encoding="utf-8") as f:
+                cdn_data = json.load(f)
+            for key, entry in cdn_data.items():
+                if entry.get("Title", "") == mod_title:
+                    thumbnail_path = entry.get("Thumbnail", "")
+                    break
         except Exception as e:
-            QMessageBox.warning(self, "Download Error", f"Failed to download file: {e}")
-            mod_folder_name = os.path.splitext(local_filename)[0]
-            data_pack_folder = os.path.join(os.path.dirname(MODS_FOLDER), "data-pack", mod_folder_name)
-            os.makedirs(data_pack_folder, exist_ok=True)
-            mod_title = self.detail_title_label.text()
-            author_text = self.detail_author_label.text().replace("Author:", "").strip()
-            description_text = self.detail_desc_browser.toPlainText()
-            new_description = f"Author: {author_text}\n\n{description_text}"
-            info_data = {
-                "name": mod_title,
-                "description": new_description
-            }
-            info_json_path = os.path.join(data_pack_folder, "info.json")
-            with open(info_json_path, "w", encoding="utf-8") as f:
-                json.dump(info_data, f, indent=4, ensure_ascii=False)
-            cdn_list_path = os.path.join(os.path.dirname(MODS_FOLDER), "Data", "CDN_List.json")
-            thumbnail_path = ""
+            print(f"Error loading CDN_List.json: {e}")
+        if thumbnail_path and os.path.exists(thumbnail_path):
+            dest_thumb_path = os.path.join(data_pack_folder, "thumbnail.jpg")
             try:
-                with open(cdn_list_path, "r", encoding="utf-8") as f:
-                    cdn_data = json.load(f)
-                for key, entry in cdn_data.items():
-                    if entry.get("Title", "") == mod_title:
-                        thumbnail_path = entry.get("Thumbnail", "")
-                        break
+                shutil.copyfile(thumbnail_path, dest_thumb_path)
             except Exception as e:
-                print(f"Error loading CDN_List.json: {e}")
-            if thumbnail_path and os.path.exists(thumbnail_path):
-                dest_thumb_path = os.path.join(data_pack_folder, "thumbnail.jpg")
-                try:
-                    shutil.copyfile(thumbnail_path, dest_thumb_path)
-                except Exception as e:
-                    print(f"Error copying thumbnail: {e}")
+                print(f"Error copying thumbnail: {e}")
 
     def enlarge_screenshot(self, img_url):
-        try:
-            r = requests.get(img_url, timeout=10)
-            r.raise_for_status()
-            pixmap = QPixmap()
-            pixmap.loadFromData(r.content)
-        except Exception as e:
-            QMessageBox.warning(self, "Error", f"Failed to load image: {e}")
+        # Fetched (usually already cached by the gallery) and decoded off the GUI thread; the
+        # dialog opens from on_screenshot_fetched / on_thumbnail_ready. A later click replaces it.
+        self.enlarge_request = (img_url, None, int(self.width() * 0.5), int(self.height() * 0.5))
+        path = self.screenshots.request(img_url)
+        if path:
+            self.decode_enlarged(path)
+
+    def decode_enlarged(self, path):
+        img_url, _, max_width, max_height = self.enlarge_request
+        key, pixmap = self.thumbnails.request(path, max_width, max_height)
+        if pixmap is not None or key is None:
+            self.enlarge_request = None
+            self.show_enlarged(pixmap or QPixmap())
+        else:
+            self.enlarge_request = (img_url, key, max_width, max_height)
+
+    def show_enlarged(self, pixmap):
+        if pixmap.isNull():
+            QMessageBox.warning(self, "Error", "Failed to load image: unsupported image data")
             return
         max_width = int(self.width() * 0.5)
         max_height = int(self.height() * 0.5)
@@ -0,0 +1,229 @@
+import os, sys, json, argparse, contextlib
+
+# Exit codes: 0 success, 1 the operation reported errors, 2 bad usage (argparse)
+
+
+def error(code, message, **details):
+    return dict(code=code, message=message, **details)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Manage Sven Co-op mods without the GUI.")
+    parser.add_argument("--home", help="folder holding Mods/, Data/ and config.json (default: the install folder)")
+    parser.add_argument("--json", action="store_true", help="print one JSON result object instead of text")
+    parser.add_argument("--target", action="append", metavar="NAME",
+                        help="game target to work on (repeatable; default: the default target)")
+    parser.add_argument("--all-targets", action="store_true", help="run the command on every game target in parallel")
+    commands = parser.add_subparsers(dest="command", required=True)
+    list_cmd = commands.add_parser("list", help="list the archives in Mods/")
+    list_cmd.add_argument("--enabled", action="store_true", help="only enabled mods")
+    for name, verb in (("enable", "deploy"), ("disable", "undeploy")):
+        cmd = commands.add_parser(name, help=f"{verb} mods and update Enabled.json")
+        cmd.add_argument("mods", nargs="*", help="mod names (archive names without extension)")
+        cmd.add_argument("--all", action="store_true", help=f"{verb} every mod")
+    commands.add_parser("sync", help="make svencoop_addon match Enabled.json")
+    verify_cmd = commands.add_parser("verify", help="check svencoop_addon against the enabled archives")
+    verify_cmd.add_argument("--rehash", action="store_true",
+                            help="read every file, not only the ones changed since the last check")
+    repair_cmd = commands.add_parser("repair", help="rewrite the files verify reports as missing or modified")
+    repair_cmd.add_argument("--remove-extra", action="store_true",
+                            help="also delete files no enabled mod deploys")
+    repair_cmd.add_argument("--rehash", action="store_true", help="read every file when looking for drift")
+    profile_cmd = commands.add_parser("profile", help="list, save, switch to or delete named mod sets")
+    profile_cmd.add_argument("action", choices=["list", "save", "switch", "delete"])
+    profile_cmd.add_argument("name", nargs="?", help="profile name (not needed for list)")
+    targets_cmd = commands.add_parser("targets", help="list, add or remove game targets")
+    targets_cmd.add_argument("action", choices=["list", "add", "remove"])
+    targets_cmd.add_argument("name", nargs="?", help="target name")
+    targets_cmd.add_argument("game_folder", nargs="?", help="game folder holding svencoop_addon (add only)")
+    return parser
+
+
+# --- Subcommands; each returns (data, errors) ---
+def cmd_list(args, md, context):
+    mods = [mod for mod in md.get_mod_list() if mod["enabled"] or not args.enabled]
+    return [{
+        "name": mod["orig_mod_name"],
+        "displayed_name": mod["displayed_name"],
+        "enabled": mod["enabled"],
+        "size": mod["size_raw"],
+        "extracted_size": mod["extracted_size"],
+        "files": mod["file_count"],
+    } for mod in mods], []
+
+
+def _resolve(args, names):
+    # Unknown names are errors rather than silently skipped
+    if args.all:
+        return names, []
+    known = set(names)
+    return [m for m in args.mods if m in known], [error("unknown_mod", f"Unknown mod: {m}", mod=m)
+                                               for m in args.mods if m not in known]
+
+
+def cmd_enable(args, md, context):
+    mod_names, errors = _resolve(args, [mod["orig_mod_name"] for mod in md.get_mod_list()])
+    mods = [{"orig_mod_name": m, "archive_path": md.find_mod_archive(m)} for m in mod_names]
+    if not mods:
+        return {"enabled": []}, errors
+    # Own context so the free-text warnings don't come back as "operation" errors; the per-mod
+    # summary carries the same failures with their codes
+    enable_context = context.child()
+    summary = md.enable_all_mods(mods, enable_context)
+    if summary is False:
+        return {"enabled": []}, errors + [error("not_configured", message) for message in enable_context.errors]
+    failed = [entry for entry in summary if entry["error"]]
+    errors += [error(entry["code"], f"{entry['error']} ({entry['mod']})", mod=entry["mod"]) for entry in failed]
+    return {"enabled": [entry["mod"] for entry in summary if not entry["error"]]}, errors
+
+
+def cmd_disable(args, md, context):
+    if args.all:
+        md.disable_all_mods(context)
+        return {"disabled": "all"}, []
+    # Enabled mods whose archive is gone can still be disabled
+    known = [mod["orig_mod_name"] for mod in md.get_mod_list()] + md._load_enabled()
+    mod_names, errors = _resolve(args, list(dict.fromkeys(known)))
+    with md.get_state().batch():
+        for mod_name in mod_names:
+            md.disable_mod(mod_name, context)
+    return {"disabled": mod_names}, errors
+
+
+def cmd_sync(args, md, context):
+    return md.sync_addon(context), []
+
+
+def cmd_verify(args, md, context):
+    report = md.verify_addon(context, rehash=args.rehash)
+    errors = []
+    if report:
+        errors += [error("missing_file", f"Missing file: {relpath}", path=relpath)
+                   for relpath in report["missing_files"]]
+        errors += [error("modified_file", f"Modified file: {relpath}", path=relpath)
+                   for relpath in report["modified_files"]]
+        errors += [error("extra_file", f"Extra file: {relpath}", path=relpath) for relpath in report["extra_files"]]
+        errors += [error("not_deployed", f"Enabled but not deployed: {m}", mod=m) for m in report["not_deployed"]]
+        errors += [error("not_enabled", f"Deployed but not enabled: {m}", mod=m) for m in report["not_enabled"]]
+        errors += [error("missing_archive", f"Archive not found: {m}", mod=m) for m in report["missing_archives"]]
+    return report, errors
+
+
+def cmd_repair(args, md, context):
+    result = md.repair_addon(context, remove_extra=args.remove_extra, rehash=args.rehash)
+    errors = []
+    if result:
+        errors += [error("repair_failed", f"Could not repair: {relpath}", path=relpath) for relpath in result["failed"]]
+    return result, errors
+
+
+def cmd_profile(args, md, context):
+    if args.action == "list":
+        return md.load_profiles(), []
+    if not args.name:
+        return None, [error("usage", f"profile {args.action} needs a profile name")]
+    if args.action == "save":
+        md.save_profile(args.name)
+        return {"saved": args.name, "mods": md.load_profiles()[args.name]}, []
+    if args.action == "delete":
+        if args.name not in md.load_profiles():
+            return None, [error("unknown_profile", f"Profile {args.name} not found.", profile=args.name)]
+        md.delete_profile(args.name)
+        return {"deleted": args.name}, []
+    return md.switch_profile(args.name, context), []
+
+
+def cmd_targets(args, md, context):
+    if args.action == "list":
+        return md.get_targets(), []
+    if not args.name or (args.action == "add" and not args.game_folder):
+        return None, [error("usage", f"targets {args.action} needs a target name"
+                                      + (" and a game folder" if args.action == "add" else ""))]
+    if args.action == "add":
+        return ({"added": args.name} if md.add_target(args.name, args.game_folder, context) else None), []
+    if not md.remove_target(args.name):
+        return None, [error("unknown_target", f"Target {args.name} not found.", target=args.name)]
+    return {"removed": args.name}, []
+
+
+def _archives_to_deploy(command, args, md):
+    # Archives a subcommand may deploy, imported into the store once before fanning out to targets
+    if command == "enable":
+        names = [mod["orig_mod_name"] for mod in md.get_mod_list()] if args.all else args.mods
+    elif command == "profile" and args.action == "switch":
+        names = md.load_profiles().get(args.name, [])
+    else:
+        return None
+    return [path for path in map(md.find_mod_archive, names) if path]
+
+
+def run_on_targets(command, args, md, context, targets):
+    # Same subcommand on several game targets at once; data and errors are keyed by target
+    results = md.run_on_targets(lambda child: COMMANDS[command](args, md, child), targets=targets,
+                                parent_widget=context, archives=_archives_to_deploy(command, args, md))
+    data = {target: result[0] if result else None for target, result in results.items()}
+    errors = [dict(entry, target=target) for target, result in results.items() if result for entry in result[1]]
+    return data, errors
+
+
+COMMANDS = {"list": cmd_list, "enable": cmd_enable, "disable": cmd_disable, "sync": cmd_sync, "verify": cmd_verify,
+            "repair": cmd_repair, "profile": cmd_profile, "targets": cmd_targets}
+
+
+def print_text(args, data):
+    if (args.target or args.all_targets) and args.command != "targets":
+        for target, target_data in (data or {}).items():
+            print(f"== {target} ==")
+            print_text(argparse.Namespace(**dict(vars(args), target=None, all_targets=False)), target_data)
+        return
+    if args.command == "list":
+        for mod in data:
+            size = f"{mod['size'] / (1024 * 1024):.1f} MB"
+            print(f"[{'x' if mod['enabled'] else ' '}] {mod['name']:<40} {size:>10}  {mod['displayed_name']}")
+    elif args.command == "profile" and args.action == "list":
+        for name, mods in data.items():
+            print(f"{name} ({len(mods)} mods)")
+    elif isinstance(data, dict):
+        for key, value in data.items():
+            if isinstance(value, list):
+                # Long file lists (verify, repair) are counted; the paths are in --json and the errors
+                value = (", ".join(value) if len(value) <= 20 else f"{len(value)} files") if value else "-"
+            print(f"{key}: {value}")
+
+
+def run(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.home:
+        os.environ["SVEN_MODMANAGER_HOME"] = os.path.abspath(args.home)
+    # Imported after --home is applied; mod_data resolves its paths at import time
+    from modmanager import mod_data as md
+    from modmanager.operations import OperationContext
+    context = OperationContext()
+    # Core functions print the odd error; keep stdout for the result itself
+    with contextlib.redirect_stdout(sys.stderr):
+        try:
+            targets = list(md.get_targets()) if args.all_targets else args.target
+            unknown = [t for t in targets or () if t not in md.get_targets()]
+            if unknown:
+                data, errors = None, [error("unknown_target", f"Target {t} not found.", target=t) for t in unknown]
+            elif targets and args.command != "targets":
+                data, errors = run_on_targets(args.command, args, md, context, targets)
+            else:
+                data, errors = COMMANDS[args.command](args, md, context)
+        except Exception as e:
+            data, errors = None, [error("exception", f"{type(e).__name__}: {e}")]
+        md.get_state().flush()
+    # Warnings collected by the core functions are free text
+    errors = [error("operation", message) for message in context.errors] + errors
+    result = {"command": args.command, "ok": not errors, "data": data, "errors": errors}
+    if args.json:
+        print(json.dumps(result, indent=2, ensure_ascii=False))
+    else:
+        print_text(args, data)
+        for entry in errors:
+            print(f"error: {entry['message']}", file=sys.stderr)
+    return 0 if result["ok"] else 1
+
+
+def main():
+    sys.exit(run())
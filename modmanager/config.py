@@ -1,18 +1,12 @@
-import os, json
-from modmanager.mod_data import CONFIG_FILE
+from modmanager.mod_data import get_state
 
 def load_config():
-    try:
-        with open(CONFIG_FILE, "r") as f:
-            config = json.load(f)
-        return config
-    except Exception as e:
-        print("Error loading config:", e)
-        return {"Game_Folder": ""}
+    config = get_state().get_config()
+    config.setdefault("Game_Folder", "")
+    return config
 
 def save_config(config):
     try:
-        with open(CONFIG_FILE, "w") as f:
-            json.dump(config, f, indent=4)
+        get_state().set_config(config)
     except Exception as e:
         print("Error saving config:", e)
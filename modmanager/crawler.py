@@ -0,0 +1,235 @@
+import os, json, re, threading, time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup
+from modmanager.operations import OperationCancelled
+from modmanager import tracing
+
+BASE_URL = "http://scmapdb.wikidot.com"
+TIMEOUT = 10
+# How often (seconds) the partial CDN_List.json is rewritten while crawling
+FLUSH_INTERVAL = 2.0
+
+
+def partial_path(cdn_list_path):
+    return cdn_list_path + ".partial"
+
+
+def make_session(max_per_host=4):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_per_host)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+class HostLimiter:
+    # Caps in-flight requests per host, shared by the page and thumbnail stages
+    def __init__(self, per_host):
+        self.per_host = per_host
+        self._semaphores = {}
+        self._lock = threading.Lock()
+
+    def get(self, session, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            semaphore = self._semaphores.setdefault(host, threading.Semaphore(self.per_host))
+        with semaphore:
+            r = session.get(url, timeout=TIMEOUT)
+            r.raise_for_status()
+            return r
+
+
+def parse_total_pages(page_html):
+    soup = BeautifulSoup(page_html, "html.parser")
+    page_info = soup.select_one("#page-content div.list-pages-box > p")
+    if page_info:
+        try:
+            return int(page_info.get_text(strip=True).split()[-1])
+        except:
+            pass
+    return 1
+
+
+def parse_listing_page(page_html, base_url=BASE_URL):
+    # [(title, page url, tags, thumbnail url), ...] in page order
+    items = []
+    page_soup = BeautifulSoup(page_html, "html.parser")
+    for item in page_soup.find_all('div', class_='list-pages-item'):
+        try:
+            title_tag = item.select_one("div.lister-item-title p a")
+            if not title_tag:
+                continue
+            title = title_tag.get_text(strip=True)
+            page_href = title_tag.get("href", "")
+            if not page_href.startswith("http"):
+                page_href = base_url + page_href
+            tags_tag = item.select_one("div.lister-item-tags p")
+            tags_text = tags_tag.get_text(" ", strip=True) if tags_tag else ""
+            thumb_tag = item.select_one("div.lister-item-image a img")
+            src = ""
+            if thumb_tag:
+                src = thumb_tag.get("src", "")
+                if src and not src.startswith("http"):
+                    src = base_url + src
+            items.append((title, page_href, tags_text, src))
+        except Exception as e:
+            print(f"Error processing an item: {e}")
+    return items
+
+
+# --- Concurrent crawl of tag:all into CDN_List.json ---
+# Listing pages are fetched in parallel and each page's thumbnails are queued as soon as it
+# is parsed, so page and image downloads overlap. Finished pages are flushed to
+# CDN_List.json (in page order) as the crawl goes, so an interrupted crawl is still usable;
+# <cdn_list>.partial marks such a list so the next start finishes it from the page cache.
+class CdnCrawler:
+    def __init__(self, cdn_list_path, cache_html_dir, cache_thumb_dir, base_url=BASE_URL, session=None,
+                 max_per_host=4, context=None):
+        self.cdn_list_path = cdn_list_path
+        self.cache_html_dir = cache_html_dir
+        self.cache_thumb_dir = cache_thumb_dir
+        self.base_url = base_url
+        self.max_per_host = max_per_host
+        self.session = session or make_session(max_per_host)
+        self.limiter = HostLimiter(max_per_host)
+        self.context = context
+        self.pages = {}
+        self.failed_pages = []
+        self._lock = threading.Lock()
+        self._last_flush = 0.0
+        self.stats = {"pages": 0, "thumbnails": 0, "bytes": 0, "seconds": 0.0}
+        # Fetches run on the pools, so their spans are hung under the crawl's explicitly
+        self.trace_span = None
+
+    def _fetch(self, url):
+        if self.context and self.context.cancelled:
+            raise OperationCancelled()
+        with tracing.span("crawler.fetch", self.trace_span, url=url):
+            r = self.limiter.get(self.session, url)
+        with self._lock:
+            self.stats["bytes"] += len(r.content)
+        return r
+
+    def _page_html(self, p):
+        cache_file = os.path.join(self.cache_html_dir, f"page_{p}.html")
+        if os.path.exists(cache_file):
+            with open(cache_file, "r", encoding="utf-8") as f:
+                return f.read()
+        page_html = self._fetch(f"{self.base_url}/tag:all/p/{p}").text
+        with open(cache_file, "w", encoding="utf-8") as f:
+            f.write(page_html)
+        return page_html
+
+    def _fetch_thumbnail(self, src, thumb_local_path, entry):
+        try:
+            content = self._fetch(src).content
+            tmp_path = thumb_local_path + ".tmp"
+            with open(tmp_path, "wb") as img_file:
+                img_file.write(content)
+            os.replace(tmp_path, thumb_local_path)
+            with self._lock:
+                self.stats["thumbnails"] += 1
+        except Exception as e:
+            if not isinstance(e, OperationCancelled):
+                print(f"Failed to download thumbnail for {entry['Title']}: {e}")
+            with self._lock:
+                entry["Thumbnail"] = ""
+
+    def total_pages(self):
+        # Read from page 1, which comes from the HTML cache when it was crawled before
+        return parse_total_pages(self._page_html(1))
+
+    @tracing.traced("crawl")
+    def run(self):
+        self.trace_span = tracing.current_span()
+        start = time.perf_counter()
+        os.makedirs(self.cache_html_dir, exist_ok=True)
+        os.makedirs(self.cache_thumb_dir, exist_ok=True)
+        open(partial_path(self.cdn_list_path), "w").close()
+        total_pages = self.total_pages()
+        if self.context:
+            self.context.add_total(total_pages)
+        thumb_futures = []
+        try:
+            self._crawl(total_pages, thumb_futures)
+        finally:
+            self.flush(force=True)
+            self.stats["seconds"] = time.perf_counter() - start
+        if not self.failed_pages:
+            os.remove(partial_path(self.cdn_list_path))
+        return self.entries()
+
+    def _crawl(self, total_pages, thumb_futures):
+        with ThreadPoolExecutor(max_workers=self.max_per_host) as page_pool, \
+                ThreadPoolExecutor(max_workers=self.max_per_host) as thumb_pool:
+            page_futures = {page_pool.submit(self._page_html, p): p for p in range(1, total_pages + 1)}
+            for future in as_completed(page_futures):
+                p = page_futures[future]
+                try:
+                    page_html = future.result()
+                except OperationCancelled:
+                    raise
+                except Exception as e:
+                    print(f"Failed to retrieve page {p}: {e}")
+                    self.failed_pages.append(p)
+                    continue
+                entries = []
+                with tracing.span("crawler.parse", page=p):
+                    rows = parse_listing_page(page_html, self.base_url)
+                for title, page_href, tags_text, src in rows:
+                    entry = {"Title": title, "Page URL": page_href, "Tags": tags_text, "Thumbnail": ""}
+                    if src:
+                        safe_title = re.sub(r'[^A-Za-z0-9_-]', '_', title)
+                        thumb_local_path = os.path.join(self.cache_thumb_dir, f"{safe_title}_{p}.jpg")
+                        entry["Thumbnail"] = thumb_local_path
+                        if not os.path.exists(thumb_local_path):
+                            thumb_futures.append(thumb_pool.submit(self._fetch_thumbnail, src,
+                                                                   thumb_local_path, entry))
+                    entries.append(entry)
+                with self._lock:
+                    self.pages[p] = entries
+                    self.stats["pages"] += 1
+                self.flush()
+                if self.context:
+                    self.context.advance(1)
+            for future in thumb_futures:
+                future.result()
+            if self.context:
+                self.context.check_cancelled()
+
+    def entries(self):
+        all_entries = {}
+        with self._lock:
+            for p in sorted(self.pages):
+                for entry in self.pages[p]:
+                    title = entry["Title"]
+                    key = title
+                    count = 1
+                    while key in all_entries:
+                        key = f"{title}_{count}"
+                        count += 1
+                    all_entries[key] = dict(entry)
+        return all_entries
+
+    def flush(self, force=False):
+        now = time.perf_counter()
+        if not force and now - self._last_flush < FLUSH_INTERVAL:
+            return
+        self._last_flush = now
+        tmp_path = self.cdn_list_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.entries(), f, indent=4, ensure_ascii=False)
+        os.replace(tmp_path, self.cdn_list_path)
+
+
+def crawl_cdn_list(cdn_list_path, cache_html_dir, cache_thumb_dir, max_per_host=4, context=None):
+    crawler = CdnCrawler(cdn_list_path, cache_html_dir, cache_thumb_dir, max_per_host=max_per_host,
+                         context=context)
+    entries = crawler.run()
+    if crawler.failed_pages and context:
+        context.warn(f"{len(crawler.failed_pages)} content list page(s) could not be loaded; "
+                     "they will be retried next start.")
+    return len(entries)
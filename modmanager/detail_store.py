@@ -0,0 +1,76 @@
+import os, json, sqlite3, threading, time
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS details (
+    title TEXT PRIMARY KEY,
+    page_url TEXT,
+    scraped_at REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS details_page_url ON details (page_url);
+"""
+
+
+# --- Scraped map detail pages, one row per map title ---
+# Replaces the single CDN_Content.json: a lookup reads one row and a new page is one
+# INSERT, so neither gets slower as more detail pages are cached.
+class DetailStore:
+    def __init__(self, db_path, legacy_json=None):
+        self.db_path = db_path
+        self.legacy_json = legacy_json
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(SCHEMA)
+            self._import_legacy()
+        return self._conn
+
+    def _import_legacy(self):
+        # One-time move of an existing CDN_Content.json into the table
+        if not self.legacy_json or not os.path.exists(self.legacy_json):
+            return
+        try:
+            with open(self.legacy_json, "r", encoding="utf-8") as f:
+                content_data = json.load(f)
+        except Exception as e:
+            print(f"Error reading {self.legacy_json}: {e}")
+            return
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO details (title, page_url, scraped_at, data) VALUES (?, ?, ?, ?)",
+                [(title, None, now, json.dumps(detail, ensure_ascii=False))
+                 for title, detail in content_data.items() if isinstance(detail, dict)])
+        os.replace(self.legacy_json, self.legacy_json + ".migrated")
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get(self, title):
+        with self._lock:
+            row = self._connect().execute("SELECT data FROM details WHERE title = ?", (title,)).fetchone()
+        if row is None:
+            return None
+        try:
+            return json.loads(row[0])
+        except ValueError:
+            return None
+
+    def put(self, title, detail, page_url=None):
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO details (title, page_url, scraped_at, data) VALUES (?, ?, ?, ?)",
+                             (title, page_url, time.time(), json.dumps(detail, ensure_ascii=False)))
+
+    def count(self):
+        with self._lock:
+            return self._connect().execute("SELECT COUNT(*) FROM details").fetchone()[0]
@@ -0,0 +1,216 @@
+import os, json, re, threading, zipfile
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+CHUNK_SIZE = 256 * 1024
+# Files smaller than this are fetched with a single (still resumable) request
+SEGMENT_MIN_SIZE = 8 * 1024 * 1024
+TIMEOUT = 10
+
+
+class DownloadError(Exception):
+    pass
+
+
+def _probe(session, url):
+    # (total size or None, whether the server honours Range requests)
+    r = session.get(url, headers={"Range": "bytes=0-0"}, stream=True, timeout=TIMEOUT)
+    try:
+        r.raise_for_status()
+        if r.status_code == 206:
+            match = re.search(r"/(\d+)$", r.headers.get("Content-Range", ""))
+            return (int(match.group(1)) if match else None), True
+        length = r.headers.get("Content-Length")
+        return (int(length) if length and length.isdigit() else None), False
+    finally:
+        r.close()
+
+
+def _state_path(part_path):
+    return part_path + ".json"
+
+
+def _read_state(part_path):
+    try:
+        with open(_state_path(part_path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _load_state(part_path, url, size, segments):
+    # Only a segment map for the same file, split the same way, can be resumed
+    state = _read_state(part_path)
+    if state and state.get("url") == url and state.get("size") == size and state.get("layout") == segments \
+            and os.path.exists(part_path):
+        return state
+    return None
+
+
+def _written_prefix(state, url, size):
+    # Bytes at the start of a segmented .part that are really there: the .part itself is
+    # preallocated to the full size, so its length says nothing
+    if not state or state.get("url") != url or state.get("size") != size:
+        return 0
+    done = 0
+    for segment in sorted(state.get("segments", []), key=lambda s: s["start"]):
+        if segment["start"] != done:
+            break
+        done += segment["done"]
+        if segment["done"] < segment["end"] - segment["start"] + 1:
+            break
+    return done
+
+
+def _save_state(part_path, state):
+    tmp_path = _state_path(part_path) + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, _state_path(part_path))
+
+
+def _download_single(session, url, part_path, size, resumable, context):
+    offset = os.path.getsize(part_path) if resumable and os.path.exists(part_path) else 0
+    if size is not None and offset > size:
+        offset = 0
+    headers = {"Range": f"bytes={offset}-"} if offset else {}
+    r = session.get(url, headers=headers, stream=True, timeout=TIMEOUT)
+    try:
+        if r.status_code == 416 and size is not None and offset == size:
+            return
+        r.raise_for_status()
+        if offset and r.status_code != 206:
+            offset = 0
+        if context:
+            context.report(0, offset)
+        with open(part_path, "ab" if offset else "wb") as f:
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                if chunk:
+                    f.write(chunk)
+                    if context:
+                        context.advance(0, len(chunk))
+    finally:
+        r.close()
+
+
+def _download_segment(session, url, part_path, segment, state, lock, context):
+    start, end = segment["start"], segment["end"]
+    if segment["done"] >= end - start + 1:
+        return
+    headers = {"Range": f"bytes={start + segment['done']}-{end}"}
+    r = session.get(url, headers=headers, stream=True, timeout=TIMEOUT)
+    try:
+        r.raise_for_status()
+        if r.status_code != 206:
+            raise DownloadError("Server stopped honouring range requests")
+        with open(part_path, "r+b") as f:
+            f.seek(start + segment["done"])
+            unsaved = 0
+            for chunk in r.iter_content(chunk_size=CHUNK_SIZE):
+                if not chunk:
+                    continue
+                f.write(chunk)
+                with lock:
+                    segment["done"] += len(chunk)
+                unsaved += len(chunk)
+                if unsaved >= 4 * CHUNK_SIZE:
+                    f.flush()
+                    with lock:
+                        _save_state(part_path, state)
+                    unsaved = 0
+                if context:
+                    context.advance(0, len(chunk))
+            f.flush()
+    finally:
+        r.close()
+        with lock:
+            _save_state(part_path, state)
+
+
+def _download_segmented(session, url, part_path, size, segments, context):
+    state = _load_state(part_path, url, size, segments)
+    if state is None:
+        # Nothing to resume, or it was split differently (Download_Segments changed): start over
+        with open(part_path, "wb") as f:
+            f.truncate(size)
+        step = -(-size // segments)
+        state = {"url": url, "size": size, "layout": segments, "segments": [
+            {"start": start, "end": min(start + step, size) - 1, "done": 0} for start in range(0, size, step)]}
+        _save_state(part_path, state)
+    if context:
+        context.report(0, sum(s["done"] for s in state["segments"]))
+    lock = threading.Lock()
+    with ThreadPoolExecutor(max_workers=len(state["segments"])) as pool:
+        futures = [pool.submit(_download_segment, session, url, part_path, segment, state, lock, context)
+                   for segment in state["segments"]]
+        errors = []
+        for future in futures:
+            try:
+                future.result()
+            except Exception as e:
+                errors.append(e)
+    if errors:
+        raise errors[0]
+    if any(s["done"] != s["end"] - s["start"] + 1 for s in state["segments"]):
+        raise DownloadError("Download incomplete")
+
+
+def verify_archive(path, archive_name=None):
+    # Raises DownloadError when the archive is truncated or fails its CRC checks
+    name = (archive_name or path).lower()
+    try:
+        if name.endswith(".zip"):
+            with zipfile.ZipFile(path, "r") as zip_ref:
+                bad = zip_ref.testzip()
+            if bad:
+                raise DownloadError(f"Corrupt member in zip archive: {bad}")
+        elif name.endswith(".7z"):
+            import py7zr
+            with py7zr.SevenZipFile(path, mode="r") as z:
+                bad = z.testzip()
+            if bad:
+                raise DownloadError(f"Corrupt member in 7z archive: {bad}")
+    except DownloadError:
+        raise
+    except Exception as e:
+        raise DownloadError(f"Downloaded archive is damaged: {e}")
+
+
+# --- Resumable, segmented download into Mods/ ---
+# Data goes to <target>.part (plus a .part.json segment map when split into ranges), so an
+# interrupted or cancelled download continues where it stopped. A changed segment count restarts
+# a segmented download; a single request keeps what a segmented attempt got from the start. The file is only moved to
+# target_path once its size and archive integrity check out.
+def download_file(url, target_path, segments=4, context=None, session=None):
+    session = session or requests.Session()
+    part_path = target_path + ".part"
+    size, ranges = _probe(session, url)
+    if context:
+        context.add_total(1, size or 0)
+    if ranges and size and size >= SEGMENT_MIN_SIZE and segments > 1:
+        _download_segmented(session, url, part_path, size, segments, context)
+    else:
+        if os.path.exists(_state_path(part_path)):
+            # Left by a segmented attempt; a single request can only carry on from its contiguous head
+            prefix = _written_prefix(_read_state(part_path), url, size)
+            if os.path.exists(part_path):
+                with open(part_path, "r+b") as f:
+                    f.truncate(prefix)
+            os.remove(_state_path(part_path))
+        _download_single(session, url, part_path, size, ranges, context)
+    if size is not None and os.path.getsize(part_path) != size:
+        raise DownloadError(f"Expected {size} bytes but received {os.path.getsize(part_path)}")
+    try:
+        verify_archive(part_path, target_path)
+    except DownloadError:
+        # A damaged file can't be resumed into a good one
+        os.remove(part_path)
+        if os.path.exists(_state_path(part_path)):
+            os.remove(_state_path(part_path))
+        raise
+    os.replace(part_path, target_path)
+    if os.path.exists(_state_path(part_path)):
+        os.remove(_state_path(part_path))
+    if context:
+        context.report(1, 0)
+    return target_path
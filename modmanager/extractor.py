@@ -0,0 +1,364 @@
+import os, time, zlib, zipfile, multiprocessing
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, CancelledError
+from modmanager.manifest import normalize_member
+from modmanager.operations import OperationCancelled
+from modmanager import tracing
+
+
+def list_archive_details(archive_file):
+    # relpath -> (uncompressed size, crc32) for every file member; reads only the archive header
+    files = {}
+    if archive_file.endswith(".zip"):
+        with zipfile.ZipFile(archive_file, 'r') as zip_ref:
+            for info in zip_ref.infolist():
+                relpath = normalize_member(info.filename)
+                if relpath and not info.is_dir():
+                    files[relpath] = (info.file_size, info.CRC)
+    elif archive_file.endswith(".7z"):
+        import py7zr
+        with py7zr.SevenZipFile(archive_file, mode='r') as z:
+            for entry in z.list():
+                relpath = normalize_member(entry.filename)
+                if relpath and not entry.is_directory:
+                    files[relpath] = (entry.uncompressed or 0, entry.crc32)
+    return files
+
+
+def file_crc32(path):
+    # Same checksum the archive headers store per member; zlib releases the GIL on large chunks
+    crc = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+# --- Skipping members that are already deployed ---
+# stamps: relpath -> [size, mtime_ns, crc32] of the deployed file, recorded right after it was
+# written (or checked). A member whose CRC32 and size match the stamp, on a file whose size and
+# mtime haven't moved since, is already on disk and isn't written again.
+def unchanged_files(addon_folder, details, relpaths, stamps):
+    unchanged = set()
+    for relpath in relpaths:
+        stamp = stamps.get(relpath)
+        size, crc = details.get(relpath, (None, None))
+        if not stamp or crc is None or stamp[0] != size or stamp[2] != crc:
+            continue
+        try:
+            st = os.stat(os.path.join(addon_folder, *relpath.split("/")))
+        except OSError:
+            continue
+        if st.st_size == stamp[0] and st.st_mtime_ns == stamp[1]:
+            unchanged.add(relpath)
+    return unchanged
+
+
+def stamp_files(addon_folder, details, relpaths, stamps):
+    for relpath in relpaths:
+        crc = details.get(relpath, (None, None))[1]
+        try:
+            st = os.stat(os.path.join(addon_folder, *relpath.split("/")))
+        except OSError:
+            crc = None
+        if crc is None:
+            stamps.pop(relpath, None)
+        else:
+            stamps[relpath] = [st.st_size, st.st_mtime_ns, crc]
+
+
+def list_archive(archive_file):
+    # relpath -> uncompressed size
+    return {relpath: size for relpath, (size, crc) in list_archive_details(archive_file).items()}
+
+
+def _unlink_existing(addon_folder, relpath):
+    # Replace rather than overwrite: a deployed file may be a hardlink into the shared store
+    target = os.path.join(addon_folder, *relpath.split("/"))
+    if os.path.isfile(target) and os.stat(target).st_nlink > 1:
+        os.unlink(target)
+
+
+class _ProgressWriter:
+    # py7zr writer that streams a member straight to disk, reporting bytes as they are written
+    def __init__(self, filename, progress):
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        self._file = open(filename, "wb")
+        self._progress = progress
+        self._size = 0
+
+    def write(self, s):
+        written = self._file.write(s)
+        self._size += written
+        self._progress(0, written)
+        return written
+
+    def read(self, size=None):
+        return b""
+
+    def seek(self, offset, whence=0):
+        return self._file.seek(offset, whence)
+
+    def seekable(self):
+        return False
+
+    def flush(self):
+        self._file.flush()
+
+    def size(self):
+        return self._size
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            self._progress(1, 0)
+
+
+class _ProgressWriterFactory:
+    def __init__(self, progress):
+        self.progress = progress
+        self.writers = []
+
+    def create(self, filename):
+        writer = _ProgressWriter(filename, self.progress)
+        self.writers.append(writer)
+        return writer
+
+    def close_all(self):
+        # Older py7zr releases never call close() on writers
+        for writer in self.writers:
+            writer.close()
+
+
+@tracing.traced("extract")
+def extract_archive(archive_file, addon_folder, members=None, progress=None):
+    # Extracts the whole archive, or only the given relative paths, and returns the files written.
+    # progress(files, nbytes) is called as data lands on disk and may raise to abort mid-archive.
+    wanted = set(members) if members is not None else None
+    written = []
+    if archive_file.endswith(".zip"):
+        with zipfile.ZipFile(archive_file, 'r') as zip_ref:
+            for info in zip_ref.infolist():
+                relpath = normalize_member(info.filename)
+                if not relpath or (wanted is not None and relpath not in wanted):
+                    continue
+                if not info.is_dir():
+                    _unlink_existing(addon_folder, relpath)
+                zip_ref.extract(info, addon_folder)
+                if not info.is_dir():
+                    written.append(relpath)
+                    if progress:
+                        progress(1, info.file_size)
+    elif archive_file.endswith(".7z"):
+        import py7zr
+        with py7zr.SevenZipFile(archive_file, mode='r') as z:
+            entries = z.list()
+            files = [e for e in entries if not e.is_directory and normalize_member(e.filename)]
+            if wanted is not None:
+                files = [e for e in files if normalize_member(e.filename) in wanted]
+            for e in files:
+                _unlink_existing(addon_folder, normalize_member(e.filename))
+            if files:
+                z.reset()
+                targets = None if wanted is None else [e.filename for e in files]
+                if progress:
+                    factory = _ProgressWriterFactory(progress)
+                    try:
+                        z.extract(path=addon_folder, targets=targets, factory=factory)
+                    finally:
+                        factory.close_all()
+                elif targets is None:
+                    z.extractall(path=addon_folder)
+                else:
+                    z.extract(path=addon_folder, targets=targets)
+            written = [normalize_member(e.filename) for e in files]
+    return written
+
+
+def _extract_job(archive_file, addon_folder, members, store_dir=None, progress=None, transcode=None, unpack=None):
+    start = time.perf_counter()
+    if store_dir:
+        from modmanager.store import deploy_archive
+        written = deploy_archive(store_dir, archive_file, addon_folder, members, progress, unpack)
+    else:
+        extract = transcode.extract if transcode else extract_archive
+        written = extract(archive_file, addon_folder, members, progress)
+    return written, time.perf_counter() - start
+
+
+def _guarded_job(context, archive_file, addon_folder, members, store_dir, progress, transcode=None,
+                 trace_parent=None, unpack=None):
+    if context:
+        context.check_cancelled()
+    with tracing.span("extract_many.archive", trace_parent, archive=os.path.basename(archive_file)):
+        return _extract_job(archive_file, addon_folder, members, store_dir, progress, transcode, unpack)
+
+
+def default_workers():
+    return max(1, os.cpu_count() or 1)
+
+
+def _process_pool(workers, jobs):
+    # Spawned processes for LZMA decompression, only worth starting for more than one .7z
+    if workers > 1 and jobs > 1:
+        return ProcessPoolExecutor(max_workers=min(workers, jobs), mp_context=multiprocessing.get_context("spawn"))
+    return None
+
+
+def _unpack_in(process_pool):
+    # store.import_archive's unpack hook: only the decompression goes to a worker process, the
+    # import around it stays in this one, where its per-archive lock dedupes game targets
+    return lambda archive_file, folder: process_pool.submit(extract_archive, archive_file, folder).result()
+
+
+# --- Parallel multi-archive extraction ---
+# Every path is written by exactly one archive: the last one in `archives` that ships it.
+# That keeps the result identical to extracting one after another, while letting the
+# archives decompress side by side (7z in processes since LZMA is CPU bound, zip in threads).
+# With a store_dir the archives are imported into the shared store (once) and linked instead; a
+# .7z is then only decompressed in a process and imported from a thread (see _unpack_in).
+# An OperationContext gets per-file progress from thread jobs, per-archive progress from
+# process jobs, and can cancel archives that have not started yet or are mid-way in a thread.
+# With stamps (see unchanged_files) and details(archive) -> {relpath: (size, crc32)}, files that are
+# already deployed are skipped and the stamps of the files written are updated.
+# With a transcode.TranscodeCache (and no store_dir), .7z archives are extracted from their cached copy.
+def extract_many(archives, addon_folder, workers=None, store_dir=None, context=None, lister=list_archive,
+                 stamps=None, details=None, transcode=None):
+    workers = workers or default_workers()
+    report = []
+    winners = {}
+    with tracing.span("extract_many.list", archives=len(archives)):
+        for index, (mod_name, archive_file) in enumerate(archives):
+            entry = {"mod": mod_name, "archive": archive_file, "files": [], "written": 0, "skipped": 0,
+                     "bytes": 0, "seconds": 0.0, "error": "", "code": ""}
+            listing = None
+            try:
+                if store_dir:
+                    from modmanager.store import cached_listing
+                    listing = cached_listing(store_dir, archive_file)
+                if listing is None:
+                    listing = lister(archive_file)
+                    entry["needs_import"] = bool(store_dir)
+            except Exception as e:
+                entry["error"], entry["code"] = f"Failed to read archive: {e}", "unreadable_archive"
+                listing = {}
+            entry["listing"] = listing
+            entry["files"] = list(listing)
+            for relpath in listing:
+                winners[relpath] = index
+            report.append(entry)
+
+    # Parent folders are created up front so workers never race on makedirs
+    for relpath in winners:
+        parent = os.path.dirname(relpath)
+        if parent:
+            os.makedirs(os.path.join(addon_folder, *parent.split("/")), exist_ok=True)
+
+    jobs = []
+    planned_files = 0
+    for index, entry in enumerate(report):
+        if entry["error"]:
+            continue
+        won = [p for p in entry["listing"] if winners[p] == index]
+        planned_files += len(won)
+        if stamps is not None and won:
+            try:
+                entry["details"] = details(entry["archive"])
+                unchanged = unchanged_files(addon_folder, entry["details"], won, stamps)
+            except Exception as e:
+                print(f"Error checking deployed files of {entry['mod']}: {e}")
+                unchanged = set()
+            entry["skipped"] = len(unchanged)
+            won = [p for p in won if p not in unchanged]
+        entry["bytes"] = sum(entry["listing"][p] for p in won)
+        if not won:
+            continue
+        members = None if len(won) == len(entry["listing"]) else won
+        # Only archives that still have to be decompressed are worth a process; a transcoded copy is
+        # a zip, read in a thread like any other
+        heavy = entry["archive"].endswith(".7z") and (not store_dir or entry.get("needs_import")) and \
+            not (transcode and not store_dir and transcode.cached(entry["archive"]))
+        jobs.append((index, entry["archive"], members, heavy))
+    if context:
+        context.add_total(planned_files, sum(e["bytes"] for e in report))
+        # Skipped files count as done without any bytes written
+        context.report(sum(e["skipped"] for e in report))
+    progress = context.advance if context else None
+
+    process_pool = _process_pool(workers, len([job for job in jobs if job[3]]))
+    thread_pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = []
+        for index, archive_file, members, heavy in jobs:
+            in_process = heavy and process_pool is not None and not store_dir
+            if in_process:
+                future = process_pool.submit(_extract_job, archive_file, addon_folder, members, None, None,
+                                             transcode)
+            else:
+                unpack = _unpack_in(process_pool) if heavy and process_pool else None
+                future = thread_pool.submit(_guarded_job, context, archive_file, addon_folder, members,
+                                            store_dir, progress, transcode, tracing.current_span(), unpack)
+            futures.append((index, in_process, future))
+        for index, in_process, future in futures:
+            entry = report[index]
+            if context and context.cancelled:
+                future.cancel()
+            try:
+                written, seconds = future.result()
+                entry["written"] = len(written)
+                entry["seconds"] = seconds
+                if "details" in entry:
+                    stamp_files(addon_folder, entry["details"], written, stamps)
+                if in_process:
+                    # Timed in the worker process, which has no tracing of its own
+                    tracing.record("extract_many.archive", seconds, archive=os.path.basename(entry["archive"]))
+                    if context:
+                        context.advance(len(written), entry["bytes"])
+            except (CancelledError, OperationCancelled):
+                entry["error"], entry["code"] = "Cancelled", "cancelled"
+            except Exception as e:
+                entry["error"], entry["code"] = f"Failed to extract archive: {e}", "extract_failed"
+    finally:
+        thread_pool.shutdown()
+        if process_pool:
+            process_pool.shutdown()
+    for entry in report:
+        del entry["listing"]
+        entry.pop("needs_import", None)
+        entry.pop("details", None)
+    return report
+
+
+def import_many(store_dir, archive_files, workers=None, context=None):
+    # Imports archives into the store ahead of deploying them, e.g. once before a fan-out to several
+    # game targets; returns {archive_file: error message} for the ones that failed
+    from modmanager.store import import_archive, load_index
+    workers = workers or default_workers()
+    pending = [a for a in dict.fromkeys(archive_files) if a and load_index(store_dir, a) is None]
+    if not pending:
+        return {}
+    # The bytes are counted again when the targets link the files, so this only checks for cancel
+    progress = (lambda files, nbytes: context.check_cancelled()) if context else None
+    process_pool = _process_pool(workers, len([a for a in pending if a.endswith(".7z")]))
+    failed = {}
+    try:
+        with tracing.span("import_many", archives=len(pending)), ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [(archive_file, pool.submit(import_archive, store_dir, archive_file, progress,
+                                                  _unpack_in(process_pool)
+                                                  if process_pool and archive_file.endswith(".7z") else None))
+                       for archive_file in pending]
+            for archive_file, future in futures:
+                try:
+                    future.result()
+                except Exception as e:
+                    failed[archive_file] = str(e) or type(e).__name__
+    finally:
+        if process_pool:
+            process_pool.shutdown()
+    return failed
+
+
+def report_summary(report):
+    # One small dict per archive (no file lists): what enable_all_mods returns and traces
+    return [{"mod": entry["mod"], "files": len(entry["files"]), "written": entry["written"],
+             "skipped": entry["skipped"], "bytes": entry["bytes"], "seconds": round(entry["seconds"], 3),
+             "error": entry["error"], "code": entry["code"]} for entry in report]
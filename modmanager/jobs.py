@@ -0,0 +1,84 @@
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+from modmanager.operations import OperationContext, OperationCancelled
+
+
+class JobSignals(QObject):
+    # files_done, files_total, bytes_done, bytes_total, bytes per second
+    progress = pyqtSignal(int, int, int, int, float)
+    # result, errors, cancelled
+    finished = pyqtSignal(object, list, bool)
+
+
+# --- A mod_data call run on the worker pool ---
+# The function gets an OperationContext as its parent_widget, so warnings are collected
+# and handed back to the GUI thread instead of opening message boxes from a worker.
+class ModJob(QRunnable):
+    def __init__(self, label, func, args):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.label = label
+        self.func = func
+        self.args = args
+        self.signals = JobSignals()
+        self.context = OperationContext(self.signals.progress.emit)
+
+    def run(self):
+        result = False
+        if self.context.cancelled:
+            self.signals.finished.emit(result, [], True)
+            return
+        try:
+            result = self.func(*self.args, self.context)
+        except OperationCancelled:
+            result = False
+        except Exception as e:
+            self.context.warn(f"{self.label} failed: {e}")
+        self.context.finish()
+        self.signals.finished.emit(result, list(self.context.errors), self.context.cancelled)
+
+    def cancel(self):
+        self.context.cancel()
+
+
+class JobRunner(QObject):
+    job_started = pyqtSignal(str)
+    progress = pyqtSignal(str, int, int, int, int, float)
+    idle = pyqtSignal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.pool = QThreadPool(self)
+        # Mod operations share Enabled.json and the deploy manifest, so they run one at a time
+        self.pool.setMaxThreadCount(1)
+        self.jobs = []
+
+    def submit(self, label, func, *args, on_finished=None):
+        job = ModJob(label, func, args)
+        job.signals.progress.connect(lambda *values, label=label: self.progress.emit(label, *values))
+        job.signals.finished.connect(lambda result, errors, cancelled, job=job:
+                                     self._on_finished(job, on_finished, result, errors, cancelled))
+        self.jobs.append(job)
+        if len(self.jobs) == 1:
+            self.job_started.emit(label)
+        self.pool.start(job)
+        return job
+
+    def _on_finished(self, job, on_finished, result, errors, cancelled):
+        if job in self.jobs:
+            self.jobs.remove(job)
+        if on_finished:
+            on_finished(result, errors, cancelled)
+        if self.jobs:
+            self.job_started.emit(self.jobs[0].label)
+        else:
+            self.idle.emit()
+
+    def is_busy(self):
+        return bool(self.jobs)
+
+    def cancel_all(self):
+        for job in self.jobs:
+            job.cancel()
+
+    def wait(self):
+        self.pool.waitForDone()
@@ -1,14 +1,23 @@
 import os, json, glob, shutil
-from PyQt5.QtWidgets import (QMainWindow, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout, QTableWidget,
-                             QTableWidgetItem, QPushButton, QFileDialog, QMessageBox, QLabel, QHeaderView,
-                             QFrame, QDialog, QLineEdit, QTextEdit, QMenu, QStyle)
-from PyQt5.QtGui import QIcon, QPixmap, QFont
-from PyQt5.QtCore import Qt, QUrl
-from modmanager.ui_components import SortableTableWidgetItem, ClickableLabel, ScrollableDescriptionWidget
+from functools import partial
+from PyQt5.QtWidgets import (QMainWindow, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout, QTableView,
+                             QPushButton, QFileDialog, QMessageBox, QLabel, QHeaderView,
+                             QFrame, QDialog, QLineEdit, QTextEdit, QMenu, QStyle, QProgressBar, QListWidget,
+                             QListWidgetItem, QAbstractItemView, QInputDialog, QComboBox, QCheckBox, QShortcut,
+                             QTreeWidget, QTreeWidgetItem)
+from PyQt5.QtGui import QIcon, QPixmap, QFont, QKeySequence
+from PyQt5.QtCore import Qt, QUrl, QTimer, QFileSystemWatcher
+from modmanager.ui_components import ClickableLabel, ScrollableDescriptionWidget
 from modmanager.mod_data import get_mod_list, human_file_size, enable_mod, enable_all_mods, disable_mod, delete_mod, \
-    rename_mod, set_mod_description, set_mod_thumbnail, disable_all_mods
+    delete_mods, rename_mod, set_mod_description, set_mod_thumbnail, disable_all_mods, find_mod_archive, \
+    apply_load_order, load_load_order, save_load_order, restack_to_load_order, get_conflict_report, load_profiles, \
+    save_profile, delete_profile, switch_profile, get_targets, add_target, remove_target, use_target, call_on_target, \
+    run_on_targets, verify_addon, repair_addon, DEFAULT_TARGET, MODS_FOLDER, DATA_PACK_DIR
 from modmanager.config import load_config, save_config
-from modmanager.browser_page import BrowserTab
+from modmanager.jobs import JobRunner
+from modmanager.mod_table import ModTableModel, ModFilterProxy, ModNameRole, STATUS, NAME, SIZE, EXTRACTED, FILES
+from modmanager.thumbnails import get_thumbnail_loader
+from modmanager import tracing
 
 
 class ModManagerWindow(QMainWindow):
@@ -20,6 +29,23 @@ class ModManagerWindow(QMainWindow):
         if os.path.exists(icon_path):
             self.setWindowIcon(QIcon(icon_path))
         self.setFixedSize(1280, 920)
+        self.jobs = JobRunner(self)
+        self.jobs.job_started.connect(self.on_job_started)
+        self.jobs.progress.connect(self.on_job_progress)
+        self.jobs.idle.connect(self.on_jobs_idle)
+        # Several jobs finishing back to back only rebuild the table once
+        self.table_refresh_timer = QTimer(self)
+        self.table_refresh_timer.setSingleShot(True)
+        self.table_refresh_timer.setInterval(150)
+        self.table_refresh_timer.timeout.connect(self.refresh_mods_table)
+        self.mod_folder_watcher = QFileSystemWatcher(self)
+        self.mod_folder_watcher.directoryChanged.connect(self.schedule_table_refresh)
+        self.mod_folder_watcher.fileChanged.connect(self.schedule_table_refresh)
+        self.thumbnails = get_thumbnail_loader()
+        self.thumbnails.ready.connect(self.on_thumbnail_ready)
+        self.thumbnail_key = None
+        # Game target the Mods tab shows and acts on
+        self.current_target = DEFAULT_TARGET
         self.initUI()
 
     def initUI(self):
@@ -27,8 +53,11 @@ class ModManagerWindow(QMainWindow):
         self.mods_tab = QWidget()
         self.init_mods_tab()
         self.tabs.addTab(self.mods_tab, "Mods")
-        self.browser_tab = BrowserTab()
-        self.tabs.addTab(self.browser_tab, "Browser")
+        # The browser (and requests/bs4 behind it) is only built the first time its tab is opened
+        self.browser_tab = None
+        self.browser_container = QWidget()
+        QVBoxLayout(self.browser_container).setContentsMargins(0, 0, 0, 0)
+        self.tabs.addTab(self.browser_container, "Browser")
         self.settings_tab = QWidget()
         self.init_settings_tab()
         self.tabs.addTab(self.settings_tab, "Settings")
@@ -41,20 +70,53 @@ class ModManagerWindow(QMainWindow):
     def init_mods_tab(self):
         main_layout = QVBoxLayout()
         top_layout = QHBoxLayout()
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels(["Status", "Mod Name", "Size"])
-        self.table.setSelectionBehavior(self.table.SelectRows)
+        table_layout = QVBoxLayout()
+        filter_layout = QHBoxLayout()
+        self.mod_filter = QLineEdit()
+        self.mod_filter.setPlaceholderText("Filter mods...")
+        self.mod_filter.setClearButtonEnabled(True)
+        filter_layout.addWidget(self.mod_filter)
+        # Only shown once extra game targets exist (Settings)
+        self.target_panel = QWidget()
+        target_layout = QHBoxLayout(self.target_panel)
+        target_layout.setContentsMargins(0, 0, 0, 0)
+        target_layout.addWidget(QLabel("Target:"))
+        self.target_box = QComboBox()
+        self.target_box.currentIndexChanged.connect(self.on_target_changed)
+        target_layout.addWidget(self.target_box)
+        self.all_targets_box = QCheckBox("Apply to all targets")
+        target_layout.addWidget(self.all_targets_box)
+        filter_layout.addWidget(self.target_panel)
+        table_layout.addLayout(filter_layout)
+        self.load_targets()
+        # standardIcon is slow enough to dominate large tables, so both icons are looked up once
+        status_icons = (self.style().standardIcon(QStyle.SP_DialogApplyButton),
+                        self.style().standardIcon(QStyle.SP_DialogCancelButton))
+        self.mod_model = ModTableModel(status_icons, self)
+        self.mod_proxy = ModFilterProxy(self)
+        self.mod_proxy.setSourceModel(self.mod_model)
+        self.mod_filter.textChanged.connect(self.mod_proxy.set_filter_text)
+        self.table = QTableView()
+        self.table.setModel(self.mod_proxy)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setSortingEnabled(True)
+        self.table.sortByColumn(NAME, Qt.AscendingOrder)
+        # Fixed row heights so the view never measures all rows
+        self.table.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(self.fontMetrics().height() + 10)
+        # Fixed widths too: ResizeToContents re-measures rows after every sort or filter
         header = self.table.horizontalHeader()
-        header.setSectionResizeMode(0, QHeaderView.ResizeToContents)
-        header.setSectionResizeMode(1, QHeaderView.Stretch)
-        header.setSectionResizeMode(2, QHeaderView.ResizeToContents)
+        header.setSectionResizeMode(QHeaderView.Fixed)
+        header.setSectionResizeMode(NAME, QHeaderView.Stretch)
+        for column, width in ((STATUS, 60), (SIZE, 100), (EXTRACTED, 100), (FILES, 60)):
+            header.resizeSection(column, width)
         self.load_mods_into_table()
         self.table.setContextMenuPolicy(Qt.CustomContextMenu)
         self.table.customContextMenuRequested.connect(self.open_context_menu)
-        self.table.itemSelectionChanged.connect(self.on_table_selection_changed)
-        self.table.cellDoubleClicked.connect(self.on_cell_double_clicked)
-        top_layout.addWidget(self.table)
+        self.table.selectionModel().selectionChanged.connect(self.on_table_selection_changed)
+        self.table.doubleClicked.connect(self.on_cell_double_clicked)
+        table_layout.addWidget(self.table)
+        top_layout.addLayout(table_layout)
         action_panel = QVBoxLayout()
         self.btn_mod_folder = QPushButton("Mod Folder")
         self.btn_mod_folder.clicked.connect(self.open_mod_folder)
@@ -75,6 +137,18 @@ class ModManagerWindow(QMainWindow):
         self.btn_clear = QPushButton("Clear Mods")
         self.btn_clear.clicked.connect(self.clear_mods)
         action_panel.addWidget(self.btn_clear)
+        self.btn_load_order = QPushButton("Load Order")
+        self.btn_load_order.clicked.connect(self.open_load_order_dialog)
+        action_panel.addWidget(self.btn_load_order)
+        self.btn_profiles = QPushButton("Profiles")
+        self.btn_profiles.clicked.connect(self.open_profiles_dialog)
+        action_panel.addWidget(self.btn_profiles)
+        self.btn_conflicts = QPushButton("Conflicts")
+        self.btn_conflicts.clicked.connect(self.show_conflicts)
+        action_panel.addWidget(self.btn_conflicts)
+        self.btn_verify = QPushButton("Verify")
+        self.btn_verify.clicked.connect(self.verify_game_folder)
+        action_panel.addWidget(self.btn_verify)
         separator2 = QFrame()
         separator2.setFrameShape(QFrame.HLine)
         separator2.setFrameShadow(QFrame.Sunken)
@@ -86,6 +160,19 @@ class ModManagerWindow(QMainWindow):
         action_panel.addStretch()
         top_layout.addLayout(action_panel)
         main_layout.addLayout(top_layout)
+        self.job_panel = QWidget()
+        job_layout = QHBoxLayout(self.job_panel)
+        job_layout.setContentsMargins(0, 0, 0, 0)
+        self.job_label = QLabel("")
+        self.job_progress = QProgressBar()
+        self.job_progress.setTextVisible(False)
+        self.btn_cancel_job = QPushButton("Cancel")
+        self.btn_cancel_job.clicked.connect(self.jobs.cancel_all)
+        job_layout.addWidget(self.job_label)
+        job_layout.addWidget(self.job_progress)
+        job_layout.addWidget(self.btn_cancel_job)
+        self.job_panel.hide()
+        main_layout.addWidget(self.job_panel)
         self.details_panel = QWidget()
         details_layout = QHBoxLayout()
         self.thumbnail_label = QLabel()
@@ -103,17 +190,107 @@ class ModManagerWindow(QMainWindow):
         self.mods_tab.setLayout(main_layout)
 
     def init_settings_tab(self):
+        settings_layout = QVBoxLayout()
+        settings_layout.setAlignment(Qt.AlignTop)
         layout = QHBoxLayout()
-        layout.setAlignment(Qt.AlignTop)
         self.btn_game_folder = QPushButton("Game Folder")
         self.btn_game_folder.clicked.connect(self.select_game_folder)
         self.lbl_game_folder = QLabel("Not set")
         layout.addWidget(self.btn_game_folder)
         layout.addWidget(self.lbl_game_folder)
         layout.addStretch()
-        self.settings_tab.setLayout(layout)
+        settings_layout.addLayout(layout)
+        # Extra game folders (e.g. more server instances), each with its own enabled mods
+        targets_layout = QHBoxLayout()
+        self.btn_add_target = QPushButton("Add Target")
+        self.btn_add_target.clicked.connect(self.add_game_target)
+        self.btn_remove_target = QPushButton("Remove Target")
+        self.btn_remove_target.clicked.connect(self.remove_game_target)
+        self.lbl_targets = QLabel("")
+        targets_layout.addWidget(self.btn_add_target)
+        targets_layout.addWidget(self.btn_remove_target)
+        targets_layout.addWidget(self.lbl_targets)
+        targets_layout.addStretch()
+        settings_layout.addLayout(targets_layout)
+        settings_layout.addWidget(self.init_perf_panel())
+        self.settings_tab.setLayout(settings_layout)
         self.load_config_into_settings()
 
+    def init_perf_panel(self):
+        # Hidden until Ctrl+Shift+P: recent traced operations with the time spent under each
+        self.perf_panel = QFrame()
+        self.perf_panel.setFrameShape(QFrame.StyledPanel)
+        self.perf_panel.hide()
+        layout = QVBoxLayout(self.perf_panel)
+        controls = QHBoxLayout()
+        self.chk_tracing = QCheckBox("Trace operations")
+        tracing.set_enabled(tracing.is_enabled() or load_config().get("Tracing", False))
+        self.chk_tracing.setChecked(tracing.is_enabled())
+        self.chk_tracing.toggled.connect(self.set_tracing)
+        btn_clear = QPushButton("Clear")
+        btn_clear.clicked.connect(self.clear_perf_panel)
+        controls.addWidget(self.chk_tracing)
+        controls.addWidget(QLabel(f"Trace file: {tracing.trace_file()}"))
+        controls.addStretch()
+        controls.addWidget(btn_clear)
+        layout.addLayout(controls)
+        self.perf_tree = QTreeWidget()
+        self.perf_tree.setHeaderLabels(["Operation", "ms", "Calls", "Details"])
+        self.perf_tree.setColumnWidth(0, 420)
+        self.perf_tree.setColumnWidth(1, 90)
+        self.perf_tree.setColumnWidth(2, 60)
+        self.perf_tree.setMinimumHeight(420)
+        layout.addWidget(self.perf_tree)
+        self.perf_timer = QTimer(self)
+        self.perf_timer.setInterval(1000)
+        self.perf_timer.timeout.connect(self.refresh_perf_panel)
+        self.perf_shown = None
+        QShortcut(QKeySequence("Ctrl+Shift+P"), self, activated=self.toggle_perf_panel)
+        return self.perf_panel
+
+    def toggle_perf_panel(self):
+        visible = not self.perf_panel.isVisible()
+        self.perf_panel.setVisible(visible)
+        if visible:
+            self.tabs.setCurrentWidget(self.settings_tab)
+            self.refresh_perf_panel()
+            self.perf_timer.start()
+        else:
+            self.perf_timer.stop()
+
+    def set_tracing(self, enabled):
+        tracing.set_enabled(enabled)
+        config = load_config()
+        config["Tracing"] = enabled
+        save_config(config)
+
+    def clear_perf_panel(self):
+        tracing.clear_recent()
+        self.refresh_perf_panel()
+
+    def refresh_perf_panel(self):
+        operations = tracing.recent_operations()
+        shown = [(op["name"], op["start"]) for op in operations]
+        if shown == self.perf_shown:
+            return
+        self.perf_shown = shown
+        self.perf_tree.clear()
+        for op in operations:
+            # Lists (e.g. per-archive timings) are only counted here; they are in full in the trace file
+            details = ", ".join(f"{key}={len(value) if isinstance(value, list) else value}"
+                                for key, value in op["attrs"].items())
+            if op["error"]:
+                details = f"{op['error']} {details}".strip()
+            item = QTreeWidgetItem([op["name"], f"{op['ms']:.1f}", "1", details])
+            # Call paths become nested rows, slowest first under each parent
+            items = {(): item}
+            for path, (ms, count) in sorted(op["breakdown"].items(), key=lambda entry: (len(entry[0]), -entry[1][0])):
+                parent = items.get(path[:-1], item)
+                items[path] = QTreeWidgetItem(parent, [path[-1], f"{ms:.1f}", str(count), ""])
+            for column in (1, 2):
+                item.setTextAlignment(column, Qt.AlignRight | Qt.AlignVCenter)
+            self.perf_tree.addTopLevelItem(item)
+
     def init_about_tab(self):
         layout = QVBoxLayout()
         about_label = QLabel()
@@ -140,8 +317,7 @@ class ModManagerWindow(QMainWindow):
 
     def open_mod_folder(self):
         from PyQt5.QtGui import QDesktopServices
-        mods_path = os.path.join(os.path.abspath(os.path.join(self.base_dir, "..")), "Mods")
-        QDesktopServices.openUrl(QUrl.fromLocalFile(mods_path))
+        QDesktopServices.openUrl(QUrl.fromLocalFile(MODS_FOLDER))
 
     def select_game_folder(self):
         folder = QFileDialog.getExistingDirectory(self, "Select Game Folder")
@@ -159,33 +335,89 @@ class ModManagerWindow(QMainWindow):
         config = load_config()
         game_folder = config.get("Game_Folder", "")
         self.lbl_game_folder.setText(game_folder if game_folder else "Not set")
+        extra = [f"{name}: {folder}" for name, folder in get_targets().items() if name != DEFAULT_TARGET]
+        self.lbl_targets.setText("\n".join(extra) if extra else "No extra targets")
+        self.btn_remove_target.setEnabled(bool(extra))
+
+    def add_game_target(self):
+        name, ok = QInputDialog.getText(self, "Add Target", "Target name (letters, digits, '-' and '_'):")
+        if not ok or not name.strip():
+            return
+        folder = QFileDialog.getExistingDirectory(self, f"Select Game Folder for {name.strip()}")
+        if folder and add_target(name.strip(), folder, self):
+            self.load_config_into_settings()
+            self.load_targets()
 
+    def remove_game_target(self):
+        names = [name for name in get_targets() if name != DEFAULT_TARGET]
+        name, ok = QInputDialog.getItem(self, "Remove Target", "Target:", names, 0, False)
+        if ok and name and remove_target(name):
+            self.load_config_into_settings()
+            self.load_targets()
+            self.load_mods_into_table()
+
+    @tracing.traced("table.reset")
     def load_mods_into_table(self):
-        mods = get_mod_list()
-        self.table.setRowCount(len(mods))
-        for row, mod in enumerate(mods):
-            status_item = SortableTableWidgetItem("")
-            icon = self.style().standardIcon(QStyle.SP_DialogApplyButton) if mod[
-                "enabled"] else self.style().standardIcon(QStyle.SP_DialogCancelButton)
-
-            status_item.setIcon(icon)
-            status_item.setData(Qt.UserRole, 0 if mod["enabled"] else 1)
-            status_item.setFlags(Qt.ItemIsEnabled)
-            name_item = QTableWidgetItem(mod["displayed_name"])
-            name_item.setData(Qt.UserRole, mod["orig_mod_name"])
-            name_item.setFlags(Qt.ItemIsEnabled | Qt.ItemIsSelectable)
-            size_text = human_file_size(mod["size_raw"])
-            size_item = SortableTableWidgetItem(size_text)
-            size_item.setData(Qt.UserRole, mod["size_raw"])
-            size_item.setFlags(Qt.ItemIsEnabled)
-            self.table.setItem(row, 0, status_item)
-            self.table.setItem(row, 1, name_item)
-            self.table.setItem(row, 2, size_item)
-        self.table.resizeRowsToContents()
+        with use_target(self.current_target):
+            mods = get_mod_list()
+        with tracing.span("table.model", rows=len(mods)):
+            self.mod_model.reset_mods(mods)
+        self.watch_mod_folders()
+
+    @tracing.traced("table.refresh")
+    def refresh_mods_table(self):
+        # Patches only the rows whose mod was added, removed or changed since the last refresh
+        with use_target(self.current_target):
+            mods = get_mod_list()
+        with tracing.span("table.model", rows=len(mods)):
+            changed = self.mod_model.set_mods(mods)
+        if changed:
+            self.watch_mod_folders()
+
+    def load_targets(self):
+        targets = get_targets()
+        self.target_box.blockSignals(True)
+        self.target_box.clear()
+        for name, game_folder in targets.items():
+            self.target_box.addItem(name, name)
+            self.target_box.setItemData(self.target_box.count() - 1, game_folder or "Not set", Qt.ToolTipRole)
+        if self.current_target not in targets:
+            self.current_target = DEFAULT_TARGET
+        self.target_box.setCurrentIndex(self.target_box.findData(self.current_target))
+        self.target_box.blockSignals(False)
+        self.target_panel.setVisible(len(targets) > 1)
+        if len(targets) < 2:
+            self.all_targets_box.setChecked(False)
+
+    def on_target_changed(self, index):
+        target = self.target_box.itemData(index)
+        if target and target != self.current_target:
+            self.current_target = target
+            self.clear_details_panel()
+            self.load_mods_into_table()
+
+    def selected_mod_names(self):
+        return [index.data(ModNameRole) for index in self.table.selectionModel().selectedRows(NAME)]
+
+    def watch_mod_folders(self):
+        # Mods/ plus data-pack/ and its per-mod folders; directoryChanged covers files added,
+        # removed or renamed there (including by other programs). Each info.json is watched
+        # as a file too, since editing one in place doesn't touch its folder.
+        try:
+            data_dirs = [entry.path for entry in os.scandir(DATA_PACK_DIR) if entry.is_dir()]
+        except OSError:
+            data_dirs = []
+        watched = set(self.mod_folder_watcher.directories()) | set(self.mod_folder_watcher.files())
+        info_files = [os.path.join(path, "info.json") for path in data_dirs]
+        missing = [path for path in [MODS_FOLDER, DATA_PACK_DIR] + data_dirs
+                   if path not in watched and os.path.isdir(path)]
+        # An editor that saves by replacing the file drops the watch; the refresh it triggers adds it back
+        missing += [path for path in info_files if path not in watched and os.path.isfile(path)]
+        if missing:
+            self.mod_folder_watcher.addPaths(missing)
 
     def delete_selected_mod(self):
-        selected_rows = self.table.selectionModel().selectedRows()
-        if not selected_rows:
+        if not self.selected_mod_names():
             QMessageBox.information(self, "No Selection", "Please select mod(s) to delete.")
             return
         reply = QMessageBox.question(
@@ -197,25 +429,15 @@ class ModManagerWindow(QMainWindow):
         )
         if reply == QMessageBox.No:
             return
-        for index in selected_rows:
-            row = index.row()
-            mod_item = self.table.item(row, 1)
-            orig_mod_name = mod_item.data(Qt.UserRole) or mod_item.text()
-            self.context_delete_mod(orig_mod_name)
-        self.load_mods_into_table()
+        mod_names = self.selected_mod_names()
         self.clear_details_panel()
+        self.run_mod_job(f"Deleting {len(mod_names)} mod(s)", delete_mods, (mod_names,))
 
-    def on_cell_double_clicked(self, row, column):
+    def on_cell_double_clicked(self, index):
         # Only trigger if the status column (0) was double-clicked
-        if column == 0:
-            mod_item = self.table.item(row, 1)
-            mod_name = mod_item.data(Qt.UserRole) or mod_item.text()
-
-            # Retrieve the status from the status cell (column 0)
-            status_item = self.table.item(row, 0)
-            current_status = status_item.data(Qt.UserRole)  # 0 means enabled, 1 means disabled
-
-            if current_status == 0:
+        if index.column() == STATUS:
+            mod_name = index.data(ModNameRole)
+            if self.mod_model.is_enabled(mod_name):
                 # Currently enabled: disable it
                 self.context_disable_mod(mod_name)
             else:
@@ -226,9 +448,7 @@ class ModManagerWindow(QMainWindow):
         index = self.table.indexAt(position)
         if not index.isValid():
             return
-        row = index.row()
-        mod_item = self.table.item(row, 1)
-        orig_mod_name = mod_item.data(Qt.UserRole) or mod_item.text()
+        orig_mod_name = index.data(ModNameRole)
         menu = QMenu()
         action_enable = menu.addAction("Enable")
         action_disable = menu.addAction("Disable")
@@ -247,68 +467,107 @@ class ModManagerWindow(QMainWindow):
         menu.exec_(self.table.viewport().mapToGlobal(position))
 
     def on_table_selection_changed(self):
-        selected_rows = self.table.selectionModel().selectedRows()
-        if selected_rows:
-            row = selected_rows[0].row()
-            mod_item = self.table.item(row, 1)
-            orig_mod_name = mod_item.data(Qt.UserRole) or mod_item.text()
-            self.update_details_panel(orig_mod_name)
+        mod_names = self.selected_mod_names()
+        if mod_names:
+            self.update_details_panel(mod_names[0])
         else:
             self.clear_details_panel()
 
+    def run_mod_job(self, label, func, args, optimistic=None, on_success=None, archives=None):
+        # Runs a mod_data call on the job pool; status icons flip straight away and
+        # flip back if the operation fails or is cancelled. With all targets, archives
+        # (the ones func deploys) are imported into the store once before the fan-out.
+        previous = self.mod_model.set_enabled(optimistic or {})
+        all_targets = self.all_targets_box.isChecked()
+
+        def finished(result, errors, cancelled):
+            if all_targets:
+                # run_on_targets hands back {target: result}; it only succeeded if every target did
+                result = bool(result) and all(result.values())
+            if cancelled or not result:
+                self.mod_model.set_enabled(previous)
+            if errors and not cancelled:
+                QMessageBox.warning(self, "Error", "\n".join(errors[:20]))
+            if result and on_success:
+                on_success()
+            self.schedule_table_refresh()
+
+        if all_targets:
+            self.jobs.submit(f"{label} (all targets)", partial(run_on_targets, archives=archives), func, args, None,
+                             on_finished=finished)
+        else:
+            self.jobs.submit(label, call_on_target, self.current_target, func, *args, on_finished=finished)
+
+    def schedule_table_refresh(self, *args):
+        self.table_refresh_timer.start()
+
+    def on_job_started(self, label):
+        self.job_label.setText(label)
+        self.job_progress.setRange(0, 0)
+        self.job_panel.show()
+
+    def on_job_progress(self, label, files_done, files_total, bytes_done, bytes_total, throughput):
+        if files_total:
+            self.job_progress.setRange(0, files_total)
+            self.job_progress.setValue(min(files_done, files_total))
+        self.job_label.setText(f"{label}: {files_done}/{files_total} files, {human_file_size(throughput)}/s")
+
+    def on_jobs_idle(self):
+        self.job_panel.hide()
+
+    def closeEvent(self, event):
+        runners = [self.jobs]
+        if self.browser_tab is not None:
+            runners += [self.browser_tab.crawl_jobs, self.browser_tab.detail_jobs, self.browser_tab.download_jobs]
+        for runner in runners:
+            runner.cancel_all()
+        for runner in runners:
+            runner.wait()
+        self.thumbnails.cancel_pending()
+        self.thumbnails.wait()
+        if self.browser_tab is not None:
+            self.browser_tab.screenshots.cancel_pending()
+            self.browser_tab.screenshots.wait()
+        super().closeEvent(event)
+
     def context_enable_mod(self, mod_name):
-        if enable_mod(mod_name, self):
-            self.load_mods_into_table()
-            self.update_details_panel(mod_name)
+        self.run_mod_job(f"Enabling {mod_name}", enable_mod, (mod_name,), {mod_name: True},
+                         lambda: self.update_details_panel(mod_name), [find_mod_archive(mod_name)])
 
     def enable_selected_mods(self):
-        selected_rows = self.table.selectionModel().selectedRows()
-        if not selected_rows:
+        mod_names = self.selected_mod_names()
+        if not mod_names:
             QMessageBox.information(self, "No Selection", "Please select mod(s) to enable.")
             return
         mods = []
-        for index in selected_rows:
-            row = index.row()
-            mod_item = self.table.item(row, 1)
-            mod_name = mod_item.data(Qt.UserRole) or mod_item.text()
-            mod_archive = None
-            for ext in [".zip", ".7z"]:
-                path = os.path.join(os.path.abspath(os.path.join(self.base_dir, "..")), "Mods", mod_name + ext)
-                if os.path.exists(path):
-                    mod_archive = path
-                    break
+        for mod_name in mod_names:
+            mod_archive = find_mod_archive(mod_name)
             if mod_archive:
                 mods.append({"orig_mod_name": mod_name, "archive_path": mod_archive})
-        if enable_all_mods(mods, self):
-            self.load_mods_into_table()
+        self.run_mod_job(f"Enabling {len(mods)} mod(s)", enable_all_mods, (mods,),
+                         {mod["orig_mod_name"]: True for mod in mods}, archives=[mod["archive_path"] for mod in mods])
 
     def context_disable_mod(self, mod_name):
-        if disable_mod(mod_name, self):
-            self.load_mods_into_table()
-            self.update_details_panel(mod_name)
+        self.run_mod_job(f"Disabling {mod_name}", disable_mod, (mod_name,), {mod_name: False},
+                         lambda: self.update_details_panel(mod_name))
 
     def disable_selected_mod(self):
-        selected_rows = self.table.selectionModel().selectedRows()
-        if not selected_rows:
+        mod_names = self.selected_mod_names()
+        if not mod_names:
             QMessageBox.information(self, "No Selection", "Please select a mod to disable.")
             return
-        row = selected_rows[0].row()
-        mod_item = self.table.item(row, 1)
-        orig_mod_name = mod_item.data(Qt.UserRole) or mod_item.text()
-        self.context_disable_mod(orig_mod_name)
+        self.context_disable_mod(mod_names[0])
 
     def context_delete_mod(self, mod_name):
         reply = QMessageBox.question(self, 'Confirm Deletion', 'Are you sure you want to delete the mod?',
                                      QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.No:
             return
-        if delete_mod(mod_name, self):
-            self.load_mods_into_table()
-            self.clear_details_panel()
+        self.clear_details_panel()
+        self.run_mod_job(f"Deleting {mod_name}", delete_mod, (mod_name,))
 
     def context_rename_mod(self, mod_name):
-        data_pack_dir = os.path.join(os.path.abspath(os.path.join(self.base_dir, "..")), "data-pack")
-        os.makedirs(data_pack_dir, exist_ok=True)
+        os.makedirs(DATA_PACK_DIR, exist_ok=True)
         dialog = QDialog(self)
         dialog.setWindowTitle("Set Alias")
         layout = QHBoxLayout()
@@ -318,7 +577,7 @@ class ModManagerWindow(QMainWindow):
         layout.addWidget(btn_set)
         dialog.setLayout(layout)
         btn_set.clicked.connect(
-            lambda: [rename_mod(mod_name, line_edit.text(), self), dialog.accept(), self.load_mods_into_table(),
+            lambda: [rename_mod(mod_name, line_edit.text(), self), dialog.accept(), self.refresh_mods_table(),
                      self.update_details_panel(mod_name)])
         dialog.exec_()
 
@@ -336,8 +595,7 @@ class ModManagerWindow(QMainWindow):
         dialog.exec_()
 
     def context_thumbnail_mod(self, mod_name):
-        data_pack_dir = os.path.join(os.path.abspath(os.path.join(self.base_dir, "..")), "data-pack")
-        os.makedirs(data_pack_dir, exist_ok=True)
+        os.makedirs(DATA_PACK_DIR, exist_ok=True)
         options = QFileDialog.Options()
         file_path, _ = QFileDialog.getOpenFileName(self, "Select Thumbnail Image", "",
                                                    "Images (*.png *.jpg *.jpeg *.webp)", options=options)
@@ -346,8 +604,7 @@ class ModManagerWindow(QMainWindow):
                 self.update_details_panel(mod_name)
 
     def update_details_panel(self, mod_name):
-        data_pack_dir = os.path.join(os.path.abspath(os.path.join(self.base_dir, "..")), "data-pack")
-        mod_data_dir = os.path.join(data_pack_dir, mod_name)
+        mod_data_dir = os.path.join(DATA_PACK_DIR, mod_name)
         info_path = os.path.join(mod_data_dir, "info.json")
         alias = mod_name
         description = ""
@@ -366,22 +623,168 @@ class ModManagerWindow(QMainWindow):
         thumb_path = os.path.join(mod_data_dir, "thumbnail.jpg")
         if not os.path.exists(thumb_path):
             thumb_path = os.path.join(os.path.abspath(os.path.join(self.base_dir, "..")), "Thumbnail_Default.jpg")
-        pixmap = QPixmap(thumb_path)
+        # Decoded off-thread at 150px wide; on_thumbnail_ready fills the label in when it isn't cached yet
+        self.thumbnail_key, pixmap = self.thumbnails.request(thumb_path, 150)
+        if pixmap is not None:
+            self.show_thumbnail(pixmap)
+        else:
+            self.thumbnail_label.clear()
+
+    def show_thumbnail(self, pixmap):
         if not pixmap.isNull():
-            scaled_pixmap = pixmap.scaledToWidth(150, Qt.SmoothTransformation)
-            self.thumbnail_label.setPixmap(scaled_pixmap)
+            self.thumbnail_label.setPixmap(pixmap)
         else:
             self.thumbnail_label.clear()
 
+    def on_thumbnail_ready(self, key):
+        if key == self.thumbnail_key:
+            self.show_thumbnail(self.thumbnails.cache.get(key))
+
     def clear_details_panel(self):
+        self.thumbnail_key = None
         self.mod_name_label.setText("")
         self.description_widget.setText("")
         self.thumbnail_label.clear()
 
+    def open_load_order_dialog(self):
+        with use_target(self.current_target):
+            mods = [mod for mod in get_mod_list() if mod["enabled"]]
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Load Order")
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("Drag mods to reorder. Mods lower in the list win file conflicts."))
+        list_widget = QListWidget()
+        list_widget.setDragDropMode(QAbstractItemView.InternalMove)
+        for mod in apply_load_order(mods):
+            item = QListWidgetItem(mod["displayed_name"])
+            item.setData(Qt.UserRole, mod["orig_mod_name"])
+            list_widget.addItem(item)
+        layout.addWidget(list_widget)
+        btn_save = QPushButton("Save Load Order")
+        layout.addWidget(btn_save)
+        dialog.setLayout(layout)
+        btn_save.clicked.connect(lambda: [self.save_load_order_from_list(list_widget), dialog.accept()])
+        dialog.resize(500, 600)
+        dialog.exec_()
+
+    def save_load_order_from_list(self, list_widget):
+        shown = [list_widget.item(i).data(Qt.UserRole) for i in range(list_widget.count())]
+        # Disabled mods keep their saved place, below everything that was reordered
+        kept = [mod_name for mod_name in load_load_order() if mod_name not in shown]
+        save_load_order(kept + shown)
+        # Rewrites the shared files whose winner changed, so the new order holds on disk right away
+        self.run_mod_job("Applying load order", restack_to_load_order, ())
+
+    def open_profiles_dialog(self):
+        dialog = QDialog(self)
+        dialog.setWindowTitle("Profiles")
+        layout = QVBoxLayout()
+        layout.addWidget(QLabel("Switching only removes and deploys the mods that differ between profiles."))
+        list_widget = QListWidget()
+        layout.addWidget(list_widget)
+
+        def fill():
+            list_widget.clear()
+            for name, mods in sorted(load_profiles().items(), key=lambda item: item[0].lower()):
+                item = QListWidgetItem(f"{name} ({len(mods)} mods)")
+                item.setData(Qt.UserRole, name)
+                list_widget.addItem(item)
+
+        def selected():
+            item = list_widget.currentItem()
+            return item.data(Qt.UserRole) if item else None
+
+        def save_current():
+            name, ok = QInputDialog.getText(dialog, "Save Profile", "Profile name:", text=selected() or "")
+            if ok and name.strip():
+                with use_target(self.current_target):
+                    save_profile(name.strip())
+                fill()
+
+        def switch():
+            name = selected()
+            if name:
+                dialog.accept()
+                self.switch_to_profile(name)
+
+        def delete():
+            name = selected()
+            if name and QMessageBox.question(dialog, "Delete Profile", f"Delete the profile '{name}'?",
+                                             QMessageBox.Yes | QMessageBox.No, QMessageBox.No) == QMessageBox.Yes:
+                delete_profile(name)
+                fill()
+
+        buttons = QHBoxLayout()
+        for label, handler in (("Save Current As...", save_current), ("Switch", switch), ("Delete", delete)):
+            button = QPushButton(label)
+            button.clicked.connect(handler)
+            buttons.addWidget(button)
+        layout.addLayout(buttons)
+        list_widget.itemDoubleClicked.connect(lambda item: switch())
+        fill()
+        dialog.setLayout(layout)
+        dialog.resize(500, 400)
+        dialog.exec_()
+
+    def switch_to_profile(self, profile_name):
+        profile = load_profiles().get(profile_name, [])
+        target = set(profile)
+        statuses = {mod_name: mod_name in target for mod_name in self.mod_model.mod_names()}
+        self.clear_details_panel()
+        self.run_mod_job(f"Switching to {profile_name}", switch_profile, (profile_name,), statuses,
+                         archives=[find_mod_archive(mod_name) for mod_name in profile])
+
+    def show_conflicts(self):
+        mod_names = self.selected_mod_names()
+        if len(mod_names) < 2:
+            mod_names = None
+        dialog = QDialog(self)
+        dialog.setWindowTitle("File Conflicts" + (" (selected mods)" if mod_names else " (enabled mods)"))
+        layout = QVBoxLayout()
+        text_edit = QTextEdit()
+        text_edit.setReadOnly(True)
+        with use_target(self.current_target):
+            text_edit.setPlainText(get_conflict_report(mod_names))
+        layout.addWidget(text_edit)
+        dialog.setLayout(layout)
+        dialog.resize(800, 600)
+        dialog.exec_()
+
+    def verify_game_folder(self):
+        # Checks svencoop_addon against the enabled archives and offers to rewrite what drifted
+        target = self.current_target
+
+        def repaired(result, errors, cancelled):
+            if errors and not cancelled:
+                QMessageBox.warning(self, "Error", "\n".join(errors[:20]))
+            self.schedule_table_refresh()
+
+        def verified(report, errors, cancelled):
+            if errors and not cancelled:
+                QMessageBox.warning(self, "Error", "\n".join(errors[:20]))
+            if not report:
+                return
+            drifted = report["missing_files"] + report["modified_files"]
+            lines = [f"{report['checked']} files checked, {report['hashed']} read."]
+            for key, title in (("missing_files", "Missing"), ("modified_files", "Modified"), ("extra_files", "Extra")):
+                if report[key]:
+                    shown = report[key][:10] + ([f"... {len(report[key]) - 10} more"] if len(report[key]) > 10 else [])
+                    lines.append(f"{title}:\n  " + "\n  ".join(shown))
+            if not drifted:
+                lines.append("Every deployed file matches its archive.")
+                QMessageBox.information(self, "Verify", "\n\n".join(lines))
+                return
+            lines.append(f"Rewrite the {len(drifted)} missing or modified file(s)? Extra files are left alone.")
+            if QMessageBox.question(self, "Verify", "\n\n".join(lines)) == QMessageBox.Yes:
+                self.jobs.submit("Repairing game folder", call_on_target, target, repair_addon,
+                                 on_finished=repaired)
+
+        self.jobs.submit("Verifying game folder", call_on_target, target, verify_addon, on_finished=verified)
+
     def clear_mods(self):
-        if disable_all_mods(self):
-            self.load_mods_into_table()
-            self.clear_details_panel()
+        statuses = {mod_name: False for mod_name in self.mod_model.mod_names()}
+        self.clear_details_panel()
+        self.run_mod_job("Clearing mods", disable_all_mods, (), statuses)
 
     def handle_link(self, url):
         message = f"You are about to open the following link:\n\n{url}\n\nDo you want to proceed?"
@@ -390,9 +793,14 @@ class ModManagerWindow(QMainWindow):
             from PyQt5.QtGui import QDesktopServices
             QDesktopServices.openUrl(QUrl(url))
 
+    def ensure_browser_tab(self):
+        if self.browser_tab is None:
+            from modmanager.browser_page import BrowserTab
+            self.browser_tab = BrowserTab()
+            self.browser_container.layout().addWidget(self.browser_tab)
+        return self.browser_tab
+
     def on_tab_changed(self, index):
-        if self.tabs.widget(index) == self.browser_tab:
-            self.browser_tab.perform_browser_search()
-        if self.tabs.widget(index) == self.mods_tab:
-            self.load_mods_into_table()
+        if self.tabs.widget(index) == self.browser_container:
+            self.ensure_browser_tab().perform_browser_search()
 
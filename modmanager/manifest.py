@@ -0,0 +1,103 @@
+import os, json
+from modmanager.tracing import traced
+
+
+def normalize_member(name):
+    # Archive member names -> the relative path they deploy to inside svencoop_addon
+    name = name.replace("\\", "/").lstrip("/")
+    parts = [p for p in name.split("/") if p not in ("", ".")]
+    if not parts or ".." in parts:
+        return ""
+    return "/".join(parts)
+
+
+# --- Per-target record of which enabled mod deployed which file ---
+class DeployManifest:
+    def __init__(self, path):
+        self.path = path
+        # mod name -> {"archive": path, "files": [relpath, ...]}
+        self.mods = {}
+        # relpath -> [mod names], lowest priority first; the last entry owns the file on disk
+        self.files = {}
+        # relpath -> [size, mtime_ns, crc32] of the deployed file when it last checked out
+        self.stamps = {}
+        self.exists = False
+
+    def load(self):
+        self.mods = {}
+        self.files = {}
+        self.stamps = {}
+        self.exists = os.path.exists(self.path)
+        if not self.exists:
+            return self
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self.mods = data.get("mods", {})
+            self.files = data.get("files", {})
+            self.stamps = data.get("stamps", {})
+        except Exception as e:
+            print(f"Error loading deploy manifest: {e}")
+            self.exists = False
+        return self
+
+    @traced("manifest.save")
+    def save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            # dumps() goes through the C encoder; dump() streams through the pure-Python one
+            f.write(json.dumps({"mods": self.mods, "files": self.files, "stamps": self.stamps}))
+        os.replace(tmp_path, self.path)
+        self.exists = True
+
+    def clear(self):
+        self.mods = {}
+        self.files = {}
+        self.stamps = {}
+
+    def covers(self, mod_names):
+        return self.exists and all(mod in self.mods for mod in mod_names)
+
+    def owner(self, relpath):
+        owners = self.files.get(relpath)
+        return owners[-1] if owners else None
+
+    def refcount(self, relpath):
+        return len(self.files.get(relpath, []))
+
+    def files_of(self, mod_name):
+        return self.mods.get(mod_name, {}).get("files", [])
+
+    def add_mod(self, mod_name, archive_path, relpaths):
+        # (Re-)deploying a mod always puts it on top of every path it ships
+        relpaths = list(dict.fromkeys(p for p in relpaths if p))
+        if mod_name in self.mods:
+            # The files stay on disk, so their stamps stay valid
+            kept = {p: self.stamps[p] for p in relpaths if p in self.stamps}
+            self.remove_mod(mod_name)
+            self.stamps.update(kept)
+        self.mods[mod_name] = {"archive": archive_path, "files": relpaths}
+        for relpath in relpaths:
+            self.files.setdefault(relpath, []).append(mod_name)
+
+    def remove_mod(self, mod_name):
+        # Returns (orphaned paths, {next owner: [paths to restore]})
+        orphaned = []
+        restore = {}
+        entry = self.mods.pop(mod_name, None)
+        if not entry:
+            return orphaned, restore
+        for relpath in entry.get("files", []):
+            owners = self.files.get(relpath, [])
+            was_top = bool(owners) and owners[-1] == mod_name
+            owners = [m for m in owners if m != mod_name]
+            if owners:
+                self.files[relpath] = owners
+                if was_top:
+                    restore.setdefault(owners[-1], []).append(relpath)
+            else:
+                self.files.pop(relpath, None)
+                self.stamps.pop(relpath, None)
+                orphaned.append(relpath)
+        return orphaned, restore
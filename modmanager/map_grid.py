@@ -0,0 +1,134 @@
+from PyQt5.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QRect, QSize, pyqtSignal
+from PyQt5.QtGui import QColor, QPainter, QPen, QFont, QFontMetrics
+from modmanager.thumbnails import get_thumbnail_loader
+
+CARD_WIDTH, CARD_HEIGHT = 170, 230
+THUMB_SIZE = 150
+EntryRole = Qt.UserRole
+DownloadedRole = Qt.UserRole + 1
+# True while a cell's thumbnail is still being decoded
+ThumbnailPendingRole = Qt.UserRole + 2
+
+
+# --- Browser results as a list model; thumbnails are only requested for painted cells ---
+class MapListModel(QAbstractListModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.entries = []
+        self.downloaded = set()
+        self._rows_by_key = {}
+        self.loader = get_thumbnail_loader()
+        self.loader.ready.connect(self._on_thumbnail_ready)
+
+    def set_entries(self, entries):
+        # Only the grid's own decodes; the details panel and screenshots share the loader
+        self.loader.cancel_pending(self)
+        self.beginResetModel()
+        self.entries = entries
+        self._rows_by_key = {}
+        self.endResetModel()
+
+    def set_downloaded(self, page_urls):
+        page_urls = set(page_urls)
+        if page_urls != self.downloaded:
+            self.downloaded = page_urls
+            if self.entries:
+                self.dataChanged.emit(self.index(0), self.index(len(self.entries) - 1), [DownloadedRole])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.entries)
+
+    def thumbnail(self, row):
+        # (pixmap or None, whether a decode is still pending)
+        key, pixmap = self.loader.request(self.entries[row].get("Thumbnail", ""), THUMB_SIZE, THUMB_SIZE, self)
+        if key is None:
+            return None, False
+        if pixmap is None:
+            self._rows_by_key.setdefault(key, set()).add(row)
+        return pixmap, pixmap is None
+
+    def _on_thumbnail_ready(self, key):
+        for row in self._rows_by_key.pop(key, ()):
+            if row < len(self.entries):
+                index = self.index(row)
+                self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.entries):
+            return None
+        entry = self.entries[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return entry.get("Title", "")
+        if role == Qt.DecorationRole:
+            return self.thumbnail(index.row())[0]
+        if role == ThumbnailPendingRole:
+            return self.thumbnail(index.row())[1]
+        if role == EntryRole:
+            return entry
+        if role == DownloadedRole:
+            return entry.get("Page URL") in self.downloaded
+        return None
+
+
+# --- Paints one map card: thumbnail, "Downloaded" badge and elided title ---
+class MapCardDelegate(QStyledItemDelegate):
+    def sizeHint(self, option, index):
+        return QSize(CARD_WIDTH, CARD_HEIGHT)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        card = QRect(option.rect.x(), option.rect.y(), CARD_WIDTH, CARD_HEIGHT).adjusted(1, 1, -1, -1)
+        painter.setPen(QPen(QColor("lightblue"), 2) if option.state & QStyle.State_MouseOver else Qt.NoPen)
+        painter.setBrush(QColor("#313438"))
+        painter.drawRoundedRect(card, 5, 5)
+        thumb_rect = QRect(card.x() + (card.width() - THUMB_SIZE) // 2, card.y() + 7, THUMB_SIZE, THUMB_SIZE)
+        painter.fillRect(thumb_rect, QColor("#161616"))
+        pixmap = index.data(Qt.DecorationRole)
+        if pixmap is not None and not pixmap.isNull():
+            painter.drawPixmap(thumb_rect.x() + (THUMB_SIZE - pixmap.width()) // 2,
+                               thumb_rect.y() + (THUMB_SIZE - pixmap.height()) // 2, pixmap)
+        elif index.data(ThumbnailPendingRole):
+            painter.setPen(QColor("#555"))
+            painter.drawText(thumb_rect, Qt.AlignCenter, "Loading...")
+        if index.data(DownloadedRole):
+            badge = QRect(thumb_rect.x(), thumb_rect.bottom() - 21, THUMB_SIZE, 22)
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(QColor("green"))
+            painter.drawRoundedRect(badge, 7, 7)
+            font = QFont(option.font)
+            font.setPointSize(11)
+            font.setBold(True)
+            painter.setFont(font)
+            painter.setPen(QColor("white"))
+            painter.drawText(badge, Qt.AlignCenter, "Downloaded")
+        font = QFont(option.font)
+        font.setPointSize(12)
+        painter.setFont(font)
+        painter.setPen(QColor("white"))
+        title_rect = QRect(card.x() + 5, thumb_rect.bottom() + 8, card.width() - 10, 40)
+        title = QFontMetrics(font).elidedText(index.data(Qt.DisplayRole) or "", Qt.ElideRight, title_rect.width())
+        painter.drawText(title_rect, Qt.AlignCenter, title)
+        painter.restore()
+
+
+# --- Continuously scrolling grid of map cards ---
+class MapGridView(QListView):
+    entry_clicked = pyqtSignal(dict)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.IconMode)
+        self.setFlow(QListView.LeftToRight)
+        self.setWrapping(True)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setSpacing(10)
+        self.setMouseTracking(True)
+        self.setSelectionMode(QAbstractItemView.NoSelection)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(40)
+        self.setItemDelegate(MapCardDelegate(self))
+        self.clicked.connect(lambda index: self.entry_clicked.emit(index.data(EntryRole)))
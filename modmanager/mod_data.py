@@ -1,19 +1,49 @@
-import os, json, glob, zipfile, shutil, re, math
-import requests
-from PIL import Image
-from bs4 import BeautifulSoup
-from PyQt5.QtWidgets import QMessageBox
-from modmanager.ui_components import SortableTableWidgetItem
+import os, json, shutil, re, hashlib, threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from modmanager.manifest import DeployManifest
+from modmanager.extractor import extract_archive, extract_many, import_many, report_summary, default_workers, \
+    file_crc32, unchanged_files, stamp_files
+from modmanager.operations import OperationContext, OperationCancelled
+from modmanager import store, tracing
+from modmanager.tracing import traced
+from modmanager.transcode import TranscodeCache
+from modmanager.mod_index import ModIndex
+from modmanager.detail_store import DetailStore
+from modmanager.state import StateService
+from modmanager.archive_cache import ArchiveCache, find_conflicts, format_conflicts
 
 # Global directories (set relative to the project root)
-BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+# SVEN_MODMANAGER_HOME points the app at another Mods/Data/config.json set (used by the benchmarks)
+BASE_DIR = os.environ.get("SVEN_MODMANAGER_HOME") or os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 MODS_FOLDER = os.path.join(BASE_DIR, "Mods")
 CONFIG_FILE = os.path.join(BASE_DIR, "config.json")
 ENABLED_FILE = os.path.join(MODS_FOLDER, "Enabled.json")
 DATA_DIR = os.path.join(BASE_DIR, "Data")
 CACHE_HTML_DIR = os.path.join(DATA_DIR, ".cache", "html", "page")
 CACHE_THUMB_DIR = os.path.join(DATA_DIR, ".cache", "thumbs")
+SCREENSHOT_CACHE_DIR = os.path.join(DATA_DIR, ".cache", "screenshots")
+TRANSCODE_DIR = os.path.join(DATA_DIR, ".cache", "transcoded")
 DATA_PACK_DIR = os.path.join(BASE_DIR, "data-pack")
+MANIFEST_DIR = os.path.join(DATA_DIR, "manifests")
+STORE_DIR = os.path.join(DATA_DIR, "store")
+MOD_INDEX_FILE = os.path.join(DATA_DIR, "Mod_Index.sqlite")
+ARCHIVE_CACHE_FILE = os.path.join(DATA_DIR, "Archive_Cache.sqlite")
+DETAIL_STORE_FILE = os.path.join(DATA_DIR, "Map_Details.sqlite")
+LOAD_ORDER_FILE = os.path.join(MODS_FOLDER, "Load_Order.json")
+PROFILES_FILE = os.path.join(MODS_FOLDER, "Profiles.json")
+TRACE_FILE = os.path.join(DATA_DIR, "trace.jsonl")
+# Game target using config.json's Game_Folder and Mods/Enabled.json
+DEFAULT_TARGET = "default"
+
+_mod_index = None
+_archive_cache = None
+_detail_store = None
+_state = None
+# Game target the current thread works on (see use_target)
+_target = threading.local()
+# SVEN_MODMANAGER_TRACE=1 traces from the start; the GUI also turns it on from config.json's "Tracing"
+tracing.configure(TRACE_FILE, os.environ.get("SVEN_MODMANAGER_TRACE") == "1")
 
 
 def initialize_directories():
@@ -21,6 +51,7 @@ def initialize_directories():
     os.makedirs(DATA_DIR, exist_ok=True)
     os.makedirs(CACHE_HTML_DIR, exist_ok=True)
     os.makedirs(CACHE_THUMB_DIR, exist_ok=True)
+    os.makedirs(SCREENSHOT_CACHE_DIR, exist_ok=True)
     os.makedirs(DATA_PACK_DIR, exist_ok=True)
     if not os.path.exists(ENABLED_FILE):
         with open(ENABLED_FILE, "w") as f:
@@ -31,40 +62,43 @@ def initialize_directories():
             json.dump(default_config, f, indent=4)
 
 
+def get_mod_index():
+    global _mod_index
+    if _mod_index is None:
+        _mod_index = ModIndex(MOD_INDEX_FILE)
+    return _mod_index
+
+
+def get_archive_cache():
+    global _archive_cache
+    if _archive_cache is None:
+        _archive_cache = ArchiveCache(ARCHIVE_CACHE_FILE)
+    return _archive_cache
+
+
+def get_state():
+    # Enabled.json, config.json and Download_Cache.json, loaded once and written atomically
+    global _state
+    if _state is None:
+        _state = StateService(ENABLED_FILE, CONFIG_FILE, os.path.join(DATA_DIR, "Download_Cache.json"), PROFILES_FILE)
+    return _state
+
+
+def get_detail_store():
+    global _detail_store
+    if _detail_store is None:
+        _detail_store = DetailStore(DETAIL_STORE_FILE, os.path.join(DATA_DIR, "CDN_Content.json"))
+    return _detail_store
+
+
+def list_mod_files(archive_file):
+    return get_archive_cache().listing(archive_file)
+
+
+@traced()
 def get_mod_list():
     initialize_directories()
-    try:
-        with open(ENABLED_FILE, "r") as f:
-            enabled_mods = json.load(f)
-    except:
-        enabled_mods = []
-    archives = []
-    for ext in ["*.zip", "*.7z"]:
-        archives.extend(glob.glob(os.path.join(MODS_FOLDER, ext)))
-    mod_list = []
-    for archive in archives:
-        filename = os.path.basename(archive)
-        orig_mod_name, ext = os.path.splitext(filename)
-        displayed_name = orig_mod_name
-        mod_data_dir = os.path.join(DATA_PACK_DIR, orig_mod_name)
-        info_path = os.path.join(mod_data_dir, "info.json")
-        if os.path.exists(info_path):
-            try:
-                with open(info_path, "r") as f:
-                    info = json.load(f)
-                if "name" in info and info["name"]:
-                    displayed_name = info["name"]
-            except:
-                pass
-        size_raw = os.path.getsize(archive)
-        mod_list.append({
-            "orig_mod_name": orig_mod_name,
-            "displayed_name": displayed_name,
-            "size_raw": size_raw,
-            "enabled": orig_mod_name in enabled_mods,
-            "archive_path": archive
-        })
-    return mod_list
+    return get_mod_index().refresh(MODS_FOLDER, DATA_PACK_DIR, _load_enabled(), list_mod_files)
 
 
 def human_file_size(size, decimal_places=2):
@@ -75,172 +109,523 @@ def human_file_size(size, decimal_places=2):
     return f"{size:.{decimal_places}f} PB"
 
 
-def enable_mod(mod_name, parent_widget=None):
-    archive_file = None
+def _warn(parent_widget, message):
+    # Qt is only imported when a widget was passed, so the CLI never loads it
+    if isinstance(parent_widget, OperationContext):
+        parent_widget.warn(message)
+    elif parent_widget:
+        from PyQt5.QtWidgets import QMessageBox
+        QMessageBox.warning(parent_widget, "Error", message)
+
+
+def _progress(parent_widget, cancellable=True):
+    # Per-file progress hook for extraction when running under an OperationContext
+    if not isinstance(parent_widget, OperationContext):
+        return None
+    return parent_widget.advance if cancellable else parent_widget.report
+
+
+def _target_key():
+    target = current_target()
+    return None if target == DEFAULT_TARGET else target
+
+
+def _load_enabled():
+    return get_state().enabled_mods(_target_key())
+
+
+def _save_enabled(enabled_mods):
+    get_state().set_enabled(enabled_mods, _target_key())
+
+
+def _load_config():
+    return get_state().get_config()
+
+
+def get_game_folder():
+    target = current_target()
+    if target == DEFAULT_TARGET:
+        return get_state().config_value("Game_Folder", "")
+    return (get_state().config_value("Targets") or {}).get(target, "")
+
+
+# --- Game targets ---
+# "Targets" in config.json maps extra target names to game folders; each has its own enabled set
+# (Mods/Enabled.<name>.json) and deploy manifest, and all of them link from the one Data/store.
+def get_targets():
+    targets = {DEFAULT_TARGET: get_state().config_value("Game_Folder", "")}
+    for name, game_folder in (get_state().config_value("Targets") or {}).items():
+        if name != DEFAULT_TARGET:
+            targets[name] = game_folder
+    return targets
+
+
+def current_target():
+    return getattr(_target, "name", None) or DEFAULT_TARGET
+
+
+@contextmanager
+def use_target(target_name):
+    previous = getattr(_target, "name", None)
+    _target.name = target_name
+    try:
+        yield
+    finally:
+        _target.name = previous
+
+
+def call_on_target(target_name, func, *args):
+    with use_target(target_name):
+        return func(*args)
+
+
+def add_target(target_name, game_folder, parent_widget=None):
+    if not re.fullmatch(r"[A-Za-z0-9_-]+", target_name or "") or target_name == DEFAULT_TARGET:
+        _warn(parent_widget, "Target names may only use letters, digits, '-' and '_'.")
+        return False
+    if not os.path.isdir(os.path.join(game_folder, "svencoop_addon")):
+        _warn(parent_widget, "The selected folder does not contain 'svencoop_addon'.")
+        return False
+    game_folder = os.path.abspath(game_folder)
+    for name, folder in get_targets().items():
+        if name != target_name and folder and os.path.abspath(folder) == game_folder:
+            _warn(parent_widget, f"Target {name} already uses {game_folder}.")
+            return False
+    targets = dict(get_state().config_value("Targets") or {})
+    targets[target_name] = game_folder
+    get_state().update_config(Targets=targets)
+    return True
+
+
+def remove_target(target_name):
+    # Leaves the target's files and enabled set on disk
+    targets = dict(get_state().config_value("Targets") or {})
+    if targets.pop(target_name, None) is None:
+        return False
+    get_state().update_config(Targets=targets)
+    return True
+
+
+def run_on_targets(func, args=(), targets=None, parent_widget=None, archives=None):
+    # Runs func(*args, context) for each game target at once; returns {target: result}.
+    # Warnings come back prefixed with the target name. archives (paths) are imported into the
+    # store first, once, so the targets only link them.
+    targets = list(targets or get_targets())
+    context = parent_widget if isinstance(parent_widget, OperationContext) else OperationContext()
+    store_dir = get_store_dir()
+    if archives and store_dir and len(targets) > 1:
+        try:
+            # A failed import is tried again, and reported, by each target's own deploy
+            import_many(store_dir, archives, get_extract_workers(), context)
+        except OperationCancelled:
+            return {target: None for target in targets}
+
+    def run(target_name):
+        child = context.child()
+        result = None
+        with use_target(target_name):
+            try:
+                result = func(*args, child)
+            except OperationCancelled:
+                pass
+            except Exception as e:
+                child.warn(str(e))
+        for message in child.errors:
+            context.warn(f"[{target_name}] {message}")
+        return result
+
+    with ThreadPoolExecutor(max_workers=max(1, len(targets))) as pool:
+        results = dict(zip(targets, pool.map(run, targets)))
+    if context is not parent_widget:
+        for message in context.errors:
+            _warn(parent_widget, message)
+    return results
+
+
+def get_extract_workers():
+    # "Extract_Workers" in config.json; 0 or missing means one worker per CPU
+    try:
+        workers = int(_load_config().get("Extract_Workers", 0))
+    except (TypeError, ValueError):
+        workers = 0
+    return workers if workers > 0 else default_workers()
+
+
+def get_download_segments():
+    # "Download_Segments" in config.json: parallel byte ranges per large download
+    try:
+        segments = int(_load_config().get("Download_Segments", 4))
+    except (TypeError, ValueError):
+        segments = 4
+    return max(1, segments)
+
+
+def get_thumbnail_cache_mb():
+    # "Thumbnail_Cache_MB" in config.json: memory budget for decoded thumbnails
+    try:
+        budget = int(_load_config().get("Thumbnail_Cache_MB", 64))
+    except (TypeError, ValueError):
+        budget = 64
+    return max(8, budget)
+
+
+def get_screenshot_cache_mb():
+    # "Screenshot_Cache_MB" in config.json: disk budget for Data/.cache/screenshots
+    try:
+        budget = int(_load_config().get("Screenshot_Cache_MB", 256))
+    except (TypeError, ValueError):
+        budget = 256
+    return max(16, budget)
+
+
+def get_transcode_cache():
+    # "Transcode_7z" in config.json (extract deploy mode only; the store already holds every file
+    # on its own): re-pack each .7z once into a per-member zip, within "Transcode_Cache_MB" of disk
+    config = _load_config()
+    if not config.get("Transcode_7z", False) or get_store_dir():
+        return None
+    try:
+        budget = int(config.get("Transcode_Cache_MB", 2048))
+    except (TypeError, ValueError):
+        budget = 2048
+    return TranscodeCache(TRANSCODE_DIR, max(64, budget) * 1024 * 1024)
+
+
+def get_store_dir():
+    # "Deploy_Mode": "link" (default) deploys hardlinks from Data/store, "extract" unpacks straight into the addon folder
+    if _load_config().get("Deploy_Mode", "link") == "extract":
+        return None
+    return STORE_DIR
+
+
+@traced()
+def deploy_archive(archive_file, addon_folder, members=None, progress=None, stamps=None):
+    # With the manifest's stamps, files already on disk with the member's CRC32 are left alone
+    # (but still returned) and the stamps of the files written are updated
+    skipped = []
+    if stamps is not None:
+        details = get_archive_cache().details(archive_file)
+        wanted = list(details) if members is None else [m for m in members if m in details]
+        unchanged = unchanged_files(addon_folder, details, wanted, stamps)
+        if unchanged:
+            skipped = [m for m in wanted if m in unchanged]
+            members = [m for m in wanted if m not in unchanged]
+            if progress:
+                progress(len(skipped), 0)
+            if not members:
+                return skipped
+    store_dir = get_store_dir()
+    if store_dir:
+        written = store.deploy_archive(store_dir, archive_file, addon_folder, members, progress)
+    else:
+        transcode = get_transcode_cache()
+        extract = transcode.extract if transcode else extract_archive
+        written = extract(archive_file, addon_folder, members, progress)
+    if stamps is not None:
+        stamp_files(addon_folder, details, written, stamps)
+    return written + skipped
+
+
+def find_mod_archive(mod_name):
     for ext in [".zip", ".7z"]:
         path = os.path.join(MODS_FOLDER, mod_name + ext)
         if os.path.exists(path):
-            archive_file = path
-            break
-    if not archive_file:
-        if parent_widget:
-            QMessageBox.warning(parent_widget, "Error", "Selected mod file not found.")
-        return False
+            return path
+    return None
 
-    try:
-        with open(ENABLED_FILE, "r") as f:
-            enabled_mods = json.load(f)
-    except:
-        enabled_mods = []
-    if mod_name not in enabled_mods:
-        enabled_mods.append(mod_name)
-    with open(ENABLED_FILE, "w") as f:
-        json.dump(enabled_mods, f)
 
+def load_load_order():
+    # Mod names lowest priority first; a later mod's files win over an earlier one's
     try:
-        with open(CONFIG_FILE, "r") as f:
-            config = json.load(f)
-        game_folder = config.get("Game_Folder", "")
+        with open(LOAD_ORDER_FILE, "r") as f:
+            return json.load(f)
     except:
-        game_folder = ""
-    if not game_folder:
-        if parent_widget:
-            QMessageBox.warning(parent_widget, "Error", "Game folder not set in config.")
-        return False
-    addon_folder = os.path.join(game_folder, "svencoop_addon")
-    os.makedirs(addon_folder, exist_ok=True)
-    if archive_file.endswith(".zip"):
+        return []
+
+
+def save_load_order(load_order):
+    with open(LOAD_ORDER_FILE, "w") as f:
+        json.dump(load_order, f, indent=4)
+
+
+def apply_load_order(selected_mods):
+    # Mods missing from the load order keep their selection order and go first (lowest priority)
+    positions = {mod_name: index for index, mod_name in enumerate(load_load_order())}
+    unordered = [mod for mod in selected_mods if mod["orig_mod_name"] not in positions]
+    ordered = sorted((mod for mod in selected_mods if mod["orig_mod_name"] in positions),
+                     key=lambda mod: positions[mod["orig_mod_name"]])
+    return unordered + ordered
+
+
+def get_conflicts(mod_names=None):
+    # Overlapping files between mods (the enabled set by default), from cached listings only.
+    # A deployed file's winner is whoever owns it on disk (the manifest's owner stack); a mod
+    # that isn't deployed yet would go on top once enabled.
+    if mod_names is None:
+        mod_names = _load_enabled()
+    manifest = _target_manifest()
+    listings = []
+    for mod_name in _stacking_order([m for m in mod_names if find_mod_archive(m)], manifest):
+        archive_path = find_mod_archive(mod_name)
         try:
-            with zipfile.ZipFile(archive_file, 'r') as zip_ref:
-                zip_ref.extractall(addon_folder)
+            listings.append((mod_name, list_mod_files(archive_path)))
         except Exception as e:
-            if parent_widget:
-                QMessageBox.warning(parent_widget, "Error", f"Failed to extract zip archive: {e}")
-            return False
-    elif archive_file.endswith(".7z"):
+            print(f"Error reading archive {archive_path}: {e}")
+    conflicts = find_conflicts(listings)
+    if manifest:
+        for conflict in conflicts:
+            stack = [m for m in manifest.files.get(conflict["path"], []) if m in conflict["mods"]]
+            mods = stack + [m for m in conflict["mods"] if m not in stack]
+            conflict.update(mods=mods, winner=mods[-1])
+    return conflicts
+
+
+def get_conflict_report(mod_names=None):
+    return format_conflicts(get_conflicts(mod_names))
+
+
+@traced("manifest.load")
+def load_manifest(addon_folder):
+    # One manifest per svencoop_addon folder, kept under Data/ so the game tree stays untouched
+    key = hashlib.sha1(os.path.abspath(addon_folder).encode("utf-8")).hexdigest()[:16]
+    return DeployManifest(os.path.join(MANIFEST_DIR, f"{key}.json")).load()
+
+
+def _target_manifest():
+    # The current game target's manifest, or None when no game folder is set
+    game_folder = get_game_folder()
+    return load_manifest(os.path.join(game_folder, "svencoop_addon")) if game_folder else None
+
+
+@traced()
+def _remove_deployed_files(addon_folder, relpaths, parent_widget=None):
+    progress = _progress(parent_widget, cancellable=False)
+    parents = set()
+    for relpath in relpaths:
+        file_path = os.path.join(addon_folder, *relpath.split("/"))
         try:
-            import py7zr
-            with py7zr.SevenZipFile(archive_file, mode='r') as z:
-                z.extractall(path=addon_folder)
+            if os.path.isfile(file_path) or os.path.islink(file_path):
+                os.unlink(file_path)
         except Exception as e:
-            if parent_widget:
-                QMessageBox.warning(parent_widget, "Error", f"Failed to extract 7z archive: {e}")
-            return False
+            _warn(parent_widget, f"Failed to delete {file_path}: {e}")
+        parents.add(os.path.dirname(file_path))
+        if progress:
+            progress(1, 0)
+    # Prune directories left empty, deepest first, never the addon folder itself
+    addon_root = os.path.abspath(addon_folder)
+    for folder in sorted(parents, key=len, reverse=True):
+        folder = os.path.abspath(folder)
+        while folder != addon_root and folder.startswith(addon_root + os.sep):
+            try:
+                os.rmdir(folder)
+            except OSError:
+                break
+            folder = os.path.dirname(folder)
+
+
+@traced()
+def _wipe_addon_folder(addon_folder, parent_widget=None):
+    # Bottom-up so progress counts every file removed, not every top-level entry
+    for root, dirs, files in os.walk(addon_folder, topdown=False):
+        for name in files + [d for d in dirs if os.path.islink(os.path.join(root, d))]:
+            file_path = os.path.join(root, name)
+            try:
+                os.unlink(file_path)
+            except Exception as e:
+                _warn(parent_widget, f"Failed to delete {file_path}: {e}")
+                continue
+            if isinstance(parent_widget, OperationContext):
+                parent_widget.report(1, 0)
+        for name in dirs:
+            dir_path = os.path.join(root, name)
+            if os.path.isdir(dir_path) and not os.path.islink(dir_path):
+                try:
+                    os.rmdir(dir_path)
+                except OSError:
+                    pass  # still holds a file that failed above and was already reported
+
+
+@traced()
+def _rebuild_addon(addon_folder, enabled_mods, manifest, parent_widget=None):
+    # Full wipe-and-replay, only used when the manifest can't account for what is deployed
+    _wipe_addon_folder(addon_folder, parent_widget)
+    manifest.clear()
+    for mod in enabled_mods:
+        archive_path = find_mod_archive(mod)
+        if not archive_path:
+            continue
+        try:
+            written = deploy_archive(archive_path, addon_folder, progress=_progress(parent_widget, False),
+                                     stamps=manifest.stamps)
+            manifest.add_mod(mod, archive_path, written)
+        except Exception as e:
+            _warn(parent_widget, f"Failed to extract archive for {mod}: {e}")
+    manifest.save()
     return True
 
 
-def enable_all_mods(selected_mods, parent_widget=None):
-    try:
-        with open(ENABLED_FILE, "r") as f:
-            enabled_mods = json.load(f)
-    except:
-        enabled_mods = []
-    try:
-        with open(CONFIG_FILE, "r") as f:
-            config = json.load(f)
-        game_folder = config.get("Game_Folder", "")
-    except:
-        game_folder = ""
+@traced()
+def _undeploy(manifest, mod_name, addon_folder, parent_widget=None):
+    # Only touch this mod's files: drop the ones nobody else ships, hand shared ones back to the next owner
+    orphaned, restore = manifest.remove_mod(mod_name)
+    if isinstance(parent_widget, OperationContext):
+        parent_widget.add_total(len(orphaned) + sum(len(paths) for paths in restore.values()))
+    _remove_deployed_files(addon_folder, orphaned, parent_widget)
+    for owner, relpaths in restore.items():
+        archive_path = manifest.mods[owner].get("archive")
+        if not archive_path or not os.path.exists(archive_path):
+            archive_path = find_mod_archive(owner)
+        if not archive_path:
+            continue
+        try:
+            deploy_archive(archive_path, addon_folder, relpaths, _progress(parent_widget, cancellable=False),
+                           manifest.stamps)
+        except Exception as e:
+            _warn(parent_widget, f"Failed to restore files from {owner}: {e}")
+
+
+@traced()
+def enable_mod(mod_name, parent_widget=None):
+    tracing.annotate(mod=mod_name, target=current_target())
+    archive_file = find_mod_archive(mod_name)
+    if not archive_file:
+        _warn(parent_widget, "Selected mod file not found.")
+        return False
+
+    enabled_mods = _load_enabled()
+    newly_enabled = mod_name not in enabled_mods
+    if newly_enabled:
+        enabled_mods.append(mod_name)
+    _save_enabled(enabled_mods)
+
+    game_folder = get_game_folder()
     if not game_folder:
-        if parent_widget:
-            QMessageBox.warning(parent_widget, "Error", "Game folder not set in config.")
+        _warn(parent_widget, "Game folder not set in config.")
         return False
     addon_folder = os.path.join(game_folder, "svencoop_addon")
     os.makedirs(addon_folder, exist_ok=True)
-    for mod in selected_mods:
-        mod_name = mod["orig_mod_name"]
-        if mod_name not in enabled_mods:
-            enabled_mods.append(mod_name)
-        archive_file = mod["archive_path"]
-        if archive_file.endswith(".zip"):
-            try:
-                with zipfile.ZipFile(archive_file, 'r') as zip_ref:
-                    zip_ref.extractall(addon_folder)
-            except Exception as e:
-                if parent_widget:
-                    QMessageBox.warning(parent_widget, "Error", f"Failed to extract zip archive for {mod_name}: {e}")
-        elif archive_file.endswith(".7z"):
+    manifest = load_manifest(addon_folder)
+    progress = _progress(parent_widget)
+    try:
+        if progress:
+            listing = list_mod_files(archive_file)
+            parent_widget.add_total(len(listing), sum(listing.values()))
+        written = deploy_archive(archive_file, addon_folder, progress=progress, stamps=manifest.stamps)
+    except Exception as e:
+        if isinstance(e, OperationCancelled):
+            _warn(parent_widget, f"Enabling {mod_name} was cancelled.")
+        else:
+            kind = "zip" if archive_file.endswith(".zip") else "7z"
+            _warn(parent_widget, f"Failed to extract {kind} archive: {e}")
+        if newly_enabled:
+            # Take back whatever was written before the failure
+            _save_enabled([m for m in enabled_mods if m != mod_name])
             try:
-                import py7zr
-                with py7zr.SevenZipFile(archive_file, mode='r') as z:
-                    z.extractall(path=addon_folder)
-            except Exception as e:
-                if parent_widget:
-                    QMessageBox.warning(parent_widget, "Error", f"Failed to extract 7z archive for {mod_name}: {e}")
-    with open(ENABLED_FILE, "w") as f:
-        json.dump(enabled_mods, f)
+                manifest.add_mod(mod_name, archive_file, list_mod_files(archive_file))
+                _undeploy(manifest, mod_name, addon_folder)
+                manifest.save()
+            except Exception as rollback_error:
+                print(f"Error rolling back {mod_name}: {rollback_error}")
+        return False
+    manifest.add_mod(mod_name, archive_file, written)
+    manifest.save()
     return True
 
 
+@traced()
+def enable_all_mods(selected_mods, parent_widget=None):
+    # Returns one entry per archive (see extractor.report_summary), or False when nothing could be tried
+    tracing.annotate(mods=len(selected_mods), target=current_target())
+    enabled_mods = _load_enabled()
+    game_folder = get_game_folder()
+    if not game_folder:
+        _warn(parent_widget, "Game folder not set in config.")
+        return False
+    addon_folder = os.path.join(game_folder, "svencoop_addon")
+    os.makedirs(addon_folder, exist_ok=True)
+    manifest = load_manifest(addon_folder)
+    archives = [(mod["orig_mod_name"], mod["archive_path"]) for mod in apply_load_order(selected_mods)]
+    context = parent_widget if isinstance(parent_widget, OperationContext) else None
+    report = extract_many(archives, addon_folder, get_extract_workers(), get_store_dir(), context, list_mod_files,
+                          manifest.stamps, get_archive_cache().details, get_transcode_cache())
+    # Per-archive results and timings go back to the caller (and into the trace when it is on)
+    summary = report_summary(report)
+    tracing.annotate(archives=summary)
+    rolled_back = []
+    for entry in report:
+        mod_name = entry["mod"]
+        if not entry["error"]:
+            if mod_name not in enabled_mods:
+                enabled_mods.append(mod_name)
+            manifest.add_mod(mod_name, entry["archive"], entry["files"])
+            continue
+        _warn(parent_widget, f"{entry['error']} ({mod_name})")
+        if mod_name not in enabled_mods and entry["files"]:
+            # Record it in selection order so undeploying hands paths back to the right owner
+            manifest.add_mod(mod_name, entry["archive"], entry["files"])
+            rolled_back.append(mod_name)
+    for mod_name in rolled_back:
+        _undeploy(manifest, mod_name, addon_folder)
+    manifest.save()
+    _save_enabled(enabled_mods)
+    return summary
+
+
+@traced()
 def disable_mod(mod_name, parent_widget=None):
-    try:
-        with open(ENABLED_FILE, "r") as f:
-            enabled_mods = json.load(f)
-    except:
-        enabled_mods = []
+    tracing.annotate(mod=mod_name, target=current_target())
+    enabled_mods = _load_enabled()
+    previously_enabled = [m for m in enabled_mods if find_mod_archive(m)]
     if mod_name in enabled_mods:
         enabled_mods.remove(mod_name)
-    with open(ENABLED_FILE, "w") as f:
-        json.dump(enabled_mods, f)
-    try:
-        with open(CONFIG_FILE, "r") as f:
-            config = json.load(f)
-        game_folder = config.get("Game_Folder", "")
-    except:
-        game_folder = ""
+    _save_enabled(enabled_mods)
+    game_folder = get_game_folder()
     if not game_folder:
-        if parent_widget:
-            QMessageBox.warning(parent_widget, "Error", "Game folder not set in config.")
+        _warn(parent_widget, "Game folder not set in config.")
         return False
     addon_folder = os.path.join(game_folder, "svencoop_addon")
-    if os.path.isdir(addon_folder):
-        for filename in os.listdir(addon_folder):
-            file_path = os.path.join(addon_folder, filename)
-            try:
-                if os.path.isfile(file_path) or os.path.islink(file_path):
-                    os.unlink(file_path)
-                elif os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
-            except Exception as e:
-                if parent_widget:
-                    QMessageBox.warning(parent_widget, "Error", f"Failed to delete {file_path}: {e}")
-    else:
-        if parent_widget:
-            QMessageBox.warning(parent_widget, "Error", "svencoop_addon folder not found in game folder.")
+    if not os.path.isdir(addon_folder):
+        _warn(parent_widget, "svencoop_addon folder not found in game folder.")
         return False
-    # Re-enable remaining mods
-    for mod in enabled_mods:
-        for ext in [".zip", ".7z"]:
-            archive_path = os.path.join(MODS_FOLDER, mod + ext)
-            if os.path.exists(archive_path):
-                if archive_path.endswith(".zip"):
-                    try:
-                        with zipfile.ZipFile(archive_path, 'r') as zip_ref:
-                            zip_ref.extractall(addon_folder)
-                    except Exception as e:
-                        if parent_widget:
-                            QMessageBox.warning(parent_widget, "Error", f"Failed to extract zip archive: {e}")
-                elif archive_path.endswith(".7z"):
-                    try:
-                        import py7zr
-                        with py7zr.SevenZipFile(archive_path, mode='r') as z:
-                            z.extractall(path=addon_folder)
-                    except Exception as e:
-                        if parent_widget:
-                            QMessageBox.warning(parent_widget, "Error", f"Failed to extract 7z archive: {e}")
+    manifest = load_manifest(addon_folder)
+    if not manifest.covers(previously_enabled):
+        return _rebuild_addon(addon_folder, enabled_mods, manifest, parent_widget)
+    _undeploy(manifest, mod_name, addon_folder, parent_widget)
+    manifest.save()
     return True
 
 
-def delete_mod(mod_name, parent_widget=None):
+def _delete_mod_archive(mod_name, parent_widget=None):
     for ext in [".zip", ".7z"]:
         file_path = os.path.join(MODS_FOLDER, mod_name + ext)
         if os.path.exists(file_path):
             try:
+                store.forget_archive(STORE_DIR, file_path)
+                TranscodeCache(TRANSCODE_DIR, 0).forget(file_path)
+                get_archive_cache().forget(file_path)
                 os.remove(file_path)
             except Exception as e:
-                if parent_widget:
-                    QMessageBox.warning(parent_widget, "Error", f"Failed to delete {file_path}: {e}")
+                _warn(parent_widget, f"Failed to delete {file_path}: {e}")
     remove_from_download_cache_by_zipname(mod_name)
+
+
+@traced()
+def delete_mod(mod_name, parent_widget=None):
+    _delete_mod_archive(mod_name, parent_widget)
+    store.collect_garbage(STORE_DIR)
+    return True
+
+
+@traced()
+def delete_mods(mod_names, parent_widget=None):
+    if isinstance(parent_widget, OperationContext):
+        parent_widget.add_total(len(mod_names))
+    with get_state().batch():
+        for mod_name in mod_names:
+            _delete_mod_archive(mod_name, parent_widget)
+            if isinstance(parent_widget, OperationContext):
+                parent_widget.advance(1)
+    store.collect_garbage(STORE_DIR)
     return True
 
 
@@ -283,82 +668,352 @@ def set_mod_thumbnail(mod_name, source_path, parent_widget=None):
     os.makedirs(mod_data_dir, exist_ok=True)
     thumb_path = os.path.join(mod_data_dir, "thumbnail.jpg")
     try:
+        from PIL import Image
         im = Image.open(source_path)
         rgb_im = im.convert('RGB')
         rgb_im.save(thumb_path, format='JPEG')
     except Exception as e:
-        if parent_widget:
-            QMessageBox.warning(parent_widget, "Error", f"Failed to convert and save image: {e}")
+        _warn(parent_widget, f"Failed to convert and save image: {e}")
         return False
     return True
 
 
 def load_download_cache():
-    cache_path = os.path.join(DATA_DIR, "Download_Cache.json")
-    if os.path.exists(cache_path):
-        try:
-            with open(cache_path, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except Exception as e:
-            print(f"Error loading Download_Cache.json: {e}")
-    return {}
+    return get_state().download_cache()
 
 
 def save_download_cache(cache):
-    cache_path = os.path.join(DATA_DIR, "Download_Cache.json")
-    try:
-        with open(cache_path, "w", encoding="utf-8") as f:
-            json.dump(cache, f, indent=4, ensure_ascii=False)
-    except Exception as e:
-        print(f"Error saving Download_Cache.json: {e}")
+    get_state().set_download_cache(cache)
 
 
 def remove_from_download_cache_by_title(mod_title):
-    cache = load_download_cache()
-    keys_to_remove = [key for key, val in cache.items() if val.get("Title", "").strip() == mod_title.strip()]
-    for key in keys_to_remove:
-        del cache[key]
-    save_download_cache(cache)
+    get_state().remove_downloads_by_title(mod_title)
 
 
 def remove_from_download_cache_by_zipname(zip_name):
-    cache = load_download_cache()
-    keys_to_remove = [
-        key for key, val in cache.items()
-        if os.path.splitext(val.get("zipName", ""))[0].strip().lower() == zip_name.strip().lower()
-    ]
-    for key in keys_to_remove:
-        del cache[key]
-    save_download_cache(cache)
+    get_state().remove_downloads_by_zipname(zip_name)
 
 
-def disable_all_mods(parent_widget=None):
-    with open(ENABLED_FILE, "w") as f:
-        json.dump([], f)
-    try:
-        with open(CONFIG_FILE, "r") as f:
-            config = json.load(f)
-        game_folder = config.get("Game_Folder", "")
-    except:
-        game_folder = ""
+def load_profiles():
+    return get_state().get_profiles()
+
+
+def _stacking_order(mod_names, manifest=None):
+    # Deployed mods in the order this target's manifest stacks them (lowest priority first),
+    # then the others in load order
+    manifest = manifest or _target_manifest()
+    deployed = [m for m in (manifest.mods if manifest else ()) if m in mod_names]
+    rest = apply_load_order([{"orig_mod_name": m} for m in mod_names if m not in deployed])
+    return deployed + [mod["orig_mod_name"] for mod in rest]
+
+
+def save_profile(profile_name, mod_names=None):
+    # Defaults to the enabled mods in the order they currently win over each other
+    if mod_names is None:
+        mod_names = _stacking_order(_load_enabled())
+    get_state().set_profile(profile_name, mod_names)
+    return True
+
+
+def delete_profile(profile_name):
+    get_state().delete_profile(profile_name)
+    return True
+
+
+@traced()
+def _restack(manifest, mod_order, addon_folder, parent_widget=None):
+    # Hands every shared file to whichever of its owners comes last in mod_order
+    positions = {mod_name: index for index, mod_name in enumerate(mod_order)}
+    restore = {}
+    for relpath, owners in manifest.files.items():
+        if len(owners) < 2:
+            continue
+        wanted = sorted(owners, key=lambda mod_name: positions.get(mod_name, -1))
+        if wanted == owners:
+            continue
+        manifest.files[relpath] = wanted
+        if wanted[-1] != owners[-1]:
+            restore.setdefault(wanted[-1], []).append(relpath)
+    # manifest.mods is the stacking order as well (verify reads it), so it follows suit
+    manifest.mods = {mod_name: manifest.mods[mod_name]
+                     for mod_name in sorted(manifest.mods, key=lambda mod_name: positions.get(mod_name, -1))}
+    for owner, relpaths in restore.items():
+        archive_path = find_mod_archive(owner)
+        if not archive_path:
+            continue
+        try:
+            deploy_archive(archive_path, addon_folder, relpaths, _progress(parent_widget, cancellable=False),
+                           manifest.stamps)
+        except Exception as e:
+            _warn(parent_widget, f"Failed to restore files from {owner}: {e}")
+    return sorted(restore)
+
+
+@traced()
+def restack_to_load_order(parent_widget=None):
+    # Applies Load_Order.json to what this target already has deployed: shared files whose
+    # winner changed are rewritten from their new owner. Mods not in the load order keep
+    # their current place below the ordered ones, as in apply_load_order.
+    addon_folder = _addon_folder(parent_widget)
+    if not addon_folder:
+        return None
+    manifest = load_manifest(addon_folder)
+    order = [mod["orig_mod_name"] for mod in apply_load_order([{"orig_mod_name": m} for m in manifest.mods])]
+    restacked = _restack(manifest, order, addon_folder, parent_widget)
+    manifest.save()
+    return {"restacked": restacked}
+
+
+@traced()
+def switch_profile(profile_name, parent_widget=None):
+    # Undeploys only the mods the profile doesn't have and deploys only the ones it adds;
+    # mods in both keep their files, apart from shared files whose winner changed
+    tracing.annotate(profile=profile_name, target=current_target())
+    profiles = load_profiles()
+    if profile_name not in profiles:
+        _warn(parent_widget, f"Profile {profile_name} not found.")
+        return None
+    game_folder = get_game_folder()
     if not game_folder:
-        if parent_widget:
-            QMessageBox.warning(parent_widget, "Error", "Game folder not set in config.")
-        return False
+        _warn(parent_widget, "Game folder not set in config.")
+        return None
+    target = []
+    for mod_name in profiles[profile_name]:
+        if find_mod_archive(mod_name):
+            target.append(mod_name)
+        else:
+            _warn(parent_widget, f"Archive not found for {mod_name}, skipped.")
     addon_folder = os.path.join(game_folder, "svencoop_addon")
-    if os.path.isdir(addon_folder):
-        for filename in os.listdir(addon_folder):
-            file_path = os.path.join(addon_folder, filename)
-            try:
-                if os.path.isfile(file_path) or os.path.islink(file_path):
-                    os.unlink(file_path)
-                elif os.path.isdir(file_path):
-                    shutil.rmtree(file_path)
-            except Exception as e:
-                if parent_widget:
-                    QMessageBox.warning(parent_widget, "Error", f"Failed to delete {file_path}: {e}")
-    else:
-        if parent_widget:
-            QMessageBox.warning(parent_widget, "Error", "svencoop_addon folder not found in game folder.")
+    os.makedirs(addon_folder, exist_ok=True)
+    current = _load_enabled()
+    # Load_Order.json is shared by every game target, so it is left alone: the profile's order
+    # is applied to this target's manifest by _restack once the added mods are deployed
+    manifest = load_manifest(addon_folder)
+    deployed = [m for m in current if find_mod_archive(m)]
+    if deployed and not manifest.covers(deployed):
+        _save_enabled(target)
+        _rebuild_addon(addon_folder, target, manifest, parent_widget)
+        return {"added": target, "removed": current, "restacked": [], "rebuilt": True}
+    removed = [m for m in current if m not in target]
+    added = [m for m in target if m not in current]
+    with get_state().batch():
+        for mod_name in removed:
+            _undeploy(manifest, mod_name, addon_folder, parent_widget)
+        manifest.save()
+        _save_enabled([m for m in current if m in target])
+        if added:
+            enable_all_mods([{"orig_mod_name": m, "archive_path": find_mod_archive(m)} for m in added],
+                            parent_widget)
+        enabled = set(_load_enabled())
+        order = [m for m in target if m in enabled]
+        _save_enabled(order)
+    manifest = load_manifest(addon_folder)
+    restacked = _restack(manifest, order, addon_folder, parent_widget)
+    manifest.save()
+    return {"added": [m for m in added if m in enabled], "removed": removed, "restacked": restacked,
+            "rebuilt": False}
+
+
+@traced()
+def disable_all_mods(parent_widget=None):
+    # Enabled.json is only cleared once there is an addon folder to clear as well
+    addon_folder = _addon_folder(parent_widget)
+    if not addon_folder:
         return False
+    _save_enabled([])
+    _wipe_addon_folder(addon_folder, parent_widget)
+    manifest = load_manifest(addon_folder)
+    manifest.clear()
+    manifest.save()
     return True
+
+
+def _addon_folder(parent_widget=None):
+    game_folder = get_game_folder()
+    if not game_folder:
+        _warn(parent_widget, "Game folder not set in config.")
+        return None
+    addon_folder = os.path.join(game_folder, "svencoop_addon")
+    if not os.path.isdir(addon_folder):
+        _warn(parent_widget, "svencoop_addon folder not found in game folder.")
+        return None
+    return addon_folder
+
+
+@traced()
+def sync_addon(parent_widget=None):
+    # Brings svencoop_addon in line with Enabled.json: deploys enabled mods the manifest doesn't
+    # have and undeploys the ones that are no longer enabled
+    addon_folder = _addon_folder(parent_widget)
+    if not addon_folder:
+        return None
+    enabled_mods = _load_enabled()
+    manifest = load_manifest(addon_folder)
+    missing = [m for m in enabled_mods if not find_mod_archive(m)]
+    for mod_name in missing:
+        _warn(parent_widget, f"Archive not found for enabled mod {mod_name}.")
+    stale = [m for m in manifest.mods if m not in enabled_mods]
+    for mod_name in stale:
+        _undeploy(manifest, mod_name, addon_folder, parent_widget)
+    manifest.save()
+    to_deploy = [{"orig_mod_name": m, "archive_path": find_mod_archive(m)}
+                 for m in enabled_mods if m not in manifest.mods and m not in missing]
+    if to_deploy:
+        enable_all_mods(to_deploy, parent_widget)
+    return {"deployed": [mod["orig_mod_name"] for mod in to_deploy], "removed": stale, "missing": missing}
+
+
+def _expected_files(manifest, enabled_mods):
+    # relpath -> (owner, size, crc32) built from the enabled archives. A path the manifest tracks
+    # belongs to the top of its owner stack (which _restack reorders); other paths follow the
+    # manifest's mod order. Enabled mods it doesn't have yet go on top either way.
+    order = [m for m in manifest.mods if m in enabled_mods] + [m for m in enabled_mods if m not in manifest.mods]
+    expected = {}
+    archives = {}
+    details = {}
+    for mod_name in order:
+        archive_path = manifest.mods.get(mod_name, {}).get("archive")
+        if not archive_path or not os.path.exists(archive_path):
+            archive_path = find_mod_archive(mod_name)
+        if not archive_path:
+            continue
+        archives[mod_name] = archive_path
+        details[mod_name] = get_archive_cache().details(archive_path)
+        for relpath, (size, crc) in details[mod_name].items():
+            expected[relpath] = (mod_name, size, crc)
+    for relpath, (owner, size, crc) in list(expected.items()):
+        if owner not in manifest.mods or relpath not in manifest.files:
+            continue
+        for mod_name in reversed(manifest.files[relpath]):
+            if relpath in details.get(mod_name, ()):
+                expected[relpath] = (mod_name,) + tuple(details[mod_name][relpath])
+                break
+    return expected, archives
+
+
+def _check_files(addon_folder, manifest, expected, rehash=False, parent_widget=None):
+    # Size first, then the (size, mtime) stamp of the last check; only files that pass the size
+    # check but not the stamp are read, in parallel, and compared with the archive's CRC32
+    missing, modified, to_hash = [], [], []
+    for relpath, (owner, size, crc) in expected.items():
+        try:
+            st = os.stat(os.path.join(addon_folder, *relpath.split("/")))
+        except OSError:
+            missing.append(relpath)
+            continue
+        if st.st_size != size:
+            modified.append(relpath)
+            continue
+        stamp = manifest.stamps.get(relpath)
+        if crc is None or (not rehash and stamp == [st.st_size, st.st_mtime_ns, crc]):
+            continue
+        to_hash.append((relpath, st, crc))
+    if isinstance(parent_widget, OperationContext):
+        parent_widget.add_total(len(to_hash), sum(st.st_size for relpath, st, crc in to_hash))
+
+    def check(job):
+        relpath, st, crc = job
+        if isinstance(parent_widget, OperationContext):
+            parent_widget.check_cancelled()
+        matches = file_crc32(os.path.join(addon_folder, *relpath.split("/"))) == crc
+        if isinstance(parent_widget, OperationContext):
+            parent_widget.advance(1, st.st_size)
+        return matches
+
+    with tracing.span("verify.hash", files=len(to_hash)):
+        with ThreadPoolExecutor(max_workers=get_extract_workers()) as pool:
+            for (relpath, st, crc), matches in zip(to_hash, pool.map(check, to_hash)):
+                if matches:
+                    manifest.stamps[relpath] = [st.st_size, st.st_mtime_ns, crc]
+                else:
+                    modified.append(relpath)
+    return sorted(missing), sorted(modified), len(to_hash)
+
+
+def _extra_files(addon_folder, expected, ignored=()):
+    extra = []
+    for dirpath, dirnames, filenames in os.walk(addon_folder):
+        folder = os.path.relpath(dirpath, addon_folder).replace(os.sep, "/")
+        for filename in filenames:
+            relpath = filename if folder == "." else f"{folder}/{filename}"
+            if relpath not in expected and relpath not in ignored:
+                extra.append(relpath)
+    return sorted(extra)
+
+
+def _verify(addon_folder, rehash=False, parent_widget=None):
+    enabled_mods = _load_enabled()
+    manifest = load_manifest(addon_folder)
+    expected, archives = _expected_files(manifest, enabled_mods)
+    missing_archives = [m for m in enabled_mods if m not in archives]
+    missing, modified, hashed = _check_files(addon_folder, manifest, expected, rehash, parent_widget)
+    # Files of enabled mods whose archive is gone can't be checked, but aren't strays either
+    unknown = {relpath for m in missing_archives for relpath in manifest.files_of(m)}
+    report = {
+        "missing_files": missing,
+        "modified_files": modified,
+        "extra_files": _extra_files(addon_folder, expected, unknown),
+        "not_deployed": [m for m in enabled_mods if m not in manifest.mods],
+        "not_enabled": [m for m in manifest.mods if m not in enabled_mods],
+        "missing_archives": missing_archives,
+        "checked": len(expected),
+        "hashed": hashed,
+    }
+    # Only the stamp cache changed; it makes the next check read just the files touched since
+    if manifest.exists or manifest.mods:
+        manifest.save()
+    return report, manifest, expected, archives
+
+
+@traced()
+def verify_addon(parent_widget=None, rehash=False):
+    # Compares svencoop_addon with what the enabled archives deploy: missing, modified and extra files.
+    # rehash reads every file instead of trusting the (size, mtime) stamps of earlier checks.
+    addon_folder = _addon_folder(parent_widget)
+    if not addon_folder:
+        return None
+    return _verify(addon_folder, rehash, parent_widget)[0]
+
+
+@traced()
+def repair_addon(parent_widget=None, remove_extra=False, rehash=False):
+    # Rewrites only the missing and modified files, each from the archive that should own it;
+    # extra files are left alone unless remove_extra is set
+    addon_folder = _addon_folder(parent_widget)
+    if not addon_folder:
+        return None
+    report, manifest, expected, archives = _verify(addon_folder, rehash, parent_widget)
+    drifted = {}
+    for relpath in report["missing_files"] + report["modified_files"]:
+        drifted.setdefault(expected[relpath][0], []).append(relpath)
+        manifest.stamps.pop(relpath, None)
+    store_dir = get_store_dir()
+    if store_dir:
+        # A hardlink edited in place damaged the store object it shares; re-import those archives
+        for mod_name, relpaths in drifted.items():
+            store.discard_damaged(store_dir, archives[mod_name], addon_folder, relpaths)
+    if isinstance(parent_widget, OperationContext):
+        parent_widget.add_total(sum(len(relpaths) for relpaths in drifted.values()))
+    rewritten, failed = [], []
+    for mod_name, relpaths in drifted.items():
+        try:
+            rewritten += deploy_archive(archives[mod_name], addon_folder, relpaths, _progress(parent_widget, False),
+                                        manifest.stamps)
+        except Exception as e:
+            _warn(parent_widget, f"Failed to repair files from {mod_name}: {e}")
+            failed += relpaths
+    # Enabled mods that were never deployed are now, so the manifest takes them on top
+    for mod_name in report["not_deployed"]:
+        if mod_name in archives and not any(relpath in failed for relpath in drifted.get(mod_name, ())):
+            manifest.add_mod(mod_name, archives[mod_name], list(get_archive_cache().details(archives[mod_name])))
+    removed = []
+    if remove_extra:
+        if isinstance(parent_widget, OperationContext):
+            parent_widget.add_total(len(report["extra_files"]))
+        for mod_name in report["not_enabled"]:
+            manifest.remove_mod(mod_name)
+        _remove_deployed_files(addon_folder, report["extra_files"], parent_widget)
+        removed = report["extra_files"]
+    manifest.save()
+    return {"rewritten": sorted(rewritten), "failed": sorted(failed), "removed": removed,
+            "extra_files": [] if remove_extra else report["extra_files"]}
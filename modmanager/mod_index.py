@@ -0,0 +1,169 @@
+import os, json, sqlite3, threading
+from modmanager.extractor import list_archive
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mods (
+    path TEXT PRIMARY KEY,
+    orig_mod_name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime INTEGER NOT NULL,
+    info_stamp TEXT NOT NULL,
+    displayed_name TEXT NOT NULL,
+    description TEXT NOT NULL,
+    thumbnail_path TEXT NOT NULL,
+    enabled INTEGER NOT NULL,
+    file_count INTEGER,
+    extracted_size INTEGER
+)
+"""
+
+COLUMNS = ("path", "orig_mod_name", "size", "mtime", "info_stamp", "displayed_name", "description",
+           "thumbnail_path", "enabled", "file_count", "extracted_size")
+
+
+# --- On-disk index of Mods/ keyed by (path, size, mtime) ---
+# A refresh is one scandir of Mods/ and data-pack/; only archives or info.json/thumbnail
+# files whose stamps moved are re-read.
+class ModIndex:
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None
+        self._rows = None
+        self._mods = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            self._conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(SCHEMA)
+        return self._conn
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+                self._rows = None
+                self._mods = None
+
+    @staticmethod
+    def _info_stamp(mod_data_dir):
+        stamp = []
+        for name in ("info.json", "thumbnail.jpg"):
+            try:
+                stamp.append(str(os.stat(os.path.join(mod_data_dir, name)).st_mtime_ns))
+            except OSError:
+                stamp.append("")
+        return ":".join(stamp)
+
+    @staticmethod
+    def _read_info(mod_data_dir, orig_mod_name):
+        displayed_name = orig_mod_name
+        description = ""
+        info_path = os.path.join(mod_data_dir, "info.json")
+        if os.path.exists(info_path):
+            try:
+                with open(info_path, "r") as f:
+                    info = json.load(f)
+                if "name" in info and info["name"]:
+                    displayed_name = info["name"]
+                description = info.get("description", "") or ""
+            except:
+                pass
+        thumb_path = os.path.join(mod_data_dir, "thumbnail.jpg")
+        return displayed_name, description, thumb_path if os.path.exists(thumb_path) else ""
+
+    def _load_rows(self):
+        # In-memory mirror of the table so an unchanged refresh never has to hit SQLite
+        if self._rows is None:
+            conn = self._connect()
+            self._rows = {row[0]: row for row in conn.execute(f"SELECT {', '.join(COLUMNS)} FROM mods")}
+            self._mods = None
+        return self._rows
+
+    def refresh(self, mods_folder, data_pack_dir, enabled_mods, lister=list_archive):
+        enabled = set(enabled_mods)
+        with self._lock:
+            rows = self._load_rows()
+            try:
+                data_dirs = {e.name for e in os.scandir(data_pack_dir) if e.is_dir()}
+            except OSError:
+                data_dirs = set()
+            seen = set()
+            changed = []
+            toggled = []
+            for entry in os.scandir(mods_folder):
+                name = entry.name
+                if name.endswith(".zip"):
+                    orig_mod_name = name[:-4]
+                elif name.endswith(".7z"):
+                    orig_mod_name = name[:-3]
+                else:
+                    continue
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+                path = entry.path
+                seen.add(path)
+                if orig_mod_name in data_dirs:
+                    mod_data_dir = os.path.join(data_pack_dir, orig_mod_name)
+                    info_stamp = self._info_stamp(mod_data_dir)
+                else:
+                    mod_data_dir = None
+                    info_stamp = ""
+                is_enabled = int(orig_mod_name in enabled)
+                row = rows.get(path)
+                archive_same = row is not None and row[2] == st.st_size and row[3] == st.st_mtime_ns
+                if archive_same and row[4] == info_stamp:
+                    if row[8] != is_enabled:
+                        toggled.append(row[:8] + (is_enabled,) + row[9:])
+                    continue
+                if archive_same:
+                    file_count, extracted_size = row[9], row[10]
+                else:
+                    try:
+                        listing = lister(path)
+                        file_count, extracted_size = len(listing), sum(listing.values())
+                    except Exception as e:
+                        print(f"Error reading archive {name}: {e}")
+                        file_count, extracted_size = None, None
+                if mod_data_dir:
+                    displayed_name, description, thumb_path = self._read_info(mod_data_dir, orig_mod_name)
+                else:
+                    displayed_name, description, thumb_path = orig_mod_name, "", ""
+                changed.append((path, orig_mod_name, st.st_size, st.st_mtime_ns, info_stamp, displayed_name,
+                                description, thumb_path, is_enabled, file_count, extracted_size))
+            removed = [path for path in rows if path not in seen]
+            if not (changed or toggled or removed) and self._mods is not None:
+                return list(self._mods)
+            conn = self._connect()
+            if changed or toggled:
+                conn.executemany(f"INSERT OR REPLACE INTO mods ({', '.join(COLUMNS)}) "
+                                 f"VALUES ({', '.join('?' for _ in COLUMNS)})", changed + toggled)
+            if removed:
+                conn.executemany("DELETE FROM mods WHERE path = ?", [(path,) for path in removed])
+            conn.commit()
+            for row in changed + toggled:
+                rows[row[0]] = row
+            for path in removed:
+                del rows[path]
+            self._mods = [self._to_mod(row) for row in sorted(rows.values(), key=lambda r: r[1].lower())]
+            return list(self._mods)
+
+    @staticmethod
+    def _to_mod(row):
+        values = dict(zip(COLUMNS, row))
+        return {
+            "orig_mod_name": values["orig_mod_name"],
+            "displayed_name": values["displayed_name"],
+            "description": values["description"],
+            "thumbnail_path": values["thumbnail_path"],
+            "size_raw": values["size"],
+            "mtime": values["mtime"],
+            "enabled": bool(values["enabled"]),
+            "archive_path": values["path"],
+            "file_count": values["file_count"],
+            "extracted_size": values["extracted_size"],
+        }
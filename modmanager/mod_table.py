@@ -0,0 +1,194 @@
+from PyQt5.QtCore import Qt, QAbstractTableModel, QSortFilterProxyModel, QModelIndex
+from modmanager.mod_data import human_file_size
+
+COLUMNS = ["Status", "Mod Name", "Size", "Extracted", "Files"]
+STATUS, NAME, SIZE, EXTRACTED, FILES = range(len(COLUMNS))
+ModNameRole = Qt.UserRole
+# Typed sort key per cell, computed once per mod so sorting never converts anything
+SortRole = Qt.UserRole + 1
+
+
+def sort_keys(mod):
+    return (
+        0 if mod["enabled"] else 1,
+        mod["displayed_name"].lower(),
+        mod["size_raw"] or 0,
+        -1 if mod["extracted_size"] is None else mod["extracted_size"],
+        -1 if mod["file_count"] is None else mod["file_count"],
+    )
+
+
+# --- Mods tab rows, one per archive in Mods/ ---
+class ModTableModel(QAbstractTableModel):
+    def __init__(self, status_icons, parent=None):
+        super().__init__(parent)
+        self.status_icons = status_icons
+        self.mods = []
+        self.keys = []
+        # Lower-cased "displayed name / archive name" the quick filter matches against
+        self.filter_text = []
+        self.sort_column = NAME
+        self.sort_order = Qt.AscendingOrder
+        self._sorted = True
+        self._rows_by_name = {}
+
+    def reset_mods(self, mods):
+        self.beginResetModel()
+        self.mods = list(mods)
+        self.keys = [sort_keys(mod) for mod in self.mods]
+        self.filter_text = [self._filter_text(mod) for mod in self.mods]
+        self._sort_rows()
+        self.endResetModel()
+
+    def set_mods(self, mods):
+        # Patches rows whose mod was added, removed or changed; returns False when nothing did
+        new = {mod["orig_mod_name"]: mod for mod in mods}
+        changed = []
+        for row, mod in enumerate(self.mods):
+            current = new.get(mod["orig_mod_name"])
+            if current is not None and current is not mod and current != mod:
+                changed.append(row)
+        removed = [row for row, mod in enumerate(self.mods) if mod["orig_mod_name"] not in new]
+        added = [mod for name, mod in new.items() if name not in self._rows_by_name]
+        if not (changed or removed or added):
+            return False
+        for row in changed:
+            self._set_row(row, new[self.mods[row]["orig_mod_name"]])
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(COLUMNS) - 1))
+        for row in reversed(removed):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.mods[row], self.keys[row], self.filter_text[row]
+            self.endRemoveRows()
+        if added:
+            first = len(self.mods)
+            self.beginInsertRows(QModelIndex(), first, first + len(added) - 1)
+            self._sorted = False
+            for mod in added:
+                self.mods.append(mod)
+                self.keys.append(sort_keys(mod))
+                self.filter_text.append(self._filter_text(mod))
+            self.endInsertRows()
+        self._reindex()
+        self.sort(self.sort_column, self.sort_order)
+        return True
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        # Sorted here with the Python keys rather than by the proxy, which would call
+        # data() twice per comparison
+        if self._sorted and (column, order) == (self.sort_column, self.sort_order):
+            return
+        self.sort_column, self.sort_order = column, order
+        self.layoutAboutToBeChanged.emit()
+        old_mods = self.mods
+        persistent = self.persistentIndexList()
+        self._sort_rows()
+        self.changePersistentIndexList(persistent, [
+            self.index(self._rows_by_name[old_mods[index.row()]["orig_mod_name"]], index.column())
+            for index in persistent])
+        self.layoutChanged.emit()
+
+    def _sort_rows(self):
+        column = self.sort_column
+        order = sorted(range(len(self.mods)), key=lambda row: (self.keys[row][column], self.keys[row][NAME]),
+                       reverse=self.sort_order == Qt.DescendingOrder)
+        self.mods = [self.mods[row] for row in order]
+        self.keys = [self.keys[row] for row in order]
+        self.filter_text = [self.filter_text[row] for row in order]
+        self._reindex()
+        self._sorted = True
+
+    def set_enabled(self, statuses):
+        # statuses: mod name -> enabled; returns the statuses that were replaced
+        previous = {}
+        for mod_name, enabled in statuses.items():
+            row = self._rows_by_name.get(mod_name)
+            if row is None:
+                continue
+            mod = self.mods[row]
+            previous[mod_name] = mod["enabled"]
+            if mod["enabled"] != enabled:
+                self._set_row(row, dict(mod, enabled=enabled))
+                index = self.index(row, STATUS)
+                self.dataChanged.emit(index, index)
+        if previous and self.sort_column == STATUS:
+            self.sort(self.sort_column, self.sort_order)
+        return previous
+
+    def is_enabled(self, mod_name):
+        row = self._rows_by_name.get(mod_name)
+        return row is not None and self.mods[row]["enabled"]
+
+    def mod_names(self):
+        return [mod["orig_mod_name"] for mod in self.mods]
+
+    def _set_row(self, row, mod):
+        self._sorted = False
+        self.mods[row] = mod
+        self.keys[row] = sort_keys(mod)
+        self.filter_text[row] = self._filter_text(mod)
+
+    def _reindex(self):
+        self._rows_by_name = {mod["orig_mod_name"]: row for row, mod in enumerate(self.mods)}
+
+    @staticmethod
+    def _filter_text(mod):
+        return f"{mod['displayed_name']}\n{mod['orig_mod_name']}".lower()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.mods)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return COLUMNS[section]
+        return super().headerData(section, orientation, role)
+
+    def flags(self, index):
+        if index.column() == NAME:
+            return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+        return Qt.ItemIsEnabled
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= len(self.mods):
+            return None
+        row, column = index.row(), index.column()
+        mod = self.mods[row]
+        if role == Qt.DisplayRole:
+            if column == NAME:
+                return mod["displayed_name"]
+            if column == SIZE:
+                return human_file_size(mod["size_raw"] or 0)
+            if column == EXTRACTED and mod["extracted_size"] is not None:
+                return human_file_size(mod["extracted_size"])
+            if column == FILES and mod["file_count"] is not None:
+                return str(mod["file_count"])
+            return None
+        if role == Qt.DecorationRole and column == STATUS:
+            return self.status_icons[0] if mod["enabled"] else self.status_icons[1]
+        if role == Qt.TextAlignmentRole and column in (SIZE, EXTRACTED, FILES):
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        if role == SortRole:
+            return self.keys[row][column]
+        if role == ModNameRole:
+            return mod["orig_mod_name"]
+        return None
+
+
+# --- Quick filter over the model's precomputed text; sorting is passed through to ModTableModel.sort ---
+class ModFilterProxy(QSortFilterProxyModel):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.text = ""
+
+    def set_filter_text(self, text):
+        self.text = text.strip().lower()
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, source_row, source_parent):
+        return not self.text or self.text in self.sourceModel().filter_text[source_row]
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column >= 0:
+            self.sourceModel().sort(column, order)
@@ -0,0 +1,85 @@
+import threading, time
+
+
+class OperationCancelled(Exception):
+    pass
+
+
+# --- Progress, cancellation and error collection for a running mod_data operation ---
+# mod_data functions accept one of these in place of parent_widget; warnings are then
+# collected instead of shown, so the operation can run off the GUI thread.
+class OperationContext:
+    def __init__(self, progress_callback=None, interval=0.1):
+        self.errors = []
+        self.files_done = 0
+        self.files_total = 0
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.started = time.perf_counter()
+        self._progress_callback = progress_callback
+        self._interval = interval
+        self._last_emit = 0.0
+        self._cancel_event = threading.Event()
+        self._lock = threading.Lock()
+        self._parent = None
+
+    def child(self):
+        # Context for one branch of a fanned-out operation: cancelled together with this one and
+        # counted in its progress, but with its own warnings
+        child = OperationContext(interval=self._interval)
+        child._cancel_event = self._cancel_event
+        child._parent = self
+        return child
+
+    def warn(self, message):
+        with self._lock:
+            self.errors.append(message)
+
+    def cancel(self):
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self):
+        return self._cancel_event.is_set()
+
+    def check_cancelled(self):
+        if self._cancel_event.is_set():
+            raise OperationCancelled()
+
+    def add_total(self, files=0, nbytes=0):
+        with self._lock:
+            self.files_total += files
+            self.bytes_total += nbytes
+        if self._parent:
+            self._parent.add_total(files, nbytes)
+        self._emit(force=True)
+
+    def report(self, files=0, nbytes=0):
+        with self._lock:
+            self.files_done += files
+            self.bytes_done += nbytes
+        if self._parent:
+            self._parent.report(files, nbytes)
+        self._emit()
+
+    def advance(self, files=0, nbytes=0):
+        # Called from extraction workers; raises OperationCancelled once cancel() was requested
+        self.report(files, nbytes)
+        self.check_cancelled()
+
+    def throughput(self):
+        elapsed = time.perf_counter() - self.started
+        return self.bytes_done / elapsed if elapsed > 0 else 0.0
+
+    def _emit(self, force=False):
+        if not self._progress_callback:
+            return
+        now = time.perf_counter()
+        if not force and now - self._last_emit < self._interval:
+            return
+        self._last_emit = now
+        self._progress_callback(self.files_done, self.files_total, self.bytes_done, self.bytes_total,
+                                self.throughput())
+
+    def finish(self):
+        self._emit(force=True)
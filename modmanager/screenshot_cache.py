@@ -0,0 +1,76 @@
+import os, hashlib, threading
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+TIMEOUT = 10
+
+
+# --- Map screenshots kept on disk, evicted least recently used once over the size limit ---
+# A file's mtime doubles as its last-use time; get() touches it on every hit.
+class ScreenshotCache:
+    def __init__(self, cache_dir, limit_bytes, max_connections=4):
+        self.cache_dir = cache_dir
+        self.limit_bytes = limit_bytes
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_connections)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._used_bytes = None
+        self._lock = threading.Lock()
+
+    def path_for(self, url):
+        ext = os.path.splitext(urlparse(url).path)[1].lower()
+        if ext not in (".jpg", ".jpeg", ".png", ".gif", ".bmp", ".webp"):
+            ext = ".img"
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode("utf-8")).hexdigest() + ext)
+
+    def get(self, url):
+        path = self.path_for(url)
+        try:
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def fetch(self, url):
+        # Cached path for url, downloading it first when needed; raises on network errors
+        path = self.get(url)
+        if path:
+            return path
+        path = self.path_for(url)
+        r = self.session.get(url, timeout=TIMEOUT)
+        r.raise_for_status()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(r.content)
+        os.replace(tmp_path, path)
+        with self._lock:
+            if self._used_bytes is not None:
+                self._used_bytes += len(r.content)
+        self.evict()
+        return path
+
+    def evict(self):
+        with self._lock:
+            if self._used_bytes is not None and self._used_bytes <= self.limit_bytes:
+                return
+            files = []
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        st = entry.stat()
+                        files.append((st.st_mtime, st.st_size, entry.path))
+            used = sum(size for _, size, _ in files)
+            files.sort()
+            # Never evicts the newest file, which is the one just fetched
+            for _, size, path in files[:-1]:
+                if used <= self.limit_bytes:
+                    break
+                try:
+                    os.remove(path)
+                    used -= size
+                except OSError:
+                    pass
+            self._used_bytes = used
@@ -0,0 +1,111 @@
+import os, json, re
+from bisect import bisect_left
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+# Per query term: exact title word > title prefix > exact tag > tag prefix > inside a word
+TITLE_EXACT, TITLE_PREFIX, TAG_EXACT, TAG_PREFIX, INFIX = 16, 8, 4, 2, 1
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+def parse_query(query):
+    # "a b OR c" / "a b | c" -> [["a", "b"], ["c"]]: words AND together, groups OR together
+    groups = []
+    for part in re.split(r"\s+or\s+|\|", query.strip().lower()):
+        terms = tokenize(part)
+        if terms:
+            groups.append(terms)
+    return groups
+
+
+# --- Token/prefix inverted index over the CDN list (Title and Tags) ---
+# Built once per load_cdn_list; prefix lookups bisect the sorted vocabulary, so a query
+# costs a handful of set operations instead of a scan over every entry. A term found only
+# inside a word ("ion" in "station") still matches, ranked last; that lookup scans the
+# vocabulary (not the entries) and is memoized like the prefix one.
+class SearchIndex:
+    def __init__(self, entries):
+        self.entries = entries
+        self.title_postings = {}
+        self.tag_postings = {}
+        for i, entry in enumerate(entries):
+            for token in tokenize(entry.get("Title", "")):
+                self.title_postings.setdefault(token, set()).add(i)
+            for token in tokenize(entry.get("Tags", "")):
+                self.tag_postings.setdefault(token, set()).add(i)
+        self.vocabulary = sorted(set(self.title_postings) | set(self.tag_postings))
+        self._prefix_memo = {}
+        self._infix_memo = {}
+
+    def _prefix_matches(self, term):
+        # (ids with a title word starting with term, ids with a tag word starting with term)
+        memo = self._prefix_memo.get(term)
+        if memo is not None:
+            return memo
+        title_ids, tag_ids = set(), set()
+        i = bisect_left(self.vocabulary, term)
+        while i < len(self.vocabulary) and self.vocabulary[i].startswith(term):
+            token = self.vocabulary[i]
+            title_ids |= self.title_postings.get(token, set())
+            tag_ids |= self.tag_postings.get(token, set())
+            i += 1
+        if len(self._prefix_memo) > 256:
+            self._prefix_memo = {}
+        self._prefix_memo[term] = (title_ids, tag_ids)
+        return title_ids, tag_ids
+
+    def _infix_matches(self, term):
+        # Ids with a title or tag word containing term past its first character
+        ids = self._infix_memo.get(term)
+        if ids is not None:
+            return ids
+        ids = set()
+        for token in self.vocabulary:
+            if term in token[1:]:
+                ids |= self.title_postings.get(token, set())
+                ids |= self.tag_postings.get(token, set())
+        if len(self._infix_memo) > 256:
+            self._infix_memo = {}
+        self._infix_memo[term] = ids
+        return ids
+
+    def _score_group(self, terms):
+        # Every term must match; an entry's score is the sum of its per-term scores
+        scores = None
+        for term in terms:
+            title_ids, tag_ids = self._prefix_matches(term)
+            term_scores = dict.fromkeys(self._infix_matches(term), INFIX)
+            term_scores.update(dict.fromkeys(tag_ids, TAG_PREFIX))
+            term_scores.update(dict.fromkeys(self.tag_postings.get(term, ()), TAG_EXACT))
+            term_scores.update(dict.fromkeys(title_ids, TITLE_PREFIX))
+            term_scores.update(dict.fromkeys(self.title_postings.get(term, ()), TITLE_EXACT))
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {i: score + term_scores[i] for i, score in scores.items() if i in term_scores}
+            if not scores:
+                break
+        return scores or {}
+
+    def search(self, query):
+        groups = parse_query(query)
+        if not groups:
+            return self.entries[:]
+        scores = {}
+        for terms in groups:
+            for i, score in self._score_group(terms).items():
+                if score > scores.get(i, 0):
+                    scores[i] = score
+        # Best score first, catalogue order within a score (the sort is stable)
+        return [self.entries[i] for i in sorted(sorted(scores), key=scores.__getitem__, reverse=True)]
+
+
+def load_catalog(cdn_list_path, context=None):
+    # (entries newest first, SearchIndex); runs off the GUI thread
+    entries = []
+    if os.path.exists(cdn_list_path):
+        with open(cdn_list_path, "r", encoding="utf-8") as f:
+            entries = list(json.load(f).values())[::-1]
+    return entries, SearchIndex(entries)
@@ -0,0 +1,241 @@
+import os, json, threading
+from contextlib import contextmanager
+from modmanager.tracing import span
+
+
+# --- One JSON file held in memory ---
+# Re-read only when its size/mtime changed on disk (e.g. config.json edited by hand),
+# written with write-then-rename so a crash never leaves a half-written file.
+class JsonDocument:
+    def __init__(self, path, default, **dump_options):
+        self.path = path
+        self.default = default
+        self.dump_options = dump_options
+        self.value = None
+        self.dirty = False
+        self.writes = 0
+        self._stamp = None
+
+    def _disk_stamp(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_size, st.st_mtime_ns)
+        except OSError:
+            return None
+
+    def load(self):
+        # Returns True when the value was (re)read
+        if self.value is not None and (self.dirty or self._disk_stamp() == self._stamp):
+            return False
+        self._stamp = self._disk_stamp()
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.value = json.load(f)
+        except Exception as e:
+            if self._stamp is not None:
+                print(f"Error loading {os.path.basename(self.path)}: {e}")
+            self.value = self.default()
+        if not isinstance(self.value, type(self.default())):
+            self.value = self.default()
+        return True
+
+    def save(self):
+        with span("json.save", file=os.path.basename(self.path)):
+            self._save()
+
+    def _save(self):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.value, f, **self.dump_options)
+        os.replace(tmp_path, self.path)
+        self._stamp = self._disk_stamp()
+        self.dirty = False
+        self.writes += 1
+
+
+# --- Enabled.json, config.json, Download_Cache.json and Profiles.json behind one lock ---
+# Mutations made inside batch() are written once when the outermost batch ends. Game targets
+# other than the default keep their enabled set in Enabled.<target>.json next to Enabled.json.
+class StateService:
+    def __init__(self, enabled_file, config_file, download_cache_file, profiles_file=None):
+        self.enabled = JsonDocument(enabled_file, list)
+        self.config = JsonDocument(config_file, dict, indent=4)
+        self.downloads = JsonDocument(download_cache_file, dict, indent=4, ensure_ascii=False)
+        self.profiles = JsonDocument(profiles_file or os.path.join(os.path.dirname(enabled_file), "Profiles.json"),
+                                     dict, indent=4, ensure_ascii=False)
+        self._target_enabled = {}
+        self._enabled_sets = {}
+        self._by_title = {}
+        self._by_zip = {}
+        self._batch_depth = 0
+        self._lock = threading.RLock()
+
+    @contextmanager
+    def batch(self):
+        # The lock is not held in between, so batches on different game targets run in parallel
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+
+    def flush(self):
+        with self._lock:
+            documents = (self.enabled, self.config, self.downloads, self.profiles) + tuple(self._target_enabled.values())
+            for document in documents:
+                if document.dirty:
+                    try:
+                        document.save()
+                    except Exception as e:
+                        print(f"Error saving {os.path.basename(document.path)}: {e}")
+
+    def _changed(self, document):
+        document.dirty = True
+        if self._batch_depth == 0:
+            self.flush()
+
+    # Enabled mods, in enable order; target None is the default game target
+    def _enabled_doc(self, target=None):
+        if not target:
+            return self.enabled
+        document = self._target_enabled.get(target)
+        if document is None:
+            stem, ext = os.path.splitext(self.enabled.path)
+            document = self._target_enabled[target] = JsonDocument(f"{stem}.{target}{ext}", list)
+        return document
+
+    def _load_enabled(self, target=None):
+        document = self._enabled_doc(target)
+        if document.load():
+            self._enabled_sets[document.path] = set(document.value)
+        return document
+
+    def enabled_mods(self, target=None):
+        with self._lock:
+            return list(self._load_enabled(target).value)
+
+    def is_enabled(self, mod_name, target=None):
+        with self._lock:
+            return mod_name in self._enabled_sets[self._load_enabled(target).path]
+
+    def set_enabled(self, mod_names, target=None):
+        with self._lock:
+            document = self._load_enabled(target)
+            if list(mod_names) == document.value:
+                return
+            document.value = list(mod_names)
+            self._enabled_sets[document.path] = set(document.value)
+            self._changed(document)
+
+    # config.json
+    def get_config(self):
+        with self._lock:
+            self.config.load()
+            return dict(self.config.value)
+
+    def config_value(self, key, default=None):
+        with self._lock:
+            self.config.load()
+            return self.config.value.get(key, default)
+
+    def set_config(self, config):
+        with self._lock:
+            self.config.load()
+            self.config.value = dict(config)
+            self._changed(self.config)
+
+    def update_config(self, **values):
+        with self._lock:
+            self.config.load()
+            self.config.value.update(values)
+            self._changed(self.config)
+
+    # Profiles.json: profile name -> mod names, lowest priority first
+    def get_profiles(self):
+        with self._lock:
+            self.profiles.load()
+            return {name: list(mods) for name, mods in self.profiles.value.items() if isinstance(mods, list)}
+
+    def set_profile(self, name, mod_names):
+        with self._lock:
+            self.profiles.load()
+            self.profiles.value[name] = list(mod_names)
+            self._changed(self.profiles)
+
+    def delete_profile(self, name):
+        with self._lock:
+            self.profiles.load()
+            if self.profiles.value.pop(name, None) is not None:
+                self._changed(self.profiles)
+
+    # Download_Cache.json: page URL -> {"zipName", "Title", "URL"}
+    def _load_downloads(self):
+        if self.downloads.load():
+            self._by_title = {}
+            self._by_zip = {}
+            for page_url, entry in self.downloads.value.items():
+                self._index_download(page_url, entry)
+        return self.downloads.value
+
+    def _index_download(self, page_url, entry):
+        if not isinstance(entry, dict):
+            return
+        self._by_title.setdefault(entry.get("Title", "").strip(), set()).add(page_url)
+        zip_stem = os.path.splitext(entry.get("zipName", ""))[0].strip().lower()
+        self._by_zip.setdefault(zip_stem, set()).add(page_url)
+
+    def download_cache(self):
+        with self._lock:
+            return dict(self._load_downloads())
+
+    def downloaded_page_urls(self):
+        with self._lock:
+            return set(self._load_downloads())
+
+    def set_download_cache(self, cache):
+        with self._lock:
+            self._load_downloads()
+            self.downloads.value = dict(cache)
+            self._by_title = {}
+            self._by_zip = {}
+            for page_url, entry in self.downloads.value.items():
+                self._index_download(page_url, entry)
+            self._changed(self.downloads)
+
+    def add_download(self, page_url, entry):
+        with self._lock:
+            self._remove_downloads({page_url})
+            self.downloads.value[page_url] = entry
+            self._index_download(page_url, entry)
+            self._changed(self.downloads)
+
+    def _remove_downloads(self, page_urls):
+        cache = self._load_downloads()
+        removed = 0
+        for page_url in page_urls:
+            entry = cache.pop(page_url, None)
+            if entry is None:
+                continue
+            removed += 1
+            if isinstance(entry, dict):
+                self._by_title.get(entry.get("Title", "").strip(), set()).discard(page_url)
+                zip_stem = os.path.splitext(entry.get("zipName", ""))[0].strip().lower()
+                self._by_zip.get(zip_stem, set()).discard(page_url)
+        return removed
+
+    def remove_downloads_by_title(self, title):
+        with self._lock:
+            self._load_downloads()
+            if self._remove_downloads(list(self._by_title.get(title.strip(), ()))):
+                self._changed(self.downloads)
+
+    def remove_downloads_by_zipname(self, zip_name):
+        with self._lock:
+            self._load_downloads()
+            if self._remove_downloads(list(self._by_zip.get(zip_name.strip().lower(), ()))):
+                self._changed(self.downloads)
@@ -0,0 +1,220 @@
+import os, json, hashlib, shutil, tempfile, threading
+from modmanager.extractor import extract_archive
+from modmanager.tracing import traced, span
+
+# Linux FICLONE ioctl, used for reflinks when hardlinks aren't possible (btrfs/xfs across links limits)
+FICLONE = 0x40049409
+
+# One lock per archive being imported, so game targets deploying the same archive at once
+# extract it a single time and the others link from the result
+_import_locks = {}
+_import_locks_guard = threading.Lock()
+
+
+# --- Content-addressed store of extracted archive files ---
+# store_dir/objects/ab/cdef...   one file per unique content (sha256)
+# store_dir/archives/<key>.json  what an archive unpacks to, keyed by its path, size and mtime
+
+def object_path(store_dir, digest):
+    return os.path.join(store_dir, "objects", digest[:2], digest[2:])
+
+
+def _index_path(store_dir, archive_file):
+    key = hashlib.sha1(os.path.abspath(archive_file).encode("utf-8")).hexdigest()
+    return os.path.join(store_dir, "archives", f"{key}.json")
+
+
+def _hash_file(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_index(store_dir, archive_file):
+    # relpath -> [digest, size], or None when the archive was never imported or has changed since
+    index_path = _index_path(store_dir, archive_file)
+    if not os.path.exists(index_path):
+        return None
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        st = os.stat(archive_file)
+        if index.get("size") != st.st_size or index.get("mtime") != st.st_mtime_ns:
+            return None
+        return index.get("files", {})
+    except Exception:
+        return None
+
+
+def cached_listing(store_dir, archive_file):
+    files = load_index(store_dir, archive_file)
+    if files is None:
+        return None
+    return {relpath: size for relpath, (digest, size) in files.items()}
+
+
+@traced("store.import")
+def import_archive(store_dir, archive_file, progress=None, unpack=None):
+    # unpack(archive_file, folder) -> relpaths replaces extract_archive, e.g. to decompress in a
+    # worker process; the import itself always runs here, under this process's lock
+    index_path = _index_path(store_dir, archive_file)
+    with _import_locks_guard:
+        lock = _import_locks.setdefault(index_path, threading.Lock())
+    with lock:
+        return _import_archive(store_dir, archive_file, progress, unpack)
+
+
+def _import_archive(store_dir, archive_file, progress=None, unpack=None):
+    files = load_index(store_dir, archive_file)
+    if files is not None:
+        return files
+    st = os.stat(archive_file)
+    os.makedirs(store_dir, exist_ok=True)
+    staging = tempfile.mkdtemp(prefix="import-", dir=store_dir)
+    files = {}
+    try:
+        # Decompression reports bytes only; the files are counted when they get linked
+        if unpack:
+            # No progress from another process; the bytes are counted as the files are hashed
+            relpaths = unpack(archive_file, staging)
+        else:
+            byte_progress = (lambda files, nbytes: progress(0, nbytes)) if progress else None
+            relpaths = extract_archive(archive_file, staging, progress=byte_progress)
+        for relpath in relpaths:
+            src = os.path.join(staging, *relpath.split("/"))
+            digest = _hash_file(src)
+            size = os.path.getsize(src)
+            if unpack and progress:
+                progress(0, size)
+            obj = object_path(store_dir, digest)
+            if not os.path.exists(obj):
+                os.makedirs(os.path.dirname(obj), exist_ok=True)
+                os.replace(src, obj)
+            files[relpath] = [digest, size]
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    index_path = _index_path(store_dir, archive_file)
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    # Unique name: another instance of the app may be writing the same index
+    fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(index_path))
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"archive": os.path.abspath(archive_file), "size": st.st_size,
+                       "mtime": st.st_mtime_ns, "files": files}, f)
+        os.replace(tmp_path, index_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return files
+
+
+def _reflink(src, dst):
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dst):
+            os.unlink(dst)
+        return False
+
+
+def link_file(src, dst):
+    # hardlink -> reflink -> plain copy
+    if os.path.lexists(dst):
+        os.unlink(dst)
+    try:
+        os.link(src, dst)
+        return
+    except OSError:
+        pass
+    if _reflink(src, dst):
+        return
+    shutil.copyfile(src, dst)
+
+
+def deploy_archive(store_dir, archive_file, addon_folder, members=None, progress=None, unpack=None):
+    # Same contract as extractor.extract_archive, but files come from the store
+    files = load_index(store_dir, archive_file)
+    imported = files is not None
+    if not imported:
+        files = import_archive(store_dir, archive_file, progress, unpack)
+    wanted = set(members) if members is not None else None
+    written = []
+    with span("store.link") as link_span:
+        for relpath, (digest, size) in files.items():
+            if wanted is not None and relpath not in wanted:
+                continue
+            dst = os.path.join(addon_folder, *relpath.split("/"))
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            link_file(object_path(store_dir, digest), dst)
+            written.append(relpath)
+            if progress:
+                progress(1, size if imported else 0)
+        link_span.set(files=len(written))
+    return written
+
+
+def discard_damaged(store_dir, archive_file, addon_folder, relpaths):
+    # Deployed files that are hardlinks share their content with the store object; when one was
+    # modified in place the object is wrong too, so it is dropped along with the archive's index
+    # and the next deploy re-extracts the archive. Returns True when anything was dropped.
+    files = load_index(store_dir, archive_file)
+    if not files:
+        return False
+    damaged = False
+    for relpath in relpaths:
+        if relpath not in files:
+            continue
+        obj = object_path(store_dir, files[relpath][0])
+        deployed = os.path.join(addon_folder, *relpath.split("/"))
+        try:
+            if os.path.samefile(obj, deployed):
+                os.unlink(obj)
+                damaged = True
+        except OSError:
+            pass
+    if damaged:
+        forget_archive(store_dir, archive_file)
+    return damaged
+
+
+def forget_archive(store_dir, archive_file):
+    index_path = _index_path(store_dir, archive_file)
+    if os.path.exists(index_path):
+        os.remove(index_path)
+
+
+def collect_garbage(store_dir):
+    # Drops objects no imported archive refers to; returns the number of bytes freed
+    archives_dir = os.path.join(store_dir, "archives")
+    objects_dir = os.path.join(store_dir, "objects")
+    if not os.path.isdir(objects_dir):
+        return 0
+    referenced = set()
+    if os.path.isdir(archives_dir):
+        for name in os.listdir(archives_dir):
+            if not name.endswith(".json"):
+                # An index still being written
+                continue
+            try:
+                with open(os.path.join(archives_dir, name), "r", encoding="utf-8") as f:
+                    referenced.update(digest for digest, size in json.load(f).get("files", {}).values())
+            except Exception as e:
+                print(f"Error reading store index {name}: {e}")
+                return 0
+    freed = 0
+    for prefix in os.listdir(objects_dir):
+        prefix_dir = os.path.join(objects_dir, prefix)
+        for rest in os.listdir(prefix_dir):
+            if prefix + rest not in referenced:
+                obj = os.path.join(prefix_dir, rest)
+                freed += os.path.getsize(obj)
+                os.remove(obj)
+    return freed
@@ -0,0 +1,213 @@
+import os, itertools
+from collections import OrderedDict
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QSize, Qt, pyqtSignal
+from PyQt5.QtGui import QImage, QImageReader, QPixmap
+from modmanager.mod_data import get_thumbnail_cache_mb, get_screenshot_cache_mb, SCREENSHOT_CACHE_DIR
+
+
+def decode_thumbnail(path, width, height=0):
+    # Decodes straight to the target size (JPEG is scaled during decoding); height 0 means fit to width
+    reader = QImageReader(path)
+    reader.setAutoTransform(True)
+    size = reader.size()
+    if size.isValid() and size.width() > 0 and size.height() > 0:
+        target = QSize(width, height or size.height() * width // size.width())
+        if height:
+            target = size.scaled(target, Qt.KeepAspectRatio)
+        if target.width() < size.width():
+            reader.setScaledSize(target)
+    image = reader.read()
+    return image if not image.isNull() else QImage()
+
+
+# --- LRU of decoded pixmaps, bounded by their size in bytes ---
+class PixmapCache:
+    def __init__(self, budget_bytes):
+        self.budget_bytes = budget_bytes
+        self.used_bytes = 0
+        self._items = OrderedDict()
+
+    @staticmethod
+    def cost(pixmap):
+        return max(1, pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8)
+
+    def get(self, key):
+        pixmap = self._items.get(key)
+        if pixmap is not None:
+            self._items.move_to_end(key)
+        return pixmap
+
+    def put(self, key, pixmap):
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.used_bytes -= self.cost(old)
+        self._items[key] = pixmap
+        self.used_bytes += self.cost(pixmap)
+        while self.used_bytes > self.budget_bytes and len(self._items) > 1:
+            _, evicted = self._items.popitem(last=False)
+            self.used_bytes -= self.cost(evicted)
+
+    def clear(self):
+        self._items.clear()
+        self.used_bytes = 0
+
+
+class _DecodeSignals(QObject):
+    decoded = pyqtSignal(str, QImage)
+
+
+class _DecodeTask(QRunnable):
+    def __init__(self, key, path, width, height, signals):
+        super().__init__()
+        self.key = key
+        self.path = path
+        self.width = width
+        self.height = height
+        self.signals = signals
+        self.started = False
+        # Requesters still waiting for it (None for requests made without an owner)
+        self.owners = set()
+
+    def run(self):
+        self.started = True
+        try:
+            image = decode_thumbnail(self.path, self.width, self.height)
+        except Exception as e:
+            print(f"Failed to decode thumbnail {self.path}: {e}")
+            image = QImage()
+        self.signals.decoded.emit(self.key, image)
+
+
+# --- Thumbnails decoded on a worker pool, handed to the GUI thread as cached pixmaps ---
+# request() returns the pixmap when cached and otherwise queues a decode; ready(key) fires
+# once it is in the cache. Newer requests are decoded first so visible cells win while scrolling.
+# The loader is shared, so a requester that drops its queue (the grid on a new search) passes an
+# owner and cancel_pending(owner) leaves everyone else's decodes queued.
+class ThumbnailLoader(QObject):
+    ready = pyqtSignal(str)
+
+    def __init__(self, budget_mb, parent=None):
+        super().__init__(parent)
+        self.cache = PixmapCache(budget_mb * 1024 * 1024)
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max(2, min(4, QThreadPool.globalInstance().maxThreadCount())))
+        self._signals = _DecodeSignals()
+        self._signals.decoded.connect(self._on_decoded)
+        self._pending = {}
+        self._priority = itertools.count()
+
+    @staticmethod
+    def key(path, width, height=0):
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        return f"{path}|{width}x{height}|{mtime}"
+
+    def request(self, path, width, height=0, owner=None):
+        # (key, pixmap or None); key is None when there is no image file at path
+        key = self.key(path, width, height) if path else None
+        if key is None:
+            return None, None
+        pixmap = self.cache.get(key)
+        if pixmap is None:
+            task = self._pending.get(key)
+            if task is None:
+                task = _DecodeTask(key, path, width, height, self._signals)
+                self._pending[key] = task
+                self.pool.start(task, min(next(self._priority), 2 ** 31 - 1))
+            task.owners.add(owner)
+        return key, pixmap
+
+    def cancel_pending(self, owner=None):
+        # Drops owner's queued decodes that no other requester is waiting for, e.g. when the grid's
+        # visible set is replaced by a new search; without an owner drops every queued decode
+        if owner is None:
+            self.pool.clear()
+            self._pending = {key: task for key, task in self._pending.items() if task.started}
+            return
+        for key, task in list(self._pending.items()):
+            task.owners.discard(owner)
+            if not task.owners and self.pool.tryTake(task):
+                del self._pending[key]
+
+    def _on_decoded(self, key, image):
+        self._pending.pop(key, None)
+        self.cache.put(key, QPixmap.fromImage(image) if not image.isNull() else QPixmap())
+        self.ready.emit(key)
+
+    def wait(self):
+        self.pool.waitForDone()
+
+
+class _FetchSignals(QObject):
+    # url, cached file path ("" on failure), error message
+    fetched = pyqtSignal(str, str, str)
+
+
+class _FetchTask(QRunnable):
+    def __init__(self, url, cache, signals):
+        super().__init__()
+        self.url = url
+        self.cache = cache
+        self.signals = signals
+
+    def run(self):
+        try:
+            self.signals.fetched.emit(self.url, self.cache.fetch(self.url), "")
+        except Exception as e:
+            self.signals.fetched.emit(self.url, "", str(e))
+
+
+# --- Screenshots downloaded concurrently into the on-disk ScreenshotCache ---
+class ScreenshotLoader(QObject):
+    fetched = pyqtSignal(str, str, str)
+
+    def __init__(self, cache, parent=None):
+        super().__init__(parent)
+        self.cache = cache
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(4)
+        self._signals = _FetchSignals()
+        self._signals.fetched.connect(self._on_fetched)
+        self._pending = set()
+
+    def request(self, url):
+        # Cached path when the screenshot is on disk already, otherwise None and fetched() follows
+        path = self.cache.get(url)
+        if path is None and url not in self._pending:
+            self._pending.add(url)
+            self.pool.start(_FetchTask(url, self.cache, self._signals))
+        return path
+
+    def cancel_pending(self):
+        self.pool.clear()
+        self._pending = set()
+
+    def _on_fetched(self, url, path, error):
+        self._pending.discard(url)
+        self.fetched.emit(url, path, error)
+
+    def wait(self):
+        self.pool.waitForDone()
+
+
+_loader = None
+_screenshot_loader = None
+
+
+def get_thumbnail_loader():
+    global _loader
+    if _loader is None:
+        _loader = ThumbnailLoader(get_thumbnail_cache_mb())
+    return _loader
+
+
+def get_screenshot_loader():
+    global _screenshot_loader
+    if _screenshot_loader is None:
+        # Imported here so requests stays off the startup path
+        from modmanager.screenshot_cache import ScreenshotCache
+        _screenshot_loader = ScreenshotLoader(
+            ScreenshotCache(SCREENSHOT_CACHE_DIR, get_screenshot_cache_mb() * 1024 * 1024))
+    return _screenshot_loader
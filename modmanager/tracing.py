@@ -0,0 +1,184 @@
+import os, json, time, logging, threading, itertools, functools
+from collections import deque
+from logging.handlers import RotatingFileHandler
+
+# --- Timed spans around the hot paths ---
+# Each finished span is one JSON line in the trace file (rotated at TRACE_MAX_BYTES). A span
+# started with no span open on its thread is an operation: the last RECENT_OPERATIONS of those
+# are kept in memory with the time of every span below them, summed per call path.
+# Disabled, span() returns a shared no-op and traced() adds one flag check per call.
+TRACE_MAX_BYTES = 5 * 1024 * 1024
+TRACE_BACKUPS = 3
+RECENT_OPERATIONS = 100
+
+_enabled = False
+_trace_file = None
+_handler = None
+_local = threading.local()
+_ids = itertools.count(1)
+_recent = deque(maxlen=RECENT_OPERATIONS)
+_lock = threading.Lock()
+
+
+class _NoSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+NO_SPAN = _NoSpan()
+
+
+class Span:
+    def __init__(self, name, parent=None, attrs=None):
+        self.name = name
+        self.parent = parent
+        self.attrs = attrs or {}
+        self.id = next(_ids)
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        stack = _stack()
+        if self.parent is None and stack:
+            self.parent = stack[-1]
+        if self.parent is None:
+            self.root, self.path, self.breakdown = self, (), {}
+        else:
+            self.root, self.path = self.parent.root, self.parent.path + (self.name,)
+        stack.append(self)
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        ms = (time.perf_counter() - self.start) * 1000
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        record = {"id": self.id, "parent": self.parent.id if self.parent else None, "root": self.root.id,
+                  "name": self.name, "start": round(self.wall, 6), "ms": round(ms, 3),
+                  "thread": threading.current_thread().name}
+        if self.attrs:
+            record["attrs"] = self.attrs
+        if exc_type is not None:
+            record["error"] = exc_type.__name__
+        with _lock:
+            if self.root is self:
+                _recent.append({"name": self.name, "start": self.wall, "ms": ms, "attrs": self.attrs,
+                                "error": record.get("error", ""), "breakdown": self.breakdown})
+            else:
+                total = self.root.breakdown.setdefault(self.path, [0.0, 0])
+                total[0] += ms
+                total[1] += 1
+        _write(record)
+        return False
+
+
+def _stack():
+    stack = getattr(_local, "stack", None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+
+def _write(record):
+    global _handler
+    if not _trace_file:
+        return
+    line = json.dumps(record, ensure_ascii=False, default=str)
+    try:
+        with _lock:
+            if _handler is None:
+                os.makedirs(os.path.dirname(_trace_file), exist_ok=True)
+                _handler = RotatingFileHandler(_trace_file, maxBytes=TRACE_MAX_BYTES, backupCount=TRACE_BACKUPS,
+                                               encoding="utf-8", delay=True)
+                _handler.setFormatter(logging.Formatter("%(message)s"))
+        _handler.handle(logging.makeLogRecord({"msg": line, "levelno": logging.INFO, "levelname": "INFO"}))
+    except Exception as e:
+        print(f"Error writing trace: {e}")
+
+
+def configure(trace_file=None, enabled=None):
+    global _trace_file, _handler
+    with _lock:
+        if trace_file is not None and trace_file != _trace_file:
+            if _handler is not None:
+                _handler.close()
+                _handler = None
+            _trace_file = trace_file
+    if enabled is not None:
+        set_enabled(enabled)
+
+
+def set_enabled(enabled):
+    global _enabled
+    _enabled = bool(enabled)
+
+
+def is_enabled():
+    return _enabled
+
+
+def trace_file():
+    return _trace_file
+
+
+def span(name, parent=None, **attrs):
+    if not _enabled:
+        return NO_SPAN
+    return Span(name, parent, attrs)
+
+
+def current_span():
+    # For handing the open span to work that runs on another thread (span(..., parent=...))
+    stack = getattr(_local, "stack", None)
+    return stack[-1] if _enabled and stack else None
+
+
+def annotate(**attrs):
+    # Adds attributes to the innermost open span on this thread
+    stack = getattr(_local, "stack", None)
+    if _enabled and stack:
+        stack[-1].set(**attrs)
+
+
+def traced(name=None):
+    def decorate(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with Span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def record(name, seconds, parent=None, **attrs):
+    # A span for work timed elsewhere (e.g. in a worker process), ending now
+    if not _enabled:
+        return
+    finished = Span(name, parent, attrs).__enter__()
+    finished.start -= seconds
+    finished.wall -= seconds
+    finished.__exit__(None, None, None)
+
+
+def recent_operations():
+    # Newest first; breakdown maps a call path (tuple of span names) to [total ms, count]
+    with _lock:
+        return [dict(op, breakdown=dict(op["breakdown"])) for op in reversed(_recent)]
+
+
+def clear_recent():
+    with _lock:
+        _recent.clear()
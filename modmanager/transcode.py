@@ -0,0 +1,153 @@
+import os, glob, hashlib, shutil, tempfile, threading, zipfile
+from modmanager.extractor import extract_archive
+from modmanager.tracing import traced
+
+# One lock per cached copy, so two jobs deploying the same .7z pack it a single time
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+# --- .7z archives re-packed as per-member zips, kept on disk within a size limit ---
+# Solid LZMA can only be read front to back, so pulling a few members out of a .7z decodes
+# everything before them. The first extraction decodes it once and stores each member as its own
+# stored zip entry; later (partial) extractions seek straight to the members. A full extraction
+# reads the .7z front to back anyway, so it deploys from the .7z and packs the copy from the files
+# it just wrote instead of decoding twice.
+# A copy's mtime doubles as its last-use time, and the least recently used go once over the limit.
+# Holds no open state, so it can be handed to extraction worker processes.
+class TranscodeCache:
+    def __init__(self, cache_dir, limit_bytes):
+        self.cache_dir = cache_dir
+        self.limit_bytes = limit_bytes
+
+    def _key(self, archive_file):
+        return hashlib.sha1(os.path.abspath(archive_file).encode("utf-8")).hexdigest()[:20]
+
+    def path_for(self, archive_file):
+        # Named after the archive's path and (size, mtime), so a replaced archive gets a new copy
+        st = os.stat(archive_file)
+        stamp = hashlib.sha1(f"{st.st_size}:{st.st_mtime_ns}".encode()).hexdigest()[:8]
+        return os.path.join(self.cache_dir, f"{self._key(archive_file)}-{stamp}.zip")
+
+    def cached(self, archive_file):
+        try:
+            return os.path.isfile(self.path_for(archive_file))
+        except OSError:
+            return False
+
+    def get(self, archive_file):
+        try:
+            path = self.path_for(archive_file)
+            os.utime(path)
+        except OSError:
+            return None
+        return path
+
+    def extract(self, archive_file, addon_folder, members=None, progress=None):
+        # Same contract as extractor.extract_archive
+        if not archive_file.endswith(".7z"):
+            return extract_archive(archive_file, addon_folder, members, progress)
+        copy = self.get(archive_file)
+        if copy is not None:
+            return extract_archive(copy, addon_folder, members, progress)
+        if members is None:
+            written = extract_archive(archive_file, addon_folder, None, progress)
+            self._try(self.pack, archive_file, addon_folder, written)
+            return written
+        return self.transcode(archive_file, addon_folder, members, progress)
+
+    def _try(self, func, archive_file, *args):
+        # The copy is only a shortcut; failing to make one doesn't fail the extraction
+        try:
+            return func(archive_file, *args)
+        except Exception as e:
+            print(f"Error transcoding {os.path.basename(archive_file)}: {e}")
+            return None
+
+    @traced("transcode")
+    def transcode(self, archive_file, addon_folder, members, progress=None):
+        # A partial extraction decodes the whole .7z anyway: everything goes to a staging folder,
+        # gets packed, and the wanted members are moved on into the addon folder
+        os.makedirs(self.cache_dir, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix="transcode-", dir=self.cache_dir)
+        try:
+            check = (lambda files, nbytes: progress(0, 0)) if progress else None
+            unpacked = extract_archive(archive_file, staging, progress=check)
+            self._try(self.pack, archive_file, staging, unpacked)
+            wanted = set(members)
+            written = []
+            for relpath in unpacked:
+                if relpath not in wanted:
+                    continue
+                src = os.path.join(staging, *relpath.split("/"))
+                dst = os.path.join(addon_folder, *relpath.split("/"))
+                size = os.path.getsize(src)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                try:
+                    # Replacing the entry never writes through a hardlink into the shared store
+                    os.replace(src, dst)
+                except OSError:
+                    if os.path.lexists(dst):
+                        os.unlink(dst)
+                    shutil.copyfile(src, dst)
+                written.append(relpath)
+                if progress:
+                    progress(1, size)
+            return written
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    @traced("transcode.pack")
+    def pack(self, archive_file, folder, relpaths):
+        # Stores folder's relpaths (the archive's members, just extracted there) as the copy of archive_file
+        path = self.path_for(archive_file)
+        with _locks_guard:
+            lock = _locks.setdefault(path, threading.Lock())
+        with lock:
+            if os.path.isfile(path):
+                return path
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            try:
+                with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED) as z:
+                    for relpath in relpaths:
+                        z.write(os.path.join(folder, *relpath.split("/")), relpath)
+                os.replace(tmp_path, path)
+            finally:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+        self.forget(archive_file, keep=path)
+        self.evict(keep=path)
+        return path
+
+    def forget(self, archive_file, keep=None):
+        # Drops the copies made from archive_file (all of them, or all but keep)
+        for path in glob.glob(os.path.join(self.cache_dir, f"{self._key(archive_file)}-*.zip")):
+            if path != keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+    def evict(self, keep=None):
+        files = []
+        try:
+            with os.scandir(self.cache_dir) as it:
+                for entry in it:
+                    if entry.is_file() and entry.name.endswith(".zip"):
+                        st = entry.stat()
+                        files.append((st.st_mtime, st.st_size, entry.path))
+        except OSError:
+            return
+        used = sum(size for _, size, _ in files)
+        files.sort()
+        for _, size, path in files:
+            if used <= self.limit_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+                used -= size
+            except OSError:
+                pass
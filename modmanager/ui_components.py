@@ -1,20 +1,8 @@
-from PyQt5.QtWidgets import QTableWidgetItem, QLabel, QSizePolicy, QScrollBar, QWidget
+from PyQt5.QtWidgets import QLabel, QSizePolicy, QScrollBar, QWidget
 from PyQt5.QtCore import Qt, QTimer, pyqtSignal, QUrl
 from PyQt5.QtGui import QFontMetrics, QPainter, QLinearGradient, QColor, QDesktopServices
 import os
 
-# --- Custom Table Widget Item for Sorting ---
-class SortableTableWidgetItem(QTableWidgetItem):
-    def __lt__(self, other):
-        try:
-            self_data = self.data(Qt.UserRole)
-            other_data = other.data(Qt.UserRole)
-            if self_data is not None and other_data is not None:
-                return float(self_data) < float(other_data)
-        except Exception:
-            pass
-        return super().__lt__(other)
-
 # --- Dark Mode Style Setter ---
 def setDarkMode(app):
     dark_style = """
@@ -60,8 +48,8 @@ def setDarkMode(app):
         padding: 3px;
         border-radius: 4px;
     }
-    /* QTableWidget */
-    QTableWidget {
+    /* QTableView */
+    QTableView {
         background-color: #313438;
         alternate-background-color: #2b2b2b;
         gridline-color: #555;
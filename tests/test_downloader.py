@@ -0,0 +1,132 @@
+import io, os, re, random, shutil, tempfile, threading, unittest, zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+from modmanager import downloader
+from modmanager.operations import OperationCancelled
+
+
+def make_archive(size):
+    # Stored, random content: the zip is about `size` bytes and verify_archive can check it
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_STORED) as z:
+        z.writestr("maps/test.bsp", random.Random(1).randbytes(size))
+    return buffer.getvalue()
+
+
+class RangeHandler(BaseHTTPRequestHandler):
+    # Serves server.payload, honouring "Range: bytes=a-b" / "bytes=a-" like a CDN would
+    def do_GET(self):
+        payload = self.server.payload
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        with self.server.lock:
+            self.server.ranges.append(self.headers.get("Range"))
+        if not match:
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        start = int(match.group(1))
+        end = min(int(match.group(2)) if match.group(2) else len(payload) - 1, len(payload) - 1)
+        if start >= len(payload):
+            self.send_response(416)
+            self.send_header("Content-Range", f"bytes */{len(payload)}")
+            self.end_headers()
+            return
+        self.send_response(206)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(payload)}")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+        self.wfile.write(payload[start:end + 1])
+
+    def log_message(self, *args):
+        pass
+
+
+class StopAfter:
+    # Stands in for an OperationContext that gets cancelled once `limit` bytes came in
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.received = 0
+        self.lock = threading.Lock()
+
+    def add_total(self, files=0, nbytes=0):
+        pass
+
+    def report(self, files=0, nbytes=0):
+        pass
+
+    def advance(self, files=0, nbytes=0):
+        with self.lock:
+            self.received += nbytes
+            if self.limit is not None and self.received >= self.limit:
+                raise OperationCancelled()
+
+
+class DownloadTest(unittest.TestCase):
+    def setUp(self):
+        self.payload = make_archive(3 * 1024 * 1024)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), RangeHandler)
+        self.server.payload = self.payload
+        self.server.ranges = []
+        self.server.lock = threading.Lock()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/test.zip"
+        self.folder = tempfile.mkdtemp()
+        self.target = os.path.join(self.folder, "test.zip")
+        # Small enough that the test archive gets split into ranges
+        patcher = mock.patch.object(downloader, "SEGMENT_MIN_SIZE", 1024 * 1024)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def interrupt(self, segments):
+        with self.assertRaises(OperationCancelled):
+            downloader.download_file(self.url, self.target, segments, StopAfter(len(self.payload) // 3))
+        self.assertTrue(os.path.exists(self.target + ".part"))
+        self.assertFalse(os.path.exists(self.target))
+        self.server.ranges.clear()
+
+    def resume(self, segments):
+        context = StopAfter()
+        self.assertEqual(downloader.download_file(self.url, self.target, segments, context), self.target)
+        with open(self.target, "rb") as f:
+            self.assertEqual(f.read(), self.payload)
+        self.assertFalse(os.path.exists(self.target + ".part"))
+        self.assertFalse(os.path.exists(self.target + ".part.json"))
+        return context.received
+
+    def test_fresh_download(self):
+        self.assertEqual(self.resume(4), len(self.payload))
+
+    def test_single_request_resumes(self):
+        self.interrupt(1)
+        self.assertLess(self.resume(1), len(self.payload))
+
+    def test_segmented_resumes(self):
+        self.interrupt(4)
+        self.assertLess(self.resume(4), len(self.payload))
+
+    def test_segmented_then_single_keeps_contiguous_head(self):
+        self.interrupt(4)
+        self.assertLessEqual(self.resume(1), len(self.payload))
+        self.assertEqual(len([r for r in self.server.ranges if r != "bytes=0-0"]), 1)
+
+    def test_segment_count_change_restarts(self):
+        self.interrupt(4)
+        self.assertEqual(self.resume(3), len(self.payload))
+
+    def test_damaged_archive_is_discarded(self):
+        self.server.payload = self.payload[:-100] + b"\0" * 100
+        with self.assertRaises(downloader.DownloadError):
+            downloader.download_file(self.url, self.target, 1, StopAfter())
+        self.assertFalse(os.path.exists(self.target + ".part"))
+        self.assertFalse(os.path.exists(self.target))
+
+
+if __name__ == "__main__":
+    unittest.main()